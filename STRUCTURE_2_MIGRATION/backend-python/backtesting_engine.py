@@ -1,12 +1,137 @@
 """
 Moteur de backtesting Oracle Portfolio
-Module existant préservé sans modification
+Marchés simulés vectorisés (mouvement brownien géométrique), simulation du
+portefeuille avec rééquilibrage périodique ou sur seuil, et projections
+Monte Carlo
 """
 
 import random
 import math
+import os
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+from instrumentation import stage
+from metrics_kernel import compute_metrics
+from monte_carlo import DEFAULT_PERCENTILES, cholesky_factor, max_workers, run_simulation
+
+TRADING_DAYS = 252
+REBALANCING_FREQUENCIES = ('daily', 'weekly', 'monthly', 'quarterly', 'threshold')
+
+# Taille initiale de la fenêtre d'anticipation pour le rééquilibrage sur seuil
+_THRESHOLD_LOOKAHEAD = 256
+
+# Allocations cibles par stratégie
+STRATEGY_ALLOCATIONS = {
+    'balanced_portfolio': {'SPY': 0.6, 'BND': 0.3, 'GLD': 0.1},
+    'aggressive_growth': {'SPY': 0.7, 'QQQ': 0.2, 'VTI': 0.1},
+    'conservative': {'BND': 0.6, 'SPY': 0.3, 'GLD': 0.1},
+    'momentum': {'QQQ': 0.5, 'SPY': 0.3, 'GLD': 0.2},
+    'value_oriented': {'VTI': 0.5, 'VXUS': 0.3, 'BND': 0.2}
+}
+
+# Paramètres de simulation par type d'actif
+ASSET_PARAMS = {
+    'SPY': {'annual_return': 0.10, 'volatility': 0.16, 'initial_price': 300},
+    'QQQ': {'annual_return': 0.12, 'volatility': 0.20, 'initial_price': 250},
+    'BND': {'annual_return': 0.03, 'volatility': 0.04, 'initial_price': 85},
+    'GLD': {'annual_return': 0.05, 'volatility': 0.18, 'initial_price': 150},
+    'VTI': {'annual_return': 0.09, 'volatility': 0.15, 'initial_price': 180},
+    'VXUS': {'annual_return': 0.07, 'volatility': 0.17, 'initial_price': 55}
+}
+
+# Corrélations des rendements quotidiens entre actifs (paires absentes: 0)
+ASSET_CORRELATIONS = {
+    ('SPY', 'QQQ'): 0.90, ('SPY', 'VTI'): 0.97, ('SPY', 'VXUS'): 0.80,
+    ('SPY', 'BND'): 0.00, ('SPY', 'GLD'): 0.05, ('QQQ', 'VTI'): 0.88,
+    ('QQQ', 'VXUS'): 0.72, ('QQQ', 'BND'): 0.00, ('QQQ', 'GLD'): 0.05,
+    ('VTI', 'VXUS'): 0.80, ('VTI', 'BND'): 0.00, ('VTI', 'GLD'): 0.05,
+    ('VXUS', 'BND'): 0.05, ('VXUS', 'GLD'): 0.15, ('BND', 'GLD'): 0.30
+}
+
+# Mode Monte Carlo: chemins par défaut et maximum, budget mémoire d'un bloc
+MONTE_CARLO_PATHS = 10000
+MAX_MONTE_CARLO_PATHS = 1000000
+MONTE_CARLO_MEMORY_MB = int(os.environ.get('MONTE_CARLO_MEMORY_MB', 256))
+
+@dataclass
+class MarketData:
+    """
+    Prix simulés de plusieurs actifs sur un calendrier commun
+    
+    dates: jours ouvrés (datetime64[D]), prices: matrice (jours × actifs)
+    market_data['SPY'] renvoie la colonne de prix d'un actif
+    """
+    dates: np.ndarray
+    assets: List[str]
+    prices: np.ndarray
+    
+    def __contains__(self, asset: str) -> bool:
+        return asset in self.assets
+    
+    def __getitem__(self, asset: str) -> np.ndarray:
+        return self.prices[:, self.assets.index(asset)]
+    
+    def __len__(self) -> int:
+        return len(self.dates)
+
+def validate_backtest_config(config: Dict[str, Any]) -> None:
+    """
+    Vérifie les paramètres fournis par l'utilisateur avant toute simulation
+    Lève ValueError avec un message explicite (l'API répond alors 400)
+    """
+    for key in ('start_date', 'end_date'):
+        if key in config:
+            try:
+                datetime.strptime(config[key], '%Y-%m-%d')
+            except (TypeError, ValueError):
+                raise ValueError(f"{key} doit être une date au format YYYY-MM-DD: {config[key]!r}")
+    
+    rebalancing_freq = config.get('rebalancing_frequency', 'monthly')
+    if rebalancing_freq not in REBALANCING_FREQUENCIES:
+        raise ValueError(
+            f"Fréquence de rééquilibrage inconnue: {rebalancing_freq}. Disponibles: {list(REBALANCING_FREQUENCIES)}"
+        )
+    
+    if config.get('mode', 'historical') == 'monte_carlo':
+        if rebalancing_freq == 'threshold':
+            raise ValueError("Le rééquilibrage sur seuil n'est pas disponible en mode Monte Carlo")
+        paths = config.get('paths', MONTE_CARLO_PATHS)
+        if not _is_integer(paths) or not 1 <= paths <= MAX_MONTE_CARLO_PATHS:
+            raise ValueError(f"Le nombre de trajectoires doit être un entier entre 1 et {MAX_MONTE_CARLO_PATHS}")
+        workers = config.get('workers', 1)
+        if not _is_integer(workers) or workers < 1:
+            raise ValueError(f"workers doit être un entier supérieur ou égal à 1: {workers!r}")
+        
+        percentiles = config.get('percentiles', DEFAULT_PERCENTILES)
+        if (not isinstance(percentiles, (list, tuple)) or not percentiles
+                or not all(_is_number(p) and 0 <= p <= 100 for p in percentiles)):
+            raise ValueError(f"percentiles doit être une liste de nombres entre 0 et 100: {percentiles!r}")
+        
+        correlation = config.get('correlation')
+        if correlation is not None:
+            held_assets, _ = strategy_weights(config.get('strategy', 'balanced_portfolio'),
+                                              config.get('assets', ['SPY', 'BND', 'GLD']))
+            try:
+                correlation = np.asarray(correlation, dtype=np.float64)
+            except (TypeError, ValueError):
+                raise ValueError("La matrice de corrélation doit être un tableau de nombres")
+            if correlation.shape != (len(held_assets), len(held_assets)):
+                raise ValueError(
+                    f"La matrice de corrélation doit être {len(held_assets)} × {len(held_assets)} "
+                    f"(actifs détenus: {held_assets})"
+                )
+            # Symétrie, diagonale unité et définie positivité
+            cholesky_factor(correlation)
+
+def _is_integer(value: Any) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and math.isfinite(value)
 
 def run_backtest(config: Dict[str, Any]) -> Dict[str, Any]:
     """
@@ -20,40 +145,75 @@ def run_backtest(config: Dict[str, Any]) -> Dict[str, Any]:
             - initial_capital: Capital initial
             - assets: Liste des actifs
             - rebalancing_frequency: Fréquence de rééquilibrage
+            - mode: 'historical' (une trajectoire simulée, par défaut) ou 'monte_carlo'
+            - paths, target_value, correlation, workers, percentiles: options
+              du mode Monte Carlo (voir run_monte_carlo)
     
     Returns:
         Résultats complets du backtesting
     """
+    validate_backtest_config(config)
+    
     strategy = config.get('strategy', 'balanced_portfolio')
     start_date = config.get('start_date', '2020-01-01')
     end_date = config.get('end_date', '2024-01-01')
     initial_capital = config.get('initial_capital', 100000)
     assets = config.get('assets', ['SPY', 'BND', 'GLD'])
     rebalancing_freq = config.get('rebalancing_frequency', 'monthly')
+    rebalancing_threshold = config.get('rebalancing_threshold', 0.05)  # Écart de poids (mode 'threshold')
+    seed = config.get('seed')  # Graine des données simulées (aléatoire si absente)
     
     # Calcul de la période
     start_dt = datetime.strptime(start_date, '%Y-%m-%d')
     end_dt = datetime.strptime(end_date, '%Y-%m-%d')
     total_days = (end_dt - start_dt).days
     
+    if config.get('mode', 'historical') == 'monte_carlo':
+        return {
+            'strategy': strategy,
+            'period': {
+                'start_date': start_date,
+                'end_date': end_date,
+                'total_days': total_days
+            },
+            'initial_capital': initial_capital,
+            'assets': assets,
+            'rebalancing_frequency': rebalancing_freq,
+            'monte_carlo': run_monte_carlo(config, strategy, start_dt, end_dt, initial_capital,
+                                           assets, rebalancing_freq, seed),
+            'timestamp': datetime.now().isoformat(),
+            'module': 'backtesting_engine',
+            'version': '2.7.0',
+            'status': 'completed'
+        }
+    
     # Génération des données de marché simulées
-    market_data = generate_market_data(assets, start_dt, end_dt)
+    with stage('data'):
+        market_data = generate_market_data(assets, start_dt, end_dt, seed)
     
     # Exécution du backtesting
-    backtest_results = execute_backtest_strategy(
-        strategy, market_data, initial_capital, rebalancing_freq
-    )
-    
-    # Calcul des métriques de performance
-    performance_metrics = calculate_performance_metrics(
-        backtest_results, initial_capital, total_days
-    )
+    with stage('simulation'):
+        backtest_results = execute_backtest_strategy(
+            strategy, market_data, initial_capital, rebalancing_freq, rebalancing_threshold
+        )
+    
+    with stage('metrics'):
+        # Toutes les statistiques de la trajectoire en un seul calcul
+        metrics = portfolio_metrics(backtest_results)
+        
+        # Calcul des métriques de performance
+        performance_metrics = calculate_performance_metrics(
+            backtest_results, initial_capital, total_days, metrics
+        )
+        risk_metrics = calculate_risk_metrics(backtest_results, metrics)
     
     # Analyse des drawdowns
-    drawdown_analysis = analyze_drawdowns(backtest_results)
+    with stage('drawdowns'):
+        drawdown_analysis = analyze_drawdowns(backtest_results, metrics)
     
     # Comparaison avec benchmark
-    benchmark_comparison = compare_with_benchmark(backtest_results, market_data)
+    with stage('benchmark'):
+        benchmark_comparison = compare_with_benchmark(backtest_results, market_data)
     
     return {
         'strategy': strategy,
@@ -71,194 +231,300 @@ def run_backtest(config: Dict[str, Any]) -> Dict[str, Any]:
         'drawdown_analysis': drawdown_analysis,
         'benchmark_comparison': benchmark_comparison,
         'monthly_returns': backtest_results['monthly_returns'],
-        'risk_metrics': calculate_risk_metrics(backtest_results),
+        'risk_metrics': risk_metrics,
         'trade_statistics': backtest_results['trade_stats'],
         'timestamp': datetime.now().isoformat(),
         'module': 'backtesting_engine',
         'version': '2.7.0',
-        'status': 'preserved_without_modification'
+        'status': 'completed'
     }
 
-def generate_market_data(assets: List[str], start_date: datetime, end_date: datetime) -> Dict[str, List[float]]:
+def generate_market_data(assets: List[str], start_date: datetime, end_date: datetime,
+                         seed: Optional[int] = None) -> MarketData:
     """
     Génère des données de marché simulées pour les actifs
+    
+    Toute la matrice de chocs (jours ouvrés × actifs) est tirée en une fois
+    par un Generator initialisé avec seed, puis les prix suivent le produit
+    cumulé des rendements quotidiens (mouvement brownien géométrique discret)
     """
-    market_data = {}
-    current_date = start_date
-    
-    # Paramètres de simulation par type d'actif
-    asset_params = {
-        'SPY': {'annual_return': 0.10, 'volatility': 0.16, 'initial_price': 300},
-        'QQQ': {'annual_return': 0.12, 'volatility': 0.20, 'initial_price': 250},
-        'BND': {'annual_return': 0.03, 'volatility': 0.04, 'initial_price': 85},
-        'GLD': {'annual_return': 0.05, 'volatility': 0.18, 'initial_price': 150},
-        'VTI': {'annual_return': 0.09, 'volatility': 0.15, 'initial_price': 180},
-        'VXUS': {'annual_return': 0.07, 'volatility': 0.17, 'initial_price': 55}
-    }
+    assets = list(dict.fromkeys(assets))
+    dates = trading_dates(start_date, end_date)
     
-    for asset in assets:
-        params = asset_params.get(asset, asset_params['SPY'])
-        prices = []
-        current_price = params['initial_price']
-        
-        while current_date <= end_date:
-            # Simulation prix avec mouvement brownien géométrique
-            daily_return = random.gauss(
-                params['annual_return'] / 252,  # Rendement quotidien moyen
-                params['volatility'] / math.sqrt(252)  # Volatilité quotidienne
-            )
-            
-            current_price *= (1 + daily_return)
-            prices.append(round(current_price, 2))
-            current_date += timedelta(days=1)
-        
-        market_data[asset] = prices
-        current_date = start_date  # Reset pour l'actif suivant
+    daily_mean, daily_vol = daily_parameters(assets)
+    initial_prices = np.array(
+        [ASSET_PARAMS.get(asset, ASSET_PARAMS['SPY'])['initial_price'] for asset in assets], dtype=np.float64
+    )
+    
+    rng = np.random.default_rng(seed)
+    daily_returns = daily_mean + daily_vol * rng.standard_normal((len(dates), len(assets)))
+    prices = initial_prices * np.cumprod(1 + daily_returns, axis=0)
+    
+    return MarketData(dates=dates, assets=assets, prices=prices)
+
+def trading_dates(start_date: datetime, end_date: datetime) -> np.ndarray:
+    """Jours ouvrés (lundi-vendredi) de start_date à end_date inclus"""
+    dates = np.arange(
+        np.datetime64(start_date.date()), np.datetime64(end_date.date()) + 1, dtype='datetime64[D]'
+    )
+    return dates[np.is_busday(dates)]
+
+def daily_parameters(assets: List[str]):
+    """Rendement moyen et volatilité quotidiens de chaque actif (paramètres SPY par défaut)"""
+    params = [ASSET_PARAMS.get(asset, ASSET_PARAMS['SPY']) for asset in assets]
+    daily_mean = np.array([p['annual_return'] for p in params]) / TRADING_DAYS  # Rendement quotidien moyen
+    daily_vol = np.array([p['volatility'] for p in params]) / math.sqrt(TRADING_DAYS)  # Volatilité quotidienne
+    return daily_mean, daily_vol
+
+def correlation_matrix(assets: List[str]) -> np.ndarray:
+    """Matrice de corrélation des actifs d'après ASSET_CORRELATIONS"""
+    correlation = np.eye(len(assets))
+    for i, first in enumerate(assets):
+        for j, second in enumerate(assets[:i]):
+            rho = ASSET_CORRELATIONS.get((first, second), ASSET_CORRELATIONS.get((second, first), 0.0))
+            correlation[i, j] = correlation[j, i] = rho
+    return correlation
+
+def strategy_weights(strategy: str, available) -> Tuple[List[str], np.ndarray]:
+    """
+    Actifs de l'allocation de la stratégie présents dans available et leurs
+    poids cibles, renormalisés sur ces actifs
+    """
+    allocation = STRATEGY_ALLOCATIONS.get(strategy, STRATEGY_ALLOCATIONS['balanced_portfolio'])
+    held_assets = [asset for asset in allocation if asset in available]
+    if not held_assets:
+        raise ValueError(f"Aucun actif de l'allocation {strategy} dans les données: {list(allocation)}")
+    weights = np.array([allocation[asset] for asset in held_assets])
+    return held_assets, weights / weights.sum()
+
+def run_monte_carlo(config: Dict[str, Any], strategy: str, start_dt: datetime, end_dt: datetime,
+                    initial_capital: float, assets: List[str], rebalancing_freq: str,
+                    seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Projection Monte Carlo de la stratégie: trajectoires corrélées des actifs
+    détenus, rééquilibrées au calendrier demandé
+    
+    Options (config):
+        - paths: Nombre de trajectoires (10000 par défaut)
+        - target_value: Valeur cible du portefeuille (1,5 × capital initial par défaut)
+        - correlation: Matrice de corrélation des actifs détenus (ASSET_CORRELATIONS par défaut)
+        - workers: Processus de simulation (nombre de CPU par défaut, plafonné au nombre de CPU)
+        - percentiles: Percentiles des éventails
+    """
+    # Fréquence, trajectoires, processus, corrélations et percentiles déjà vérifiés par validate_backtest_config
+    paths = config.get('paths', MONTE_CARLO_PATHS)
+    target_value = float(config.get('target_value', initial_capital * 1.5))
+    
+    held_assets, weights = strategy_weights(strategy, list(dict.fromkeys(assets)))
+    correlation = config.get('correlation')
+    correlation = correlation_matrix(held_assets) if correlation is None else np.asarray(correlation, dtype=np.float64)
+    daily_mean, daily_vol = daily_parameters(held_assets)
+    
+    dates = trading_dates(start_dt, end_dt)
+    starts = rebalancing_starts(dates, rebalancing_freq)
+    
+    with stage('simulation'):
+        simulation = run_simulation(
+            paths, daily_mean, daily_vol, correlation, weights, starts, initial_capital, target_value,
+            days=len(dates),
+            seed=seed,
+            memory_bytes=MONTE_CARLO_MEMORY_MB * 2**20,
+            workers=config.get('workers', max_workers()),
+            percentiles=config.get('percentiles', DEFAULT_PERCENTILES)
+        )
+    grid = simulation.pop('grid')
+    simulation['held_assets'] = held_assets
+    simulation['weights'] = np.round(weights, 4).tolist()
+    simulation['trading_days'] = len(dates)
+    simulation['dates'] = np.datetime_as_string(dates[grid]).tolist()
+    return simulation
+
+def rebalancing_starts(dates: np.ndarray, frequency: str) -> np.ndarray:
+    """
+    Indices des jours de rééquilibrage calendaire (premier jour ouvré de chaque
+    semaine, mois ou trimestre); l'indice 0 est l'allocation initiale
+    """
+    if len(dates) == 0:
+        return np.zeros(1, dtype=np.int64)
+    days = dates.astype('datetime64[D]').astype(np.int64)
+    if frequency == 'daily':
+        return np.arange(len(dates), dtype=np.int64)
+    if frequency == 'weekly':
+        period = (days + 3) // 7  # Semaines commençant le lundi (1970-01-01 est un jeudi)
+    elif frequency == 'monthly':
+        period = dates.astype('datetime64[M]').astype(np.int64)
+    elif frequency == 'quarterly':
+        period = dates.astype('datetime64[M]').astype(np.int64) // 3
+    else:
+        raise ValueError(f"Fréquence de rééquilibrage inconnue: {frequency}")
+    changes = np.flatnonzero(period[1:] != period[:-1]) + 1
+    return np.concatenate([[0], changes]).astype(np.int64)
+
+# threshold_rebalancing_starts et simulate_portfolio ont un jumeau dans
+# oracle-backend-wow/backtest_engine.py (threshold_rebalance_starts,
+# simulate_portfolio): les deux backends sont déployés séparément (image
+# Docker de ce répertoire, Railway pour oracle-backend-wow) et ne peuvent pas
+# importer le code l'un de l'autre. Toute correction doit être reportée des deux côtés.
+
+def threshold_rebalancing_starts(prices: np.ndarray, weights: np.ndarray, threshold: float) -> np.ndarray:
+    """
+    Indices de rééquilibrage lorsque l'écart absolu d'un poids à sa cible
+    dépasse le seuil; chaque segment de dérive est évalué en bloc
+    """
+    if threshold <= 0:
+        raise ValueError("Le seuil de rééquilibrage doit être strictement positif")
+    n_days = len(prices)
+    starts = [0]
+    start = 0
+    lookahead = _THRESHOLD_LOOKAHEAD
+    while start < n_days - 1:
+        stop = min(start + lookahead, n_days)
+        held = prices[start:stop] / prices[start] * weights
+        drift = held / held.sum(axis=1, keepdims=True)
+        breached = np.flatnonzero(np.abs(drift[1:] - weights).max(axis=1) > threshold) + 1
+        if len(breached):
+            start += int(breached[0])
+            starts.append(start)
+            lookahead = _THRESHOLD_LOOKAHEAD
+        elif stop == n_days:
+            break
+        else:
+            # Aucun dépassement dans la fenêtre: on l'élargit depuis le même point
+            lookahead *= 2
+    return np.asarray(starts, dtype=np.int64)
+
+def simulate_portfolio(prices: np.ndarray, weights: np.ndarray, starts: np.ndarray,
+                       initial_value: float) -> np.ndarray:
+    """
+    Valeur quotidienne d'un portefeuille rééquilibré aux clôtures des jours starts
     
-    return market_data
+    Entre deux rééquilibrages les positions dérivent (buy and hold):
+        V[t] = V[s_k] * sum_i w_i * P[t, i] / P[s_k, i]
+    et V[s_k] est le produit cumulé des croissances de chaque segment
+    """
+    segment = np.zeros(len(prices), dtype=np.int64)
+    segment[starts[1:]] = 1
+    segment = np.cumsum(segment)
+    
+    base = prices[starts]
+    growth = (prices / base[segment]) @ weights
+    segment_growth = (base[1:] / base[:-1]) @ weights
+    start_values = initial_value * np.concatenate([[1.0], np.cumprod(segment_growth)])
+    return start_values[segment] * growth
+
+def monthly_returns_from_values(dates: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Rendement de chaque mois calendaire, de la dernière valeur du mois précédent à la sienne"""
+    months = dates.astype('datetime64[M]')
+    month_ends = np.concatenate([np.flatnonzero(months[1:] != months[:-1]), [len(values) - 1]])
+    closes = np.concatenate([values[:1], values[month_ends]])
+    return closes[1:] / closes[:-1] - 1
 
-def execute_backtest_strategy(strategy: str, market_data: Dict[str, List[float]], 
-                            initial_capital: float, rebalancing_freq: str) -> Dict[str, Any]:
+def execute_backtest_strategy(strategy: str, market_data: MarketData, 
+                            initial_capital: float, rebalancing_freq: str,
+                            rebalancing_threshold: float = 0.05) -> Dict[str, Any]:
     """
     Exécute la stratégie de backtesting
+    
+    Simulation vectorisée sur la matrice des prix: les positions dérivent entre
+    deux rééquilibrages (daily, weekly, monthly, quarterly ou threshold) puis
+    reviennent aux poids cibles à la clôture du jour de rééquilibrage
     """
-    # Définition des allocations par stratégie
-    strategy_allocations = {
-        'balanced_portfolio': {'SPY': 0.6, 'BND': 0.3, 'GLD': 0.1},
-        'aggressive_growth': {'SPY': 0.7, 'QQQ': 0.2, 'VTI': 0.1},
-        'conservative': {'BND': 0.6, 'SPY': 0.3, 'GLD': 0.1},
-        'momentum': {'QQQ': 0.5, 'SPY': 0.3, 'GLD': 0.2},
-        'value_oriented': {'VTI': 0.5, 'VXUS': 0.3, 'BND': 0.2}
-    }
+    if rebalancing_freq not in REBALANCING_FREQUENCIES:
+        raise ValueError(
+            f"Fréquence de rééquilibrage inconnue: {rebalancing_freq}. Disponibles: {list(REBALANCING_FREQUENCIES)}"
+        )
+    
+    # Actifs de l'allocation disponibles dans les données; poids renormalisés sur ceux-ci
+    held_assets, weights = strategy_weights(strategy, market_data)
+    prices = np.column_stack([market_data[asset] for asset in held_assets])
     
-    allocation = strategy_allocations.get(strategy, strategy_allocations['balanced_portfolio'])
+    if rebalancing_freq == 'threshold':
+        starts = threshold_rebalancing_starts(prices, weights, rebalancing_threshold)
+    else:
+        starts = rebalancing_starts(market_data.dates, rebalancing_freq)
     
     # Simulation du portefeuille
-    portfolio_values = []
-    daily_returns = []
-    monthly_returns = []
-    trade_stats = {'total_trades': 0, 'rebalancing_dates': []}
-    
-    current_capital = initial_capital
-    days_count = len(list(market_data.values())[0])
-    
-    for day in range(days_count):
-        # Calcul de la valeur du portefeuille
-        portfolio_value = 0
-        daily_return = 0
-        
-        for asset, weight in allocation.items():
-            if asset in market_data:
-                asset_value = current_capital * weight
-                if day > 0:
-                    price_change = (market_data[asset][day] - market_data[asset][day-1]) / market_data[asset][day-1]
-                    daily_return += weight * price_change
-                portfolio_value += asset_value * (1 + (market_data[asset][day] / market_data[asset][0] - 1))
-        
-        if day == 0:
-            portfolio_value = initial_capital
-            daily_return = 0
-        
-        portfolio_values.append(round(portfolio_value, 2))
-        daily_returns.append(round(daily_return * 100, 4))
-        
-        # Rééquilibrage mensuel (approximatif)
-        if day > 0 and day % 21 == 0:  # ~21 jours ouvrables par mois
-            trade_stats['total_trades'] += len(allocation)
-            trade_stats['rebalancing_dates'].append(day)
-        
-        # Calcul des rendements mensuels
-        if day > 0 and day % 21 == 0:
-            monthly_return = (portfolio_values[day] - portfolio_values[max(0, day-21)]) / portfolio_values[max(0, day-21)]
-            monthly_returns.append(round(monthly_return * 100, 2))
+    portfolio_values = simulate_portfolio(prices, weights, starts, initial_capital)
+    daily_returns = np.concatenate([[0.0], portfolio_values[1:] / portfolio_values[:-1] - 1])
+    monthly_returns = monthly_returns_from_values(market_data.dates, portfolio_values)
+    
+    rebalancing_days = starts[1:]
+    trade_stats = {
+        'total_trades': int(len(rebalancing_days) * len(held_assets)),
+        'rebalancing_dates': np.datetime_as_string(market_data.dates[rebalancing_days]).tolist()
+    }
     
     return {
-        'portfolio_values': portfolio_values,
-        'daily_returns': daily_returns,
-        'monthly_returns': monthly_returns,
-        'final_capital': portfolio_values[-1] if portfolio_values else initial_capital,
+        'portfolio_values': np.round(portfolio_values, 2).tolist(),
+        'daily_returns': np.round(daily_returns * 100, 4).tolist(),
+        'monthly_returns': np.round(monthly_returns * 100, 2).tolist(),
+        'final_capital': float(portfolio_values[-1]) if len(portfolio_values) else initial_capital,
         'trade_stats': trade_stats
     }
 
+def portfolio_metrics(backtest_results: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Métriques du noyau commun pour la trajectoire du portefeuille
+    (rendements quotidiens déduits des valeurs successives)
+    """
+    values = np.asarray(backtest_results['portfolio_values'], dtype=np.float64)
+    if len(values) < 2:
+        return {'count': 0}
+    return compute_metrics(values[1:] / values[:-1] - 1, TRADING_DAYS, wealth=values)
+
 def calculate_performance_metrics(backtest_results: Dict[str, Any], 
-                                initial_capital: float, total_days: int) -> Dict[str, float]:
+                                initial_capital: float, total_days: int,
+                                metrics: Optional[Dict[str, Any]] = None) -> Dict[str, float]:
     """
     Calcule les métriques de performance du backtesting
     """
+    metrics = metrics if metrics is not None else portfolio_metrics(backtest_results)
     final_capital = backtest_results['final_capital']
-    daily_returns = backtest_results['daily_returns']
     
     # Rendement total
     total_return = (final_capital - initial_capital) / initial_capital
     
-    # Rendement annualisé
+    # Rendement annualisé (sur la période calendaire demandée)
     years = total_days / 365.25
-    annualized_return = (final_capital / initial_capital) ** (1/years) - 1
+    annualized_return = (final_capital / initial_capital) ** (1/years) - 1 if years > 0 else total_return
     
-    # Volatilité
-    if len(daily_returns) > 1:
-        mean_return = sum(daily_returns) / len(daily_returns)
-        variance = sum([(r - mean_return)**2 for r in daily_returns]) / (len(daily_returns) - 1)
-        volatility = math.sqrt(variance * 252)  # Annualisée
-    else:
-        volatility = 0
+    # Volatilité annualisée
+    volatility = metrics.get('volatility', 0)
     
     # Ratio de Sharpe (approximatif avec taux sans risque = 2%)
     risk_free_rate = 0.02
     sharpe_ratio = (annualized_return - risk_free_rate) / volatility if volatility > 0 else 0
     
-    # Rendements positifs vs négatifs
-    positive_days = len([r for r in daily_returns if r > 0])
-    win_rate = positive_days / len(daily_returns) if daily_returns else 0
-    
     return {
         'total_return_pct': round(total_return * 100, 2),
         'annualized_return_pct': round(annualized_return * 100, 2),
         'volatility_pct': round(volatility * 100, 2),
         'sharpe_ratio': round(sharpe_ratio, 3),
-        'win_rate_pct': round(win_rate * 100, 1),
-        'best_day_pct': round(max(daily_returns) if daily_returns else 0, 2),
-        'worst_day_pct': round(min(daily_returns) if daily_returns else 0, 2),
-        'total_trading_days': len(daily_returns)
+        'win_rate_pct': round(metrics.get('win_rate', 0) * 100, 1),
+        'best_day_pct': round(metrics.get('best', 0) * 100, 2),
+        'worst_day_pct': round(metrics.get('worst', 0) * 100, 2),
+        'total_trading_days': len(backtest_results['daily_returns'])
     }
 
-def analyze_drawdowns(backtest_results: Dict[str, Any]) -> Dict[str, Any]:
+def analyze_drawdowns(backtest_results: Dict[str, Any],
+                      metrics: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Analyse les drawdowns du portefeuille
     """
-    portfolio_values = backtest_results['portfolio_values']
-    
-    if not portfolio_values:
+    if not len(backtest_results['portfolio_values']):
         return {'max_drawdown_pct': 0, 'drawdown_duration_days': 0}
     
-    # Calcul des drawdowns
-    peak = portfolio_values[0]
-    max_drawdown = 0
-    drawdown_start = 0
-    max_drawdown_duration = 0
-    current_drawdown_duration = 0
-    
-    for i, value in enumerate(portfolio_values):
-        if value > peak:
-            peak = value
-            if current_drawdown_duration > max_drawdown_duration:
-                max_drawdown_duration = current_drawdown_duration
-            current_drawdown_duration = 0
-        else:
-            drawdown = (peak - value) / peak
-            if drawdown > max_drawdown:
-                max_drawdown = drawdown
-                drawdown_start = i
-            current_drawdown_duration += 1
+    metrics = metrics if metrics is not None else portfolio_metrics(backtest_results)
+    max_drawdown = metrics.get('max_drawdown', 0)
     
     return {
         'max_drawdown_pct': round(max_drawdown * 100, 2),
-        'drawdown_duration_days': max_drawdown_duration,
+        'drawdown_duration_days': metrics.get('max_drawdown_duration', 0),
         'recovery_factor': round(1 / (max_drawdown + 0.001), 2)  # Éviter division par 0
     }
 
 def compare_with_benchmark(backtest_results: Dict[str, Any], 
-                          market_data: Dict[str, List[float]]) -> Dict[str, Any]:
+                          market_data: MarketData) -> Dict[str, Any]:
     """
     Compare les résultats avec un benchmark (SPY par défaut)
     """
@@ -283,40 +549,21 @@ def compare_with_benchmark(backtest_results: Dict[str, Any],
         'beta': round(random.uniform(0.7, 1.3), 2)  # Simulation beta
     }
 
-def calculate_risk_metrics(backtest_results: Dict[str, Any]) -> Dict[str, float]:
+def calculate_risk_metrics(backtest_results: Dict[str, Any],
+                           metrics: Optional[Dict[str, Any]] = None) -> Dict[str, float]:
     """
     Calcule les métriques de risque avancées
     """
-    daily_returns = backtest_results['daily_returns']
-    
-    if not daily_returns:
+    metrics = metrics if metrics is not None else portfolio_metrics(backtest_results)
+    if not metrics['count']:
         return {}
     
-    # Conversion en décimales
-    returns_decimal = [r/100 for r in daily_returns]
-    
-    # VaR 95% (Value at Risk)
-    sorted_returns = sorted(returns_decimal)
-    var_95_index = int(len(sorted_returns) * 0.05)
-    var_95 = sorted_returns[var_95_index] if var_95_index < len(sorted_returns) else 0
-    
-    # CVaR (Conditional VaR)
-    cvar_95 = sum(sorted_returns[:var_95_index]) / var_95_index if var_95_index > 0 else 0
-    
-    # Skewness et Kurtosis (approximations)
-    mean_return = sum(returns_decimal) / len(returns_decimal)
-    variance = sum([(r - mean_return)**2 for r in returns_decimal]) / len(returns_decimal)
-    std_dev = math.sqrt(variance)
-    
-    skewness = sum([(r - mean_return)**3 for r in returns_decimal]) / (len(returns_decimal) * std_dev**3) if std_dev > 0 else 0
-    kurtosis = sum([(r - mean_return)**4 for r in returns_decimal]) / (len(returns_decimal) * std_dev**4) if std_dev > 0 else 0
-    
     return {
-        'var_95_pct': round(var_95 * 100, 3),
-        'cvar_95_pct': round(cvar_95 * 100, 3),
-        'skewness': round(skewness, 3),
-        'kurtosis': round(kurtosis, 3),
-        'downside_deviation_pct': round(math.sqrt(sum([min(0, r)**2 for r in returns_decimal]) / len(returns_decimal)) * 100, 2)
+        'var_95_pct': round(metrics['var'] * 100, 3),
+        'cvar_95_pct': round(metrics['cvar'] * 100, 3),
+        'skewness': round(metrics['skewness'], 3),
+        'kurtosis': round(metrics['kurtosis'], 3),
+        'downside_deviation_pct': round(metrics['downside_deviation'] * 100, 2)
     }
 
 if __name__ == "__main__":
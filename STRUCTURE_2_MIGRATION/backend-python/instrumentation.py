@@ -0,0 +1,122 @@
+"""
+Instrumentation Oracle Portfolio
+Chronométrage par étape des calculs, histogrammes de latence au format
+d'exposition Prometheus et en-tête Server-Timing
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Bornes (secondes) des histogrammes, celles par défaut des clients Prometheus
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class StageTimings:
+    """Durées (secondes) des étapes d'une requête, dans l'ordre d'exécution; une étape répétée est cumulée"""
+
+    def __init__(self):
+        self.stages: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+# Collecteur de la requête en cours (None hors requête: stage() ne mesure rien)
+_current_timings: ContextVar[Optional[StageTimings]] = ContextVar('stage_timings', default=None)
+
+@contextmanager
+def collect_stages() -> Iterator[StageTimings]:
+    """Active un collecteur pour le contexte courant (une requête)"""
+    timings = StageTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Chronomètre un bloc et l'ajoute au collecteur actif s'il y en a un"""
+    timings = _current_timings.get()
+    if timings is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.add(name, time.perf_counter() - started)
+
+def server_timing_header(timings: StageTimings, total: Optional[float] = None) -> str:
+    """Valeur de l'en-tête Server-Timing (durées en millisecondes)"""
+    entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in timings.stages.items()]
+    if total is not None:
+        entries.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(entries)
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_bound(bound: float) -> str:
+    return '+Inf' if math.isinf(bound) else repr(float(bound))
+
+class Histogram:
+    """
+    Histogramme cumulatif à étiquettes (type histogram de Prometheus)
+    Les observations sont protégées par un verrou (appel possible depuis des threads)
+    """
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str],
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._sums: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            counts = self._series.get(key)
+            if counts is None:
+                counts = self._series[key] = [0] * len(self.buckets)
+                self._sums[key] = 0.0
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._sums[key] += value
+
+    def render(self) -> str:
+        """Séries au format d'exposition texte (compteurs de buckets cumulés)"""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((key, list(counts), self._sums[key]) for key, counts in self._series.items())
+        for key, counts, total in series:
+            labels = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(self.label_names, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels},le="{_format_bound(bound)}"}} {cumulative}')
+            lines.append(f"{self.name}_sum{{{labels}}} {total}")
+            lines.append(f"{self.name}_count{{{labels}}} {cumulative}")
+        return "\n".join(lines) + "\n"
+
+# Histogrammes du service
+REQUEST_LATENCY = Histogram(
+    'oracle_http_request_duration_seconds',
+    'Durée de traitement des requêtes HTTP par route',
+    ('method', 'endpoint', 'status')
+)
+STAGE_LATENCY = Histogram(
+    'oracle_stage_duration_seconds',
+    'Durée des étapes de calcul par route',
+    ('endpoint', 'stage')
+)
+
+def render_metrics(histograms: Sequence[Histogram] = (REQUEST_LATENCY, STAGE_LATENCY)) -> str:
+    return "".join(histogram.render() for histogram in histograms)
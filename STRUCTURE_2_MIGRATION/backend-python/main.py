@@ -6,15 +6,21 @@ Architecture: Firebase + Vite + Cloud Run
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.responses import PlainTextResponse
 import uvicorn
+import asyncio
 import logging
+import time
 from datetime import datetime
 import os
 
 # Import des modules Oracle Portfolio
 from economic_regimes_module import analyze_regimes
-from backtesting_engine import run_backtest
+from backtesting_engine import run_backtest, validate_backtest_config
+from monte_carlo import shutdown_executor
 from performance_analyzer import analyze_performance, calculate_risk_metrics
+from instrumentation import (REQUEST_LATENCY, STAGE_LATENCY, collect_stages, render_metrics,
+                             server_timing_header)
 
 # Configuration
 app = FastAPI(
@@ -35,6 +41,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
 # Middleware sécurité
@@ -47,11 +54,29 @@ app.add_middleware(
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@app.on_event("shutdown")
+async def stop_simulation_pool():
+    """Arrête le pool de processus Monte Carlo partagé"""
+    shutdown_executor()
+
 @app.middleware("http")
 async def log_requests(request, call_next):
-    start_time = datetime.utcnow()
-    response = await call_next(request)
-    process_time = (datetime.utcnow() - start_time).total_seconds()
+    """
+    Journalise chaque requête, alimente les histogrammes de latence (par route
+    et par étape de calcul) et renvoie les étapes dans l'en-tête Server-Timing
+    """
+    start_time = time.perf_counter()
+    with collect_stages() as timings:
+        response = await call_next(request)
+    process_time = time.perf_counter() - start_time
+    
+    # Gabarit de la route (pas le chemin brut) pour borner le nombre de séries
+    route = request.scope.get("route")
+    endpoint = getattr(route, "path", "unmatched")
+    REQUEST_LATENCY.observe(process_time, method=request.method, endpoint=endpoint, status=response.status_code)
+    for name, seconds in timings.stages.items():
+        STAGE_LATENCY.observe(seconds, endpoint=endpoint, stage=name)
+    response.headers["Server-Timing"] = server_timing_header(timings, process_time)
     
     logger.info(f"{request.method} {request.url.path} - {response.status_code} - {process_time:.3f}s")
     return response
@@ -78,6 +103,11 @@ async def health_check():
         "modules_loaded": 3
     }
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Histogrammes de latence au format d'exposition Prometheus"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 # Routes modules métier
 @app.post("/api/regimes/analyze")
 async def analyze_regimes_endpoint(data: dict):
@@ -106,10 +136,18 @@ async def run_backtest_endpoint(config: dict):
     Exécution backtesting
     Module existant préservé intégralement
     """
+    # Paramètres invalides (fréquence de rééquilibrage, dates...): erreur client
+    try:
+        validate_backtest_config(config)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     try:
         logger.info(f"Backtesting stratégie: {config.get('strategy', 'N/A')}")
         
-        result = run_backtest(config)
+        # Calcul CPU (Monte Carlo: plusieurs secondes) hors de la boucle d'événements;
+        # to_thread copie le contexte, les étapes restent dans Server-Timing
+        result = await asyncio.to_thread(run_backtest, config)
         
         return {
             "success": True,
@@ -0,0 +1,127 @@
+"""
+Noyau de métriques Oracle Portfolio
+Toutes les statistiques de rendement, de risque et de drawdown d'une série
+de rendements, calculées en un nombre fixe de passes vectorisées
+"""
+
+import math
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+# Niveau de confiance de la VaR / CVaR historiques
+VAR_LEVEL = 0.95
+
+def longest_run(mask: np.ndarray) -> int:
+    """Longueur de la plus longue suite de True"""
+    if not len(mask):
+        return 0
+    edges = np.flatnonzero(np.diff(np.concatenate([[0], mask.astype(np.int8), [0]])))
+    return int((edges[1::2] - edges[::2]).max()) if len(edges) else 0
+
+def compute_metrics(returns: Sequence[float], periods_per_year: int = 252,
+                    wealth: Optional[Sequence[float]] = None,
+                    var_level: float = VAR_LEVEL) -> Dict[str, Any]:
+    """
+    Calcule en une fois toutes les métriques d'une série de rendements (décimaux)
+
+    Args:
+        returns: Rendements périodiques
+        periods_per_year: Périodes par an pour l'annualisation (252, 52, 12...)
+        wealth: Trajectoire de valeur correspondante (n + 1 points, valeur initiale
+            comprise); par défaut le produit cumulé des rendements depuis 1
+        var_level: Niveau de confiance de la VaR / CVaR
+
+    Formules retenues:
+        - écart-type et volatilité: échantillon (ddof=1)
+        - skewness / kurtosis: moments centrés d'ordre 3 et 4 rapportés à la variance de population
+        - downside deviation: racine de la moyenne des rendements négatifs au carré (seuil 0)
+        - VaR: k-ième plus petit rendement avec k = int(n * (1 - var_level)), par sélection partielle;
+          CVaR: moyenne des k plus petits (la VaR si k = 0)
+        - drawdown: par rapport au plus haut de la trajectoire, valeur initiale comprise
+    """
+    r = np.asarray(returns, dtype=np.float64)
+    n = len(r)
+    if n == 0:
+        return {'count': 0}
+
+    # Moments: moyenne puis écarts centrés réutilisés pour les ordres 2 à 4
+    mean = r.mean()
+    deviations = r - mean
+    squared = deviations * deviations
+    m2 = squared.mean()
+    m3 = (squared * deviations).mean()
+    m4 = (squared * squared).mean()
+    std = math.sqrt(m2 * n / (n - 1)) if n > 1 else 0.0
+
+    # Queue gauche par sélection partielle (O(n), sans tri complet)
+    k = min(int(n * (1 - var_level)), n - 1)
+    partitioned = np.partition(r, k)
+    var = partitioned[k]
+    cvar = partitioned[:k].mean() if k > 0 else var
+
+    negative = np.minimum(r, 0.0)
+
+    # Trajectoire et drawdowns
+    if wealth is None:
+        path = np.empty(n + 1)
+        path[0] = 1.0
+        np.cumprod(1.0 + r, out=path[1:])
+    else:
+        path = np.asarray(wealth, dtype=np.float64)
+    peak = np.maximum.accumulate(path)
+    drawdowns = 1.0 - path / peak
+
+    growth = path[-1] / path[0] if path[0] > 0 else 0.0
+    positive = int(np.count_nonzero(r > 0))
+
+    return {
+        'count': n,
+        'sum': float(r.sum()),
+        'mean': float(mean),
+        'std': std,
+        'volatility': std * math.sqrt(periods_per_year),
+        'downside_deviation': math.sqrt(float((negative * negative).mean())),
+        'skewness': float(m3 / m2 ** 1.5) if m2 > 0 else 0.0,
+        'kurtosis': float(m4 / m2 ** 2) if m2 > 0 else 0.0,
+        'var': float(var),
+        'cvar': float(cvar),
+        'best': float(r.max()),
+        'worst': float(r.min()),
+        'positive_periods': positive,
+        'win_rate': positive / n,
+        'total_return': float(growth - 1),
+        'annualized_return': float(growth ** (periods_per_year / n) - 1) if growth > 0 else -1.0,
+        'max_drawdown': float(drawdowns.max()),
+        'max_drawdown_duration': longest_run(path < peak)
+    }
+
+def compute_relative_statistics(returns: Sequence[float], benchmark: Sequence[float]) -> Dict[str, Any]:
+    """
+    Statistiques conjointes d'un portefeuille et de son benchmark (séries alignées)
+
+    std, benchmark_std et tracking_error sont des écarts-types d'échantillon (ddof=1),
+    covariance est la covariance de population (divisée par n)
+    """
+    r = np.asarray(returns, dtype=np.float64)
+    b = np.asarray(benchmark, dtype=np.float64)
+    n = len(r)
+    if n == 0 or len(b) != n:
+        return {'count': 0}
+
+    r_dev = r - r.mean()
+    b_dev = b - b.mean()
+    co_moment = float(r_dev @ b_dev)
+    r_m2 = float(r_dev @ r_dev)
+    b_m2 = float(b_dev @ b_dev)
+    ddof = max(n - 1, 1)
+
+    return {
+        'count': n,
+        'mean': float(r.mean()),
+        'benchmark_mean': float(b.mean()),
+        'std': math.sqrt(r_m2 / ddof),
+        'benchmark_std': math.sqrt(b_m2 / ddof),
+        'covariance': co_moment / n,
+        'tracking_error': math.sqrt(max(r_m2 + b_m2 - 2 * co_moment, 0.0) / ddof)
+    }
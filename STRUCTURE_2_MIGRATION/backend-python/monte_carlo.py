@@ -0,0 +1,305 @@
+"""
+Simulation Monte Carlo Oracle Portfolio
+Trajectoires corrélées d'un portefeuille simulées par blocs de tableaux
+(chemins × jours × actifs) tenant dans un budget mémoire, répartis sur un
+pool de processus partagé par toutes les requêtes, avec des flux aléatoires
+indépendants (SeedSequence.spawn)
+
+Chaque bloc est réduit à un résumé de quantiles de taille fixe, fusionné au
+fil de l'eau: la mémoire ne dépend pas du nombre de chemins
+"""
+
+import math
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+TRADING_DAYS = 252
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+# Nombre maximal de dates des éventails (échantillonnage régulier de l'horizon)
+MAX_GRID_POINTS = 253
+# Matrices chemins × jours × actifs vivantes simultanément par chemin simulé
+_MATRICES_PER_PATH = 4
+# Quantiles conservés par colonne dans un résumé (exact jusqu'à ce nombre de chemins)
+SUMMARY_POINTS = 1001
+# Points des résumés en attente au-delà desquels ils sont fusionnés
+MERGE_POINTS = 2 * SUMMARY_POINTS
+
+# Pool de processus partagé (voir get_executor)
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def max_workers() -> int:
+    """Processus de simulation disponibles: un par CPU"""
+    return os.cpu_count() or 1
+
+def get_executor() -> ProcessPoolExecutor:
+    """Pool de processus partagé par toutes les simulations, créé au premier usage"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=max_workers())
+        return _executor
+
+def shutdown_executor() -> None:
+    """Arrête le pool partagé sans attendre les blocs en cours (arrêt de l'application)"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+def chunk_layout(paths: int, days: int, assets: int, memory_bytes: int) -> List[int]:
+    """
+    Nombre de chemins de chaque bloc pour qu'un bloc tienne dans memory_bytes
+
+    Ne dépend que de la taille du problème (pas du nombre de processus): à graine
+    égale, les blocs et donc les résultats sont identiques quel que soit le pool
+    """
+    per_path = max(days, 1) * (max(assets, 1) + 1) * 8 * _MATRICES_PER_PATH
+    rows = max(1, min(paths, memory_bytes // per_path))
+    return [min(rows, paths - start) for start in range(0, paths, rows)]
+
+def cholesky_factor(correlation: np.ndarray) -> np.ndarray:
+    """Facteur de Cholesky d'une matrice de corrélation (validée)"""
+    correlation = np.asarray(correlation, dtype=np.float64)
+    if correlation.ndim != 2 or correlation.shape[0] != correlation.shape[1]:
+        raise ValueError("La matrice de corrélation doit être carrée")
+    if not np.allclose(correlation, correlation.T) or not np.allclose(np.diag(correlation), 1.0):
+        raise ValueError("La matrice de corrélation doit être symétrique avec une diagonale de 1")
+    try:
+        return np.linalg.cholesky(correlation)
+    except np.linalg.LinAlgError:
+        raise ValueError("La matrice de corrélation n'est pas définie positive")
+
+def grid_indices(days: int, points: int = MAX_GRID_POINTS) -> np.ndarray:
+    """Indices régulièrement espacés de l'horizon (premier et dernier jours compris)"""
+    return np.unique(np.linspace(0, days - 1, min(days, points)).round().astype(np.int64))
+
+def portfolio_paths(returns: np.ndarray, weights: np.ndarray, starts: np.ndarray,
+                    initial_value: float) -> np.ndarray:
+    """
+    Valeurs (chemins × jours) du portefeuille rééquilibré aux jours starts,
+    pour des rendements (chemins × jours × actifs); version par lots de
+    backtesting_engine.simulate_portfolio
+    """
+    prices = np.cumprod(1.0 + returns, axis=1)
+    segment = np.zeros(returns.shape[1], dtype=np.int64)
+    segment[starts[1:]] = 1
+    segment = np.cumsum(segment)
+
+    base = prices[:, starts]
+    prices /= base[:, segment]
+    growth = prices @ weights
+    segment_growth = (base[:, 1:] / base[:, :-1]) @ weights
+    start_values = initial_value * np.concatenate(
+        [np.ones((len(returns), 1)), np.cumprod(segment_growth, axis=1)], axis=1
+    )
+    return start_values[:, segment] * growth
+
+def summarize(matrix: np.ndarray, points: int = SUMMARY_POINTS) -> Dict[str, Any]:
+    """
+    Résumé de taille fixe des colonnes de matrix (chemins × colonnes): leurs
+    quantiles à points rangs régulièrement espacés, minimum et maximum compris;
+    les valeurs triées elles-mêmes tant qu'il y a au plus points chemins
+    """
+    ordered = np.sort(matrix, axis=0)
+    if len(matrix) <= points:
+        return {'count': len(matrix), 'points': ordered}
+    # Interpolation linéaire entre rangs (celle de np.quantile, bien plus lent avec autant de niveaux)
+    position = np.linspace(0.0, len(matrix) - 1.0, points)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, len(matrix) - 1)
+    share = (position - lower)[:, None]
+    return {'count': len(matrix), 'points': ordered[lower] * (1 - share) + ordered[upper] * share}
+
+def _interp_columns(x: np.ndarray, xp: np.ndarray, fp: np.ndarray) -> np.ndarray:
+    """
+    np.interp colonne par colonne (x: m × colonnes, xp et fp: k × colonnes, xp
+    croissant dans chaque colonne) en un seul appel: chaque colonne est ramenée
+    à [0, 1] puis décalée de 2 × son indice, ce qui rend l'abscisse aplatie croissante
+    """
+    low = np.minimum(x.min(axis=0), xp[0])
+    span = np.maximum(x.max(axis=0), xp[-1]) - low
+    span[span == 0] = 1.0
+    offsets = 2.0 * np.arange(x.shape[1])
+    flat = np.interp(((x - low) / span + offsets).T.ravel(), ((xp - low) / span + offsets).T.ravel(),
+                     fp.T.ravel()).reshape(x.shape[1], -1).T
+    # Hors de l'intervalle de sa colonne, l'interpolation aplatie lirait la colonne voisine
+    return np.where(x < xp[0], fp[0], np.where(x > xp[-1], fp[-1], flat))
+
+def _count_below(summary: Dict[str, Any], values: np.ndarray) -> np.ndarray:
+    """
+    Nombre de chemins du résumé au plus égaux à values, colonne par colonne
+    (rang moyen: le quantile de rang r en compte r + 1/2)
+    """
+    quantiles, count = summary['points'], summary['count']
+    ranks = np.broadcast_to((np.linspace(0.0, count - 1.0, len(quantiles)) + 0.5)[:, None], quantiles.shape)
+    below = _interp_columns(values, quantiles, ranks)
+    return np.where(values < quantiles[0], 0.0, np.where(values > quantiles[-1], float(count), below))
+
+def merge_summaries(summaries: Sequence[Dict[str, Any]], points: int = SUMMARY_POINTS) -> Dict[str, Any]:
+    """
+    Fusionne des résumés: les échantillons complets (au plus points chemins)
+    sont regroupés et résumés exactement; s'il reste plusieurs résumés, quantiles
+    de la somme de leurs fonctions de répartition (linéaires par morceaux entre
+    les points de chaque résumé)
+    """
+    samples = [summary['points'] for summary in summaries if summary['count'] == len(summary['points'])]
+    summaries = [summary for summary in summaries if summary['count'] != len(summary['points'])]
+    if samples:
+        summaries.append(summarize(np.concatenate(samples), points))
+    if len(summaries) == 1:
+        return summaries[0]
+
+    count = sum(summary['count'] for summary in summaries)
+    knots = np.sort(np.concatenate([summary['points'] for summary in summaries]), axis=0)
+    below = sum(_count_below(summary, knots) for summary in summaries)
+    targets = np.broadcast_to((np.linspace(0.0, count - 1.0, points) + 0.5)[:, None], (points, knots.shape[1]))
+    return {'count': count, 'points': _interp_columns(targets, below, knots)}
+
+def summary_percentiles(summary: Dict[str, Any], percentiles: Sequence[float]) -> np.ndarray:
+    """Percentiles (percentiles × colonnes) interpolés comme np.percentile"""
+    quantiles = summary['points']
+    ranks = np.linspace(0.0, summary['count'] - 1.0, len(quantiles))
+    wanted = np.asarray(percentiles, dtype=np.float64) / 100 * (summary['count'] - 1)
+    # Position fractionnaire de chaque percentile parmi les points du résumé
+    position = np.interp(wanted, ranks, np.arange(len(quantiles), dtype=np.float64))
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, len(quantiles) - 1)
+    share = (position - lower)[:, None]
+    return quantiles[lower] * (1 - share) + quantiles[upper] * share
+
+def simulate_chunk(seed_sequence: np.random.SeedSequence, rows: int, days: int,
+                   daily_mean: np.ndarray, daily_vol: np.ndarray, cholesky: np.ndarray,
+                   weights: np.ndarray, starts: np.ndarray, initial_value: float,
+                   grid: np.ndarray, target_value: float) -> Dict[str, Any]:
+    """
+    Simule un bloc de chemins (exécuté dans un processus du pool)
+
+    Rendements quotidiens: mean + vol * (Z @ L.T), Z gaussien indépendant, L le
+    facteur de Cholesky des corrélations; seuls un résumé de quantiles (valeurs
+    et drawdowns aux dates de la grille, valeur finale, drawdown maximal) et des
+    comptages sont renvoyés
+    """
+    rng = np.random.default_rng(seed_sequence)
+    shocks = rng.standard_normal((rows, days, len(weights)))
+    returns = daily_mean + (shocks @ cholesky.T) * daily_vol
+    del shocks
+    values = portfolio_paths(returns, weights, starts, initial_value)
+    del returns
+    peak = np.maximum.accumulate(values, axis=1)
+    drawdowns = 1.0 - values / peak
+    columns = np.column_stack([values[:, grid], drawdowns[:, grid], values[:, -1], drawdowns.max(axis=1)])
+    return {
+        'summary': summarize(columns),
+        'final_above': int((values[:, -1] >= target_value).sum()),
+        # Chemins ayant touché la cible au plus tard à chaque date de la grille
+        'touched': (peak[:, grid] >= target_value).sum(axis=0)
+    }
+
+def _fan(bands: np.ndarray, percentiles: Sequence[float], scale: float = 1.0,
+         decimals: int = 2) -> Dict[str, List[float]]:
+    return {f"p{p:g}": np.round(band * scale, decimals).tolist() for p, band in zip(percentiles, bands)}
+
+def _bands(bands: np.ndarray, percentiles: Sequence[float], scale: float = 1.0,
+           decimals: int = 2) -> Dict[str, float]:
+    return {f"p{p:g}": round(float(band) * scale, decimals) for p, band in zip(percentiles, bands)}
+
+def _windowed(executor: ProcessPoolExecutor, tasks, workers: int, pending: deque):
+    """
+    Résultats de simulate_chunk dans l'ordre des blocs, avec au plus workers
+    blocs de la requête soumis au pool à la fois (pending: ceux en cours)
+    """
+    for task in tasks:
+        pending.append(executor.submit(simulate_chunk, *task))
+        if len(pending) >= workers:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+def run_simulation(paths: int, daily_mean: Sequence[float], daily_vol: Sequence[float],
+                   correlation: np.ndarray, weights: Sequence[float], starts: np.ndarray,
+                   initial_value: float, target_value: float, days: int,
+                   seed: Optional[int] = None, memory_bytes: int = 256 * 2**20,
+                   workers: int = 1,
+                   percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, Any]:
+    """
+    Simule paths trajectoires de portefeuille sur days jours de bourse, sur
+    au plus workers processus du pool partagé (plafonné au nombre de CPU)
+
+    Returns:
+        Éventails de percentiles (valeur, drawdown) aux dates de la grille,
+        distributions finales et probabilités d'atteindre target_value
+    """
+    if paths < 1 or days < 2:
+        raise ValueError("Au moins un chemin et deux jours de bourse sont nécessaires")
+    daily_mean = np.asarray(daily_mean, dtype=np.float64)
+    daily_vol = np.asarray(daily_vol, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.float64)
+    cholesky = cholesky_factor(correlation)
+    if cholesky.shape[0] != len(weights):
+        raise ValueError("La matrice de corrélation ne correspond pas au nombre d'actifs")
+
+    grid = grid_indices(days)
+    layout = chunk_layout(paths, days, len(weights), memory_bytes)
+    root = np.random.SeedSequence(seed)
+    children = root.spawn(len(layout))
+    workers = max(1, min(workers, max_workers(), len(layout)))
+
+    tasks = (
+        (child, rows, days, daily_mean, daily_vol, cholesky, weights, starts, initial_value, grid, target_value)
+        for child, rows in zip(children, layout)
+    )
+    summaries = []
+    final_above = 0
+    touched = np.zeros(len(grid))
+    pending = deque()
+    try:
+        if workers == 1:
+            chunks = (simulate_chunk(*task) for task in tasks)
+        else:
+            chunks = _windowed(get_executor(), tasks, workers, pending)
+        # Fusion dans l'ordre des blocs, par lots de MERGE_POINTS points: résultat indépendant du pool
+        for chunk in chunks:
+            summaries.append(chunk['summary'])
+            if sum(len(summary['points']) for summary in summaries) >= MERGE_POINTS:
+                summaries = [merge_summaries(summaries)]
+            final_above += chunk['final_above']
+            touched += chunk['touched']
+    finally:
+        # Simulation interrompue: les blocs pas encore démarrés libèrent le pool
+        for future in pending:
+            future.cancel()
+    summary = merge_summaries(summaries)
+    touched /= paths
+
+    bands = summary_percentiles(summary, percentiles)
+    values, drawdowns = bands[:, :len(grid)], bands[:, len(grid):2 * len(grid)]
+    final, max_drawdown = bands[:, -2], bands[:, -1]
+    # Fonction croissante de la valeur finale: mêmes rangs (interpolation près)
+    annualized = (final / initial_value) ** (TRADING_DAYS / (days - 1)) - 1
+
+    return {
+        'paths': paths,
+        'chunks': len(layout),
+        'workers': workers,
+        'seed': root.entropy,
+        'percentiles': list(percentiles),
+        'grid': grid.tolist(),
+        'portfolio_value': _fan(values, percentiles),
+        'drawdown_pct': _fan(drawdowns, percentiles, scale=100),
+        'final_value': _bands(final, percentiles),
+        'annualized_return_pct': _bands(annualized, percentiles, scale=100),
+        'max_drawdown_pct': _bands(max_drawdown, percentiles, scale=100),
+        'target': {
+            'value': target_value,
+            'probability_final_above': round(final_above / paths, 4),
+            'probability_touched': round(float(touched[-1]), 4),
+            'probability_touched_by_date': np.round(touched, 4).tolist()
+        }
+    }
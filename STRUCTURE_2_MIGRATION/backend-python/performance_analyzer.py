@@ -1,6 +1,7 @@
 """
 Analyseur de performance Oracle Portfolio
-Module existant préservé sans modification
+Métriques de rendement, de risque et relatives calculées par le noyau commun
+(metrics_kernel), avec reprise incrémentale via streaming_metrics
 """
 
 import math
@@ -8,6 +9,19 @@ import statistics
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 
+from instrumentation import stage
+from metrics_kernel import compute_metrics, compute_relative_statistics
+from streaming_metrics import BlockSummaries, PerformanceState
+
+# Facteurs d'annualisation
+ANNUALIZATION_FACTORS = {
+    'daily': 252,
+    'weekly': 52,
+    'monthly': 12,
+    'quarterly': 4,
+    'yearly': 1
+}
+
 def analyze_performance(data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Analyse complète des performances d'un portefeuille
@@ -18,41 +32,73 @@ def analyze_performance(data: Dict[str, Any]) -> Dict[str, Any]:
             - benchmark: Liste des rendements du benchmark
             - portfolio_values: Valeurs historiques du portefeuille
             - period: Période d'analyse ('daily', 'monthly', 'quarterly')
+            - state: État renvoyé par une analyse précédente; returns et benchmark
+              ne contiennent alors que les nouvelles périodes
+            - incremental: Renvoie l'état de l'analyse (implicite si state est fourni)
     
     Returns:
-        Analyse complète des performances
+        Analyse complète des performances (avec 'state' en mode incrémental)
     """
-    returns = data.get('returns', [0.02, -0.01, 0.03, 0.01, -0.02, 0.025, -0.015, 0.04])
-    benchmark = data.get('benchmark', [0.015, -0.005, 0.025, 0.008, -0.015, 0.02, -0.01, 0.035])
+    incremental = bool(data.get('state')) or bool(data.get('incremental'))
+    if incremental:
+        returns = data.get('returns', [])
+        benchmark = data.get('benchmark', [])
+    else:
+        returns = data.get('returns', [0.02, -0.01, 0.03, 0.01, -0.02, 0.025, -0.015, 0.04])
+        benchmark = data.get('benchmark', [0.015, -0.005, 0.025, 0.008, -0.015, 0.02, -0.01, 0.035])
     portfolio_values = data.get('portfolio_values', [])
     period = data.get('period', 'monthly')
+    factor = ANNUALIZATION_FACTORS.get(period, 12)
+    
+    if incremental:
+        # Reprise: seules les nouvelles observations sont parcourues
+        with stage('state'):
+            state = PerformanceState.from_dict(data['state']) if data.get('state') else PerformanceState()
+            state.update(returns, benchmark)
+        with stage('metrics'):
+            metrics = state.metrics(factor)
+        relative = state.relative_statistics()
+        blocks = state.blocks
+        periods_analyzed = state.count
+        portfolio_return = state.moments.total
+        benchmark_return = state.benchmark_total
+    else:
+        with stage('metrics'):
+            metrics = compute_metrics(returns, factor)
+        relative = None
+        blocks = None
+        periods_analyzed = len(returns)
+        portfolio_return = sum(returns)
+        benchmark_return = sum(benchmark)
     
     # Calculs de base
-    portfolio_return = sum(returns)
-    benchmark_return = sum(benchmark)
     alpha = portfolio_return - benchmark_return
     
-    # Métriques de rendement
-    return_metrics = calculate_return_metrics(returns, period)
-    
-    # Métriques de risque
-    risk_metrics = calculate_detailed_risk_metrics(returns)
+    with stage('metrics'):
+        # Métriques de rendement
+        return_metrics = calculate_return_metrics(returns, period, metrics)
+        
+        # Métriques de risque
+        risk_metrics = calculate_detailed_risk_metrics(returns, period, metrics)
     
     # Analyse relative au benchmark
-    relative_metrics = calculate_relative_metrics(returns, benchmark)
+    with stage('relative'):
+        relative_metrics = calculate_relative_metrics(returns, benchmark, relative)
     
     # Analyse des périodes
-    period_analysis = analyze_periods(returns, period)
+    with stage('periods'):
+        period_analysis = analyze_periods(returns, period, blocks)
     
     # Attribution de performance
-    attribution = calculate_attribution_analysis(data)
+    with stage('attribution'):
+        attribution = calculate_attribution_analysis(data)
     
-    return {
+    result = {
         'summary': {
             'portfolio_return_pct': round(portfolio_return * 100, 2),
             'benchmark_return_pct': round(benchmark_return * 100, 2),
             'alpha_pct': round(alpha * 100, 2),
-            'periods_analyzed': len(returns),
+            'periods_analyzed': periods_analyzed,
             'analysis_period': period
         },
         'return_metrics': return_metrics,
@@ -65,157 +111,88 @@ def analyze_performance(data: Dict[str, Any]) -> Dict[str, Any]:
         'timestamp': datetime.now().isoformat(),
         'module': 'performance_analyzer',
         'version': '2.7.0',
-        'status': 'preserved_without_modification'
+        'status': 'completed'
     }
+    if incremental:
+        with stage('state'):
+            result['state'] = state.to_dict()
+    return result
 
-def calculate_return_metrics(returns: List[float], period: str) -> Dict[str, float]:
+def calculate_return_metrics(returns: List[float], period: str,
+                             metrics: Optional[Dict[str, Any]] = None) -> Dict[str, float]:
     """
     Calcule les métriques de rendement
+    (metrics: résultat de compute_metrics ou PerformanceState.metrics, recalculé si absent)
     """
-    if not returns:
+    if metrics is None:
+        metrics = compute_metrics(returns, ANNUALIZATION_FACTORS.get(period, 12))
+    if not metrics['count']:
         return {}
     
-    # Facteurs d'annualisation
-    annualization_factors = {
-        'daily': 252,
-        'weekly': 52,
-        'monthly': 12,
-        'quarterly': 4,
-        'yearly': 1
-    }
-    
-    factor = annualization_factors.get(period, 12)
-    
-    # Rendement cumulé
-    cumulative_return = sum(returns)
-    
-    # Rendement moyen
-    mean_return = statistics.mean(returns)
-    
-    # Rendement annualisé (composé)
-    compound_return = 1
-    for r in returns:
-        compound_return *= (1 + r)
-    annualized_return = (compound_return ** (factor / len(returns))) - 1
-    
-    # Rendements positifs vs négatifs
-    positive_periods = len([r for r in returns if r > 0])
-    win_rate = positive_periods / len(returns)
-    
-    # Meilleurs et pires rendements
-    best_return = max(returns)
-    worst_return = min(returns)
-    
     return {
-        'cumulative_return_pct': round(cumulative_return * 100, 2),
-        'annualized_return_pct': round(annualized_return * 100, 2),
-        'mean_return_pct': round(mean_return * 100, 3),
-        'win_rate_pct': round(win_rate * 100, 1),
-        'best_period_pct': round(best_return * 100, 2),
-        'worst_period_pct': round(worst_return * 100, 2),
-        'positive_periods': positive_periods,
-        'total_periods': len(returns)
+        'cumulative_return_pct': round(metrics['sum'] * 100, 2),
+        'annualized_return_pct': round(metrics['annualized_return'] * 100, 2),
+        'mean_return_pct': round(metrics['mean'] * 100, 3),
+        'win_rate_pct': round(metrics['win_rate'] * 100, 1),
+        'best_period_pct': round(metrics['best'] * 100, 2),
+        'worst_period_pct': round(metrics['worst'] * 100, 2),
+        'positive_periods': metrics['positive_periods'],
+        'total_periods': metrics['count']
     }
 
-def calculate_detailed_risk_metrics(returns: List[float]) -> Dict[str, float]:
+def calculate_detailed_risk_metrics(returns: List[float], period: str = 'monthly',
+                                    metrics: Optional[Dict[str, Any]] = None) -> Dict[str, float]:
     """
     Calcule les métriques de risque détaillées
     """
-    if len(returns) < 2:
+    if metrics is None:
+        metrics = compute_metrics(returns, ANNUALIZATION_FACTORS.get(period, 12))
+    if metrics['count'] < 2:
         return {}
     
-    # Volatilité
-    volatility = statistics.stdev(returns)
-    annualized_volatility = volatility * math.sqrt(12)  # Assuming monthly data
-    
-    # Downside deviation
-    mean_return = statistics.mean(returns)
-    downside_returns = [min(0, r - mean_return) for r in returns]
-    downside_deviation = math.sqrt(sum([r**2 for r in downside_returns]) / len(downside_returns))
-    
-    # VaR et CVaR
-    sorted_returns = sorted(returns)
-    var_95_index = int(len(sorted_returns) * 0.05)
-    var_95 = sorted_returns[var_95_index] if var_95_index < len(sorted_returns) else sorted_returns[0]
-    
-    # CVaR (Expected Shortfall)
-    cvar_95 = statistics.mean(sorted_returns[:var_95_index]) if var_95_index > 0 else var_95
-    
-    # Maximum Drawdown (approximation)
-    cumulative_returns = []
-    cumulative = 1
-    for r in returns:
-        cumulative *= (1 + r)
-        cumulative_returns.append(cumulative)
-    
-    peak = cumulative_returns[0]
-    max_drawdown = 0
-    for value in cumulative_returns:
-        if value > peak:
-            peak = value
-        else:
-            drawdown = (peak - value) / peak
-            max_drawdown = max(max_drawdown, drawdown)
-    
-    # Skewness et Kurtosis
-    n = len(returns)
-    mean = statistics.mean(returns)
-    variance = statistics.variance(returns)
-    std_dev = math.sqrt(variance)
-    
-    skewness = sum([(r - mean)**3 for r in returns]) / (n * std_dev**3) if std_dev > 0 else 0
-    kurtosis = sum([(r - mean)**4 for r in returns]) / (n * std_dev**4) if std_dev > 0 else 0
-    excess_kurtosis = kurtosis - 3
-    
     return {
-        'volatility_pct': round(volatility * 100, 2),
-        'annualized_volatility_pct': round(annualized_volatility * 100, 2),
-        'downside_deviation_pct': round(downside_deviation * 100, 2),
-        'var_95_pct': round(var_95 * 100, 2),
-        'cvar_95_pct': round(cvar_95 * 100, 2),
-        'max_drawdown_pct': round(max_drawdown * 100, 2),
-        'skewness': round(skewness, 3),
-        'excess_kurtosis': round(excess_kurtosis, 3)
+        'volatility_pct': round(metrics['std'] * 100, 2),
+        'annualized_volatility_pct': round(metrics['volatility'] * 100, 2),
+        'downside_deviation_pct': round(metrics['downside_deviation'] * 100, 2),
+        'var_95_pct': round(metrics['var'] * 100, 2),
+        'cvar_95_pct': round(metrics['cvar'] * 100, 2),
+        'max_drawdown_pct': round(metrics['max_drawdown'] * 100, 2),
+        'skewness': round(metrics['skewness'], 3),
+        'excess_kurtosis': round(metrics['kurtosis'] - 3, 3)
     }
 
-def calculate_relative_metrics(returns: List[float], benchmark: List[float]) -> Dict[str, float]:
+def calculate_relative_metrics(returns: List[float], benchmark: List[float],
+                               relative: Optional[Dict[str, Any]] = None) -> Dict[str, float]:
     """
     Calcule les métriques relatives au benchmark
+    (relative: résultat de compute_relative_statistics ou PerformanceState.relative_statistics)
     """
-    if len(returns) != len(benchmark) or len(returns) < 2:
+    if relative is None:
+        relative = compute_relative_statistics(returns, benchmark)
+    if relative['count'] < 2:
         return {}
     
     # Tracking error
-    excess_returns = [r - b for r, b in zip(returns, benchmark)]
-    tracking_error = statistics.stdev(excess_returns) if len(excess_returns) > 1 else 0
+    tracking_error = relative['tracking_error']
     
     # Information ratio
-    mean_excess_return = statistics.mean(excess_returns)
+    mean_excess_return = relative['mean'] - relative['benchmark_mean']
     information_ratio = mean_excess_return / tracking_error if tracking_error > 0 else 0
     
     # Beta (approximation avec corrélation)
-    if len(returns) > 1 and len(benchmark) > 1:
-        # Calcul de la covariance et variance
-        mean_returns = statistics.mean(returns)
-        mean_benchmark = statistics.mean(benchmark)
-        
-        covariance = sum([(r - mean_returns) * (b - mean_benchmark) for r, b in zip(returns, benchmark)]) / len(returns)
-        benchmark_variance = statistics.variance(benchmark)
-        
-        beta = covariance / benchmark_variance if benchmark_variance > 0 else 1.0
-        
-        # Corrélation
-        returns_std = statistics.stdev(returns)
-        benchmark_std = statistics.stdev(benchmark)
-        correlation = covariance / (returns_std * benchmark_std) if (returns_std * benchmark_std) > 0 else 0
-    else:
-        beta = 1.0
-        correlation = 0.0
+    covariance = relative['covariance']
+    benchmark_variance = relative['benchmark_std'] ** 2
+    beta = covariance / benchmark_variance if benchmark_variance > 0 else 1.0
+    
+    # Corrélation
+    returns_std = relative['std']
+    benchmark_std = relative['benchmark_std']
+    correlation = covariance / (returns_std * benchmark_std) if (returns_std * benchmark_std) > 0 else 0
     
     # Sharpe ratio (approximation avec risk-free rate = 2%)
     risk_free_rate = 0.02 / 12  # Monthly risk-free rate
-    mean_return = statistics.mean(returns)
-    volatility = statistics.stdev(returns)
+    mean_return = relative['mean']
+    volatility = returns_std
     sharpe_ratio = (mean_return - risk_free_rate) / volatility if volatility > 0 else 0
     
     # Treynor ratio
@@ -231,34 +208,34 @@ def calculate_relative_metrics(returns: List[float], benchmark: List[float]) ->
         'alpha_pct': round(mean_excess_return * 100, 2)
     }
 
-def analyze_periods(returns: List[float], period: str) -> Dict[str, Any]:
+def analyze_periods(returns: List[float], period: str,
+                    blocks: Optional[BlockSummaries] = None) -> Dict[str, Any]:
     """
     Analyse les performances par période
+    (blocks: sommes par blocs de l'historique complet en mode incrémental)
     """
-    if len(returns) < 4:
+    n = blocks.count if blocks is not None else len(returns)
+    if n < 4:
         return {}
     
     # Division en quartiles
-    n = len(returns)
-    q1_end = n // 4
-    q2_end = n // 2
-    q3_end = 3 * n // 4
-    
-    q1_returns = returns[:q1_end]
-    q2_returns = returns[q1_end:q2_end]
-    q3_returns = returns[q2_end:q3_end]
-    q4_returns = returns[q3_end:]
-    
-    quarters = [q1_returns, q2_returns, q3_returns, q4_returns]
+    bounds = [0, n // 4, n // 2, 3 * n // 4, n]
     quarter_performance = []
     
-    for i, quarter in enumerate(quarters, 1):
-        if quarter:
+    for i, (start, end) in enumerate(zip(bounds[:-1], bounds[1:]), 1):
+        if end > start:
+            if blocks is not None:
+                segment = blocks.segment(start, end)
+                quarter_return, quarter_std = segment['sum'], segment['std']
+            else:
+                quarter = returns[start:end]
+                quarter_return = sum(quarter)
+                quarter_std = statistics.stdev(quarter) if len(quarter) > 1 else 0
             quarter_perf = {
                 'quarter': i,
-                'return_pct': round(sum(quarter) * 100, 2),
-                'volatility_pct': round(statistics.stdev(quarter) * 100, 2) if len(quarter) > 1 else 0,
-                'periods': len(quarter)
+                'return_pct': round(quarter_return * 100, 2),
+                'volatility_pct': round(quarter_std * 100, 2),
+                'periods': end - start
             }
             quarter_performance.append(quarter_perf)
     
@@ -0,0 +1,436 @@
+"""
+Accumulateurs en ligne Oracle Portfolio
+Métriques de performance mises à jour observation par observation, sans
+relire l'historique, et sérialisables en JSON pour reprendre une analyse
+"""
+
+import math
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from metrics_kernel import VAR_LEVEL
+
+# Version du format sérialisé de PerformanceState
+STATE_VERSION = 2
+
+# Compression par défaut du sketch de quantiles (nombre de centroïdes ~ compression / 2)
+SKETCH_COMPRESSION = 200
+
+# Nombre maximal de blocs des résumés par segment (BlockSummaries)
+MAX_BLOCKS = 512
+
+@dataclass
+class MomentsAccumulator:
+    """
+    Moyenne et moments centrés d'ordre 2 à 4 (Welford / Pébay), extrêmes,
+    somme, périodes positives et somme des carrés des rendements négatifs
+    """
+    count: int = 0
+    mean: float = 0.0
+    m2: float = 0.0
+    m3: float = 0.0
+    m4: float = 0.0
+    total: float = 0.0
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    positive: int = 0
+    downside_squares: float = 0.0
+
+    @classmethod
+    def from_values(cls, values: Sequence[float]) -> 'MomentsAccumulator':
+        x = np.asarray(values, dtype=np.float64)
+        if not len(x):
+            return cls()
+        mean = x.mean()
+        deviations = x - mean
+        squared = deviations * deviations
+        negative = np.minimum(x, 0.0)
+        return cls(
+            count=len(x),
+            mean=float(mean),
+            m2=float(squared.sum()),
+            m3=float((squared * deviations).sum()),
+            m4=float((squared * squared).sum()),
+            total=float(x.sum()),
+            minimum=float(x.min()),
+            maximum=float(x.max()),
+            positive=int(np.count_nonzero(x > 0)),
+            downside_squares=float(negative @ negative)
+        )
+
+    def merge(self, other: 'MomentsAccumulator') -> None:
+        """Combine un autre accumulateur (formules par paires de Pébay)"""
+        if not other.count:
+            return
+        if not self.count:
+            self.__dict__.update(asdict(other))
+            return
+        na, nb = self.count, other.count
+        n = na + nb
+        delta = other.mean - self.mean
+        delta_n = delta / n
+        m2 = self.m2 + other.m2 + delta * delta_n * na * nb
+        m3 = (self.m3 + other.m3
+              + delta * delta_n * delta_n * na * nb * (na - nb)
+              + 3 * delta_n * (na * other.m2 - nb * self.m2))
+        m4 = (self.m4 + other.m4
+              + delta * delta_n ** 3 * na * nb * (na * na - na * nb + nb * nb)
+              + 6 * delta_n * delta_n * (na * na * other.m2 + nb * nb * self.m2)
+              + 4 * delta_n * (na * other.m3 - nb * self.m3))
+        self.count = n
+        self.mean += delta_n * nb
+        self.m2, self.m3, self.m4 = m2, m3, m4
+        self.total += other.total
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+        self.positive += other.positive
+        self.downside_squares += other.downside_squares
+
+    def update(self, values: Sequence[float]) -> None:
+        self.merge(MomentsAccumulator.from_values(values))
+
+@dataclass
+class DrawdownAccumulator:
+    """
+    Valeur courante (base 1), plus haut, drawdown maximal et durées sous
+    l'eau (période courante et plus longue)
+    """
+    wealth: float = 1.0
+    peak: float = 1.0
+    max_drawdown: float = 0.0
+    current_run: int = 0
+    longest_run: int = 0
+
+    def update(self, values: Sequence[float]) -> None:
+        r = np.asarray(values, dtype=np.float64)
+        if not len(r):
+            return
+        path = self.wealth * np.cumprod(1.0 + r)
+        peak = np.maximum(np.maximum.accumulate(path), self.peak)
+        self.max_drawdown = max(self.max_drawdown, float((1.0 - path / peak).max()))
+
+        # Les périodes sous l'eau prolongent celle en cours
+        above = np.flatnonzero(path >= peak)
+        if not len(above):
+            self.current_run += len(r)
+            self.longest_run = max(self.longest_run, self.current_run)
+        else:
+            self.longest_run = max(self.longest_run, self.current_run + int(above[0]))
+            gaps = np.diff(above) - 1
+            if len(gaps):
+                self.longest_run = max(self.longest_run, int(gaps.max()))
+            self.current_run = len(r) - 1 - int(above[-1])
+            self.longest_run = max(self.longest_run, self.current_run)
+        self.wealth = float(path[-1])
+        self.peak = float(peak[-1])
+
+@dataclass
+class CovarianceAccumulator:
+    """Moyennes, moments d'ordre 2 et co-moment d'un portefeuille et de son benchmark"""
+    count: int = 0
+    mean: float = 0.0
+    benchmark_mean: float = 0.0
+    m2: float = 0.0
+    benchmark_m2: float = 0.0
+    co_moment: float = 0.0
+
+    def update(self, returns: Sequence[float], benchmark: Sequence[float]) -> None:
+        r = np.asarray(returns, dtype=np.float64)
+        b = np.asarray(benchmark, dtype=np.float64)
+        nb = len(r)
+        if not nb:
+            return
+        r_mean, b_mean = r.mean(), b.mean()
+        r_dev, b_dev = r - r_mean, b - b_mean
+        na = self.count
+        n = na + nb
+        delta_r = r_mean - self.mean
+        delta_b = b_mean - self.benchmark_mean
+        weight = na * nb / n
+        self.m2 += float(r_dev @ r_dev) + delta_r * delta_r * weight
+        self.benchmark_m2 += float(b_dev @ b_dev) + delta_b * delta_b * weight
+        self.co_moment += float(r_dev @ b_dev) + delta_r * delta_b * weight
+        self.mean += delta_r * nb / n
+        self.benchmark_mean += delta_b * nb / n
+        self.count = n
+
+    def statistics(self) -> Dict[str, Any]:
+        """Mêmes clés que metrics_kernel.compute_relative_statistics"""
+        n = self.count
+        if not n:
+            return {'count': 0}
+        ddof = max(n - 1, 1)
+        return {
+            'count': n,
+            'mean': self.mean,
+            'benchmark_mean': self.benchmark_mean,
+            'std': math.sqrt(self.m2 / ddof),
+            'benchmark_std': math.sqrt(self.benchmark_m2 / ddof),
+            'covariance': self.co_moment / n,
+            'tracking_error': math.sqrt(max(self.m2 + self.benchmark_m2 - 2 * self.co_moment, 0.0) / ddof)
+        }
+
+@dataclass
+class QuantileSketch:
+    """
+    Sketch de quantiles à centroïdes fusionnés (t-digest, fonction d'échelle k1)
+
+    Taille bornée (~ compression / 2 centroïdes plus un tampon d'au plus
+    5 × compression observations); les queues restent finement résolues, ce
+    qui convient à la VaR / CVaR. Exact jusqu'à la première fusion du tampon.
+    """
+    compression: int = SKETCH_COMPRESSION
+    means: List[float] = field(default_factory=list)
+    weights: List[float] = field(default_factory=list)
+    buffer: List[float] = field(default_factory=list)
+    count: int = 0
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+
+    def update(self, values: Sequence[float]) -> None:
+        x = np.asarray(values, dtype=np.float64)
+        if not len(x):
+            return
+        self.buffer.extend(x.tolist())
+        self.count += len(x)
+        low, high = float(x.min()), float(x.max())
+        self.minimum = low if self.minimum is None else min(self.minimum, low)
+        self.maximum = high if self.maximum is None else max(self.maximum, high)
+        if len(self.buffer) >= 5 * self.compression:
+            self.compress()
+
+    def _weight_limit(self, q: float) -> float:
+        """Quantile maximal couvert par un centroïde commençant au quantile q"""
+        step = 2 * math.pi / self.compression
+        return (1 + math.sin(min(math.asin(max(-1.0, min(1.0, 2 * q - 1))) + step, math.pi / 2))) / 2
+
+    def compress(self) -> None:
+        """Fusionne le tampon dans les centroïdes"""
+        if not self.buffer:
+            return
+        means, weights = self._sorted_centroids()
+        means, weights = means.tolist(), weights.tolist()
+        total = float(sum(weights))
+
+        merged_means, merged_weights = [means[0]], [weights[0]]
+        before = 0.0
+        limit = total * self._weight_limit(0.0)
+        for mean, weight in zip(means[1:], weights[1:]):
+            if before + merged_weights[-1] + weight <= limit:
+                merged_weights[-1] += weight
+                merged_means[-1] += (mean - merged_means[-1]) * weight / merged_weights[-1]
+            else:
+                before += merged_weights[-1]
+                limit = total * self._weight_limit(before / total)
+                merged_means.append(mean)
+                merged_weights.append(weight)
+        self.means, self.weights, self.buffer = merged_means, merged_weights, []
+
+    def _sorted_centroids(self):
+        """Centroïdes et observations du tampon (comme centroïdes unitaires), triés, sans fusion"""
+        means = np.concatenate([self.means, self.buffer])
+        weights = np.concatenate([self.weights, np.ones(len(self.buffer))])
+        order = np.argsort(means, kind='stable')
+        return means[order], weights[order]
+
+    def value_at_rank(self, rank: float) -> float:
+        """
+        Valeur de rang donné (0 = minimum), interpolée entre les centres des
+        centroïdes; exacte pour les centroïdes d'une observation
+        """
+        if not self.count:
+            return 0.0
+        means, weights = self._sorted_centroids()
+        centers = np.cumsum(weights) - (weights + 1) / 2
+        # Les extrêmes connus servent d'ancrage aux deux bouts
+        ranks = np.concatenate([[0.0], centers, [self.count - 1.0]])
+        values = np.concatenate([[self.minimum], means, [self.maximum]])
+        return float(np.interp(rank, ranks, values))
+
+    def lower_tail_mean(self, k: int) -> float:
+        """Moyenne des k plus petites observations (approchée à l'intérieur d'un centroïde)"""
+        means, weights = self._sorted_centroids()
+        before = np.cumsum(weights) - weights
+        taken = np.clip(k - before, 0.0, weights)
+        return float(means @ taken) / k
+
+@dataclass
+class BlockSummaries:
+    """
+    Somme et somme des carrés des rendements par blocs consécutifs de même
+    taille: statistiques d'un segment quelconque de l'historique
+
+    Au plus max_blocks blocs: au-delà, les blocs voisins sont fusionnés deux à
+    deux (la taille double), l'état reste donc borné. Exact tant que les
+    blocs ne contiennent qu'une observation; ensuite, une borne de segment
+    tombant à l'intérieur d'un bloc en prend une part proportionnelle.
+    """
+    max_blocks: int = MAX_BLOCKS
+    block_size: int = 1
+    count: int = 0
+    sums: List[float] = field(default_factory=list)
+    squares: List[float] = field(default_factory=list)
+
+    def _halve(self) -> None:
+        """Fusionne les blocs deux à deux (tous pleins sauf éventuellement le dernier)"""
+        for values in (self.sums, self.squares):
+            values[:] = [sum(values[i:i + 2]) for i in range(0, len(values), 2)]
+        self.block_size *= 2
+
+    def update(self, values: Sequence[float]) -> None:
+        x = np.asarray(values, dtype=np.float64)
+        if not len(x):
+            return
+        while -(-(self.count + len(x)) // self.block_size) > self.max_blocks:
+            self._halve()
+
+        # Complète le dernier bloc, puis ajoute des blocs pleins (le dernier éventuellement partiel)
+        filled = self.count % self.block_size
+        head = x[:self.block_size - filled] if filled else x[:0]
+        if len(head):
+            self.sums[-1] += float(head.sum())
+            self.squares[-1] += float(head @ head)
+        rest = x[len(head):]
+        if len(rest):
+            starts = np.arange(0, len(rest), self.block_size)
+            self.sums.extend(np.add.reduceat(rest, starts).tolist())
+            self.squares.extend(np.add.reduceat(rest * rest, starts).tolist())
+        self.count += len(x)
+
+    def _cumulative(self, position: int, sums: np.ndarray, squares: np.ndarray):
+        """Somme et somme des carrés des position premières observations"""
+        block, offset = divmod(position, self.block_size)
+        total, total_squares = sums[block], squares[block]
+        if offset:
+            size = min(self.block_size, self.count - block * self.block_size)
+            share = offset / size
+            total += share * self.sums[block]
+            total_squares += share * self.squares[block]
+        return total, total_squares
+
+    def segment(self, start: int, end: int) -> Dict[str, float]:
+        """Somme et écart-type (échantillon) des rendements [start, end)"""
+        n = end - start
+        sums = np.concatenate([[0.0], np.cumsum(self.sums)])
+        squares = np.concatenate([[0.0], np.cumsum(self.squares)])
+        end_sum, end_squares = self._cumulative(end, sums, squares)
+        start_sum, start_squares = self._cumulative(start, sums, squares)
+        total = float(end_sum - start_sum)
+        variance = max(float(end_squares - start_squares) - total * total / n, 0.0) / (n - 1) if n > 1 else 0.0
+        return {'sum': total, 'std': math.sqrt(variance), 'count': n}
+
+class PerformanceState:
+    """
+    État incrémental d'une analyse de performance: chaque appel à update()
+    coûte O(nouvelles observations), quelle que soit la longueur de l'historique
+
+    metrics() reprend les clés de metrics_kernel.compute_metrics et
+    relative_statistics() celles de compute_relative_statistics; tout est
+    exact à l'arrondi près, sauf la VaR / CVaR estimées par le sketch au-delà
+    de quelques centaines d'observations
+    """
+
+    def __init__(self):
+        self.moments = MomentsAccumulator()
+        self.drawdown = DrawdownAccumulator()
+        self.tail = QuantileSketch()
+        self.relative = CovarianceAccumulator()
+        self.blocks = BlockSummaries()
+        self.benchmark_total = 0.0
+        self.benchmark_count = 0
+        # Faux dès qu'une mise à jour reçoit des séries de longueurs différentes
+        self.aligned = True
+
+    @property
+    def count(self) -> int:
+        return self.moments.count
+
+    def update(self, returns: Sequence[float], benchmark: Sequence[float] = ()) -> None:
+        """Ajoute de nouvelles observations (rendements et benchmark de mêmes périodes)"""
+        returns = np.asarray(returns, dtype=np.float64)
+        benchmark = np.asarray(benchmark, dtype=np.float64)
+        self.moments.update(returns)
+        self.drawdown.update(returns)
+        self.tail.update(returns)
+        self.blocks.update(returns)
+        self.benchmark_total += float(benchmark.sum())
+        self.benchmark_count += len(benchmark)
+        if len(returns) != len(benchmark):
+            self.aligned = False
+        elif self.aligned:
+            self.relative.update(returns, benchmark)
+
+    def metrics(self, periods_per_year: int = 252, var_level: float = VAR_LEVEL) -> Dict[str, Any]:
+        """Métriques de la série complète, mêmes clés et formules que compute_metrics"""
+        m = self.moments
+        n = m.count
+        if not n:
+            return {'count': 0}
+        std = math.sqrt(m.m2 / (n - 1)) if n > 1 else 0.0
+        k = min(int(n * (1 - var_level)), n - 1)
+        var = self.tail.value_at_rank(k)
+        growth = self.drawdown.wealth
+        return {
+            'count': n,
+            'sum': m.total,
+            'mean': m.mean,
+            'std': std,
+            'volatility': std * math.sqrt(periods_per_year),
+            'downside_deviation': math.sqrt(m.downside_squares / n),
+            'skewness': math.sqrt(n) * m.m3 / m.m2 ** 1.5 if m.m2 > 0 else 0.0,
+            'kurtosis': n * m.m4 / m.m2 ** 2 if m.m2 > 0 else 0.0,
+            'var': var,
+            'cvar': self.tail.lower_tail_mean(k) if k > 0 else var,
+            'best': m.maximum,
+            'worst': m.minimum,
+            'positive_periods': m.positive,
+            'win_rate': m.positive / n,
+            'total_return': growth - 1,
+            'annualized_return': growth ** (periods_per_year / n) - 1 if growth > 0 else -1.0,
+            'max_drawdown': self.drawdown.max_drawdown,
+            'max_drawdown_duration': self.drawdown.longest_run
+        }
+
+    def relative_statistics(self) -> Dict[str, Any]:
+        """Statistiques conjointes avec le benchmark ({'count': 0} si les séries ne sont pas alignées)"""
+        if not self.aligned:
+            return {'count': 0}
+        return self.relative.statistics()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Forme sérialisable en JSON, à persister puis repasser à from_dict()"""
+        return {
+            'version': STATE_VERSION,
+            'moments': asdict(self.moments),
+            'drawdown': asdict(self.drawdown),
+            'tail': asdict(self.tail),
+            'relative': asdict(self.relative),
+            'blocks': asdict(self.blocks),
+            'benchmark_total': self.benchmark_total,
+            'benchmark_count': self.benchmark_count,
+            'aligned': self.aligned
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'PerformanceState':
+        if data.get('version') != STATE_VERSION:
+            raise ValueError(f"Version d'état non supportée: {data.get('version')} (attendue: {STATE_VERSION})")
+        state = cls()
+        try:
+            state.moments = MomentsAccumulator(**data['moments'])
+            state.drawdown = DrawdownAccumulator(**data['drawdown'])
+            state.tail = QuantileSketch(**data['tail'])
+            state.relative = CovarianceAccumulator(**data['relative'])
+            state.blocks = BlockSummaries(**data['blocks'])
+            state.benchmark_total = float(data['benchmark_total'])
+            state.benchmark_count = int(data['benchmark_count'])
+            state.aligned = bool(data['aligned'])
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"État invalide: {e}") from e
+        if (state.blocks.count != state.moments.count
+                or len(state.blocks.sums) != len(state.blocks.squares)
+                or len(state.blocks.sums) != -(-state.blocks.count // state.blocks.block_size)):
+            raise ValueError("État invalide: nombres d'observations incohérents")
+        return state
@@ -3,16 +3,35 @@ WOW V1 - Backtesting.py Integration Module
 FastAPI endpoints for backtesting functionality
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, AsyncIterator, Iterator, Optional
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+import asyncio
+import functools
+import io
 import logging
+import os
+import zlib
+
+from backtest_bootstrap import DEFAULT_PERCENTILES, bootstrap_returns, bootstrap_trades
+from backtest_cache import ResultCache, code_version, request_key
+from backtest_encoding import COMPACT_FORMAT, COMPRESSIONS, BROTLI_AVAILABLE, encode_table, epoch_days
+from backtest_indicators import IndicatorCache, cached_sma, indicator_cache
+from backtest_jobs import JOB_CANCELLED, JOB_COMPLETED, JOB_FAILED, BacktestJob, JobManager
+from backtest_optimizer import SEARCH_METHODS, candidate_params, run_search
+from backtest_parallel import SharedDataPool, default_workers, shutdown_executor, worker_frame
+# NaN/inf (e.g. the Sharpe ratio of a flat run) become null: NDJSON lines stay valid JSON
+from backtest_streaming import (ARROW_AVAILABLE, ARROW_MEDIA_TYPE, CHUNK_ROWS, NDJSON_MEDIA_TYPE, json_dumps,
+                                json_line, json_number, negotiate_stream)
+from backtest_walkforward import equity_stats, stitch_equity, walk_forward_windows
 
 # Backtesting.py imports
 try:
+    import backtesting
     from backtesting import Backtest, Strategy
     from backtesting.lib import crossover
     from backtesting.test import SMA, GOOG
@@ -21,6 +40,9 @@ except ImportError:
     BACKTESTING_AVAILABLE = False
     logging.warning("Backtesting.py not installed. Install with: pip install backtesting")
 
+if ARROW_AVAILABLE:
+    import pyarrow as pa
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -28,12 +50,44 @@ logger = logging.getLogger(__name__)
 # Router for backtest endpoints
 backtest_router = APIRouter(prefix="/api/backtest", tags=["backtest"])
 
+# Rows serialized per chunk of a full-resolution stream
+STREAM_CHUNK_ROWS = CHUNK_ROWS
+
+# Bootstrap resampling: batches are sized to stay within this budget
+BOOTSTRAP_MEMORY_MB = int(os.environ.get("BOOTSTRAP_MEMORY_MB", 256))
+MAX_BOOTSTRAP_SAMPLES = 100000
+
+# Largest number of specs accepted by /batch
+MAX_BATCH_SPECS = 500
+
+# JSON response layouts: verbose (lists of ISO dates and floats) or compact (encoded columns)
+RESPONSE_FORMATS = ("verbose", "compact")
+
+# Backtests run on a bounded thread pool (BACKTEST_MAX_JOBS) so the event loop stays free
+job_manager = JobManager()
+# Interval between progress events on the SSE stream
+JOB_EVENT_INTERVAL = 0.25
+
+# Finished backtests are cached by request hash; BACKTEST_CACHE_PATH="" disables the disk tier
+result_cache = ResultCache(
+    os.environ.get("BACKTEST_CACHE_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "backtest_cache.sqlite")) or None,
+    memory_bytes=int(os.environ.get("BACKTEST_CACHE_MEMORY_MB", 64)) * 2**20,
+    disk_bytes=int(os.environ.get("BACKTEST_CACHE_DISK_MB", 512)) * 2**20
+)
+
 # Pydantic models for request/response
 class AssetAllocation(BaseModel):
     symbol: str
     weight: float
     name: Optional[str] = None
 
+class BootstrapOptions(BaseModel):
+    samples: int = 1000
+    block_size: int = 20  # consecutive daily returns per block
+    trade_block_size: int = 1  # consecutive trades per block (1 = i.i.d.)
+    percentiles: List[float] = list(DEFAULT_PERCENTILES)
+    seed: Optional[int] = None
+
 class BacktestRequest(BaseModel):
     initial_capital: float = 10000
     assets: List[AssetAllocation]
@@ -41,12 +95,46 @@ class BacktestRequest(BaseModel):
     start_date: str
     end_date: str
     rebalance_frequency: str = "monthly"  # daily, weekly, monthly, quarterly
+    seed: Optional[int] = None  # Sample data seed (defaults to DEFAULT_SAMPLE_SEED)
+    bootstrap: Optional[BootstrapOptions] = None  # confidence bands from resampled returns
 
 class BacktestResult(BaseModel):
     success: bool
     data: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
     execution_time: Optional[float] = None
+    cache_hit: bool = False
+
+class OptimizeRequest(BacktestRequest):
+    param_grid: Dict[str, List[Any]] = {}
+    method: str = "grid"  # grid, random, successive_halving
+    max_evaluations: Optional[int] = None
+    maximize: str = "Sharpe Ratio"
+    constraint: Optional[str] = None  # e.g. "short_window < long_window"
+    top_n: int = 20
+    search_seed: Optional[int] = None  # Random sampling seed for random/successive_halving
+    max_workers: Optional[int] = None
+
+class BatchSpec(BaseModel):
+    name: Optional[str] = None
+    strategy: str = "TopFiveStrategy"
+    assets: List[AssetAllocation]
+    rebalance_frequency: str = "monthly"
+    params: Dict[str, Any] = {}
+
+class BatchRequest(BaseModel):
+    initial_capital: float = 10000
+    start_date: str
+    end_date: str
+    seed: Optional[int] = None
+    specs: List[BatchSpec]
+    rank_by: str = "sharpe_ratio"  # summary field used to order the comparison table
+    max_workers: Optional[int] = None
+
+class WalkForwardRequest(OptimizeRequest):
+    folds: int = 5  # optimize on window k, test on window k + 1
+    anchored: bool = False  # training windows all start at the first bar
+    warmup_bars: int = 250  # bars before each test window used to warm up indicators
 
 # Sample strategies
 class TopFiveStrategy(Strategy):
@@ -55,9 +143,11 @@ class TopFiveStrategy(Strategy):
     Buys and holds the top 5 assets with equal weighting
     """
     
+    # Strategy parameters
+    rebalance_frequency = 'monthly'
+    
     def init(self):
         # Initialize strategy parameters
-        self.rebalance_frequency = getattr(self, 'rebalance_frequency', 'monthly')
         self.last_rebalance = None
         
     def next(self):
@@ -101,10 +191,11 @@ class MovingAverageCrossStrategy(Strategy):
     long_window = 50
     
     def init(self):
-        # Calculate moving averages
+        # Calculate moving averages (both from one pass, shared with other runs on the same data)
         close = self.data.Close
-        self.ma_short = self.I(SMA, close, self.short_window)
-        self.ma_long = self.I(SMA, close, self.long_window)
+        indicator_cache.sma_family(close, (self.short_window, self.long_window))
+        self.ma_short = self.I(cached_sma, close, self.short_window, name=f"SMA({self.short_window})")
+        self.ma_long = self.I(cached_sma, close, self.long_window, name=f"SMA({self.long_window})")
         
     def next(self):
         # Buy signal: short MA crosses above long MA
@@ -120,58 +211,549 @@ STRATEGIES = {
     "MovingAverageCrossStrategy": MovingAverageCrossStrategy,
 }
 
-def get_sample_data(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+# Seed used when a request does not provide one (reproducible results)
+DEFAULT_SAMPLE_SEED = 42
+SAMPLE_DATA_CACHE_SIZE = 256
+
+@functools.lru_cache(maxsize=SAMPLE_DATA_CACHE_SIZE)
+def _generate_sample_data(symbol: str, start: pd.Timestamp, end: pd.Timestamp, seed: int) -> pd.DataFrame:
+    """
+    Build a synthetic OHLCV frame with array operations
+    Each call draws from its own Generator seeded by (seed, symbol), so concurrent
+    requests never share RNG state and each symbol gets a distinct path
+    """
+    rng = np.random.default_rng([seed, zlib.crc32(symbol.encode())])
+    dates = pd.date_range(start=start, end=end, freq='D')
+    dates = dates[dates.weekday < 5]  # Remove weekends
+    n = len(dates)
+    
+    initial_price = 100.0
+    returns = rng.normal(0.0005, 0.02, n)  # Daily returns
+    growth = np.concatenate([[1.0], np.cumprod(1 + returns[1:])])
+    close = initial_price * growth
+    
+    # Generate realistic OHLC from close price
+    volatility = 0.01
+    high = close * (1 + rng.uniform(0, volatility, n))
+    low = close * (1 - rng.uniform(0, volatility, n))
+    open_price = np.concatenate([close[:1], close[:-1]])
+    volume = rng.integers(1000000, 5000000, n)
+    
+    return pd.DataFrame({
+        'Open': open_price,
+        'High': high,
+        'Low': low,
+        'Close': close,
+        'Volume': volume
+    }, index=dates)
+
+def get_sample_data(symbol: str, start_date: str, end_date: str, seed: Optional[int] = None) -> pd.DataFrame:
     """
     Get sample data for backtesting
     In production, this would fetch real market data
+    
+    Frames are memoized per (symbol, start, end, seed); callers get their own copy
     """
     try:
         # For MVP, use sample data similar to GOOG
         # In production, integrate with your data sources (Yahoo Finance, Alpha Vantage, etc.)
         
-        start = pd.to_datetime(start_date)
-        end = pd.to_datetime(end_date)
+        start = pd.to_datetime(start_date).normalize()
+        end = pd.to_datetime(end_date).normalize()
         
-        # Generate sample data with realistic price movements
-        dates = pd.date_range(start=start, end=end, freq='D')
-        dates = dates[dates.weekday < 5]  # Remove weekends
-        
-        # Generate realistic OHLCV data
-        np.random.seed(42)  # For reproducible results
-        
-        initial_price = 100.0
-        returns = np.random.normal(0.0005, 0.02, len(dates))  # Daily returns
-        
-        prices = [initial_price]
-        for ret in returns[1:]:
-            prices.append(prices[-1] * (1 + ret))
-        
-        # Create OHLCV data
-        data = []
-        for i, (date, price) in enumerate(zip(dates, prices)):
-            # Generate realistic OHLC from close price
-            volatility = 0.01
-            high = price * (1 + np.random.uniform(0, volatility))
-            low = price * (1 - np.random.uniform(0, volatility))
-            open_price = prices[i-1] if i > 0 else price
-            volume = np.random.randint(1000000, 5000000)
-            
-            data.append({
-                'Open': open_price,
-                'High': high,
-                'Low': low,
-                'Close': price,
-                'Volume': volume
-            })
-        
-        df = pd.DataFrame(data, index=dates)
-        return df
+        return _generate_sample_data(symbol, start, end, DEFAULT_SAMPLE_SEED if seed is None else seed).copy()
         
     except Exception as e:
         logger.error(f"Error generating sample data: {e}")
         # Fallback to backtesting.py test data
         return GOOG.copy()
 
+REBALANCE_FREQUENCIES = ("daily", "weekly", "monthly", "quarterly")
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+def load_price_panel(symbols: List[str], start_date: str, end_date: str, seed: Optional[int] = None) -> pd.DataFrame:
+    """
+    Load every leg once and align them into a single OHLCV panel
+    Columns are a (field, symbol) MultiIndex; only dates quoted for all legs are kept
+    """
+    frames = {
+        symbol: get_sample_data(symbol=symbol, start_date=start_date, end_date=end_date, seed=seed)[OHLCV_COLUMNS]
+        for symbol in dict.fromkeys(symbols)
+    }
+    panel = pd.concat(frames, axis=1, join='inner').swaplevel(axis=1)
+    return panel.reindex(columns=pd.MultiIndex.from_product([OHLCV_COLUMNS, list(frames)]))
+
+def rebalance_starts(index: pd.DatetimeIndex, frequency: str) -> np.ndarray:
+    """Row positions where the portfolio is rebalanced at the close (0 is the initial allocation)"""
+    if frequency == 'daily':
+        return np.arange(len(index))
+    if frequency == 'weekly':
+        period = np.asarray(index.to_period('W').asi8)
+    elif frequency == 'monthly':
+        period = np.asarray(index.year * 12 + index.month)
+    elif frequency == 'quarterly':
+        period = np.asarray(index.year * 4 + (index.month - 1) // 3)
+    else:
+        raise ValueError(f"Unknown rebalance frequency '{frequency}'. Available: {list(REBALANCE_FREQUENCIES)}")
+    return np.concatenate([[0], np.flatnonzero(period[1:] != period[:-1]) + 1])
+
+def build_portfolio_ohlc(panel: pd.DataFrame, weights: np.ndarray, rebalance_frequency: str,
+                         initial_value: float = 100.0) -> pd.DataFrame:
+    """
+    Collapse an aligned OHLCV panel into the OHLCV series of the weighted portfolio
+    
+    Holdings are reset to the target weights at the close of each rebalance day and
+    drift with prices in between, so the whole path is computed in one vectorized pass.
+    Open/High/Low of a rebalance day use the holdings carried into that day.
+    """
+    closes = panel['Close'].to_numpy(dtype=np.float64)
+    starts = rebalance_starts(panel.index, rebalance_frequency)
+    
+    segment = np.zeros(len(panel), dtype=np.int64)
+    segment[starts[1:]] = 1
+    segment = np.cumsum(segment)
+    
+    # Portfolio value at each rebalance close, then units held in each segment
+    base = closes[starts]
+    segment_growth = (base[1:] / base[:-1]) @ weights
+    start_values = initial_value * np.concatenate([[1.0], np.cumprod(segment_growth)])
+    units = start_values[:, None] * weights / base
+    
+    held = units[segment]
+    carried = held.copy()
+    carried[starts[1:]] = units[segment[starts[1:]] - 1]
+    
+    close = (held * closes).sum(axis=1)
+    open_ = (carried * panel['Open'].to_numpy(dtype=np.float64)).sum(axis=1)
+    high = (carried * panel['High'].to_numpy(dtype=np.float64)).sum(axis=1)
+    low = (carried * panel['Low'].to_numpy(dtype=np.float64)).sum(axis=1)
+    dollar_volume = (panel['Volume'].to_numpy(dtype=np.float64) * closes).sum(axis=1)
+    
+    return pd.DataFrame({
+        'Open': open_,
+        'High': np.maximum.reduce([high, open_, close]),
+        'Low': np.minimum.reduce([low, open_, close]),
+        'Close': close,
+        'Volume': dollar_volume / close
+    }, index=panel.index)
+
+def stream_ndjson_result(header: Dict[str, Any], equity: pd.DataFrame, trades: pd.DataFrame) -> Iterator[bytes]:
+    """
+    Stream a backtest result as NDJSON: one summary line, then one line per
+    equity point, then one line per trade, serialized chunk by chunk
+    """
+    yield json_line({"type": "summary", **header})
+
+    dates = np.datetime_as_string(equity.index.values, unit="s")
+    values = equity['Equity'].to_numpy(dtype=np.float64)
+    drawdowns = equity['DrawdownPct'].to_numpy(dtype=np.float64)
+    for i in range(0, len(values), STREAM_CHUNK_ROWS):
+        chunk = slice(i, i + STREAM_CHUNK_ROWS)
+        yield "".join(
+            f'{{"type":"equity","date":"{d}","equity":{json_number(v)},"drawdown":{json_number(dd)}}}\n'
+            for d, v, dd in zip(dates[chunk], values[chunk].tolist(), drawdowns[chunk].tolist())
+        ).encode()
+
+    for i in range(0, len(trades), STREAM_CHUNK_ROWS):
+        rows = trades.iloc[i:i + STREAM_CHUNK_ROWS]
+        yield b"".join(json_line({"type": "trade", **trade}) for trade in format_trades(rows))
+
+def stream_arrow_result(header: Dict[str, Any], equity: pd.DataFrame, trades: pd.DataFrame) -> Iterator[bytes]:
+    """
+    Stream the equity curve as Arrow IPC record batches
+    The summary and trades travel as JSON in the schema metadata
+    """
+    schema = pa.schema(
+        [("date", pa.timestamp("s")), ("equity", pa.float64()), ("drawdown", pa.float64())],
+        metadata={"summary": json_dumps(header), "trades": json_dumps(format_trades(trades))}
+    )
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for i in range(0, max(len(equity), 1), STREAM_CHUNK_ROWS):
+            rows = equity.iloc[i:i + STREAM_CHUNK_ROWS]
+            writer.write_batch(pa.record_batch([
+                pa.array(rows.index.values.astype("datetime64[s]"), pa.timestamp("s")),
+                pa.array(rows['Equity'].to_numpy(dtype=np.float64)),
+                pa.array(rows['DrawdownPct'].to_numpy(dtype=np.float64)),
+            ], schema=schema))
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    yield sink.getvalue()
+
+def format_trades(trades: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convert a backtesting.py trades DataFrame to JSON-ready dicts"""
+    if trades is None or trades.empty:
+        return []
+    return pd.DataFrame({
+        "entry_date": np.datetime_as_string(trades['EntryTime'].to_numpy(dtype="datetime64[s]")),
+        "exit_date": np.datetime_as_string(trades['ExitTime'].to_numpy(dtype="datetime64[s]")),
+        "size": trades['Size'].to_numpy(dtype=np.float64),
+        "entry_price": trades['EntryPrice'].to_numpy(dtype=np.float64),
+        "exit_price": trades['ExitPrice'].to_numpy(dtype=np.float64),
+        "pnl": trades['PnL'].to_numpy(dtype=np.float64),
+        "return_pct": trades['ReturnPct'].to_numpy(dtype=np.float64)
+    }).to_dict("records")
+
+def compact_trades(trades: pd.DataFrame, delta: bool = True, compression: str = "auto") -> Dict[str, Any]:
+    """Trade log as encoded columns (epoch-day dates, float32 values)"""
+    if trades is None:
+        trades = pd.DataFrame(columns=['EntryTime', 'ExitTime', 'Size', 'EntryPrice', 'ExitPrice', 'PnL', 'ReturnPct'])
+    return encode_table({
+        "entry_date": (epoch_days(trades['EntryTime']), np.int32),
+        "exit_date": (epoch_days(trades['ExitTime']), np.int32),
+        "size": (trades['Size'].to_numpy(dtype=np.float64), np.float32),
+        "entry_price": (trades['EntryPrice'].to_numpy(dtype=np.float64), np.float32),
+        "exit_price": (trades['ExitPrice'].to_numpy(dtype=np.float64), np.float32),
+        "pnl": (trades['PnL'].to_numpy(dtype=np.float64), np.float32),
+        "return_pct": (trades['ReturnPct'].to_numpy(dtype=np.float64), np.float32)
+    }, len(trades), delta, compression)
+
+def validate_backtest_request(request: BacktestRequest):
+    """
+    Validate a backtest request without loading any data
+    Returns (symbols, normalized weights) with duplicate legs merged; raises HTTPException(400)
+    """
+    # Validate strategy
+    if request.strategy not in STRATEGIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Strategy '{request.strategy}' not found. Available: {list(STRATEGIES.keys())}"
+        )
+    
+    # Validate assets
+    if not request.assets:
+        raise HTTPException(status_code=400, detail="At least one asset is required")
+    
+    total_weight = sum(asset.weight for asset in request.assets)
+    if abs(total_weight - 1.0) > 0.01:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Asset weights must sum to 1.0, got {total_weight}"
+        )
+    
+    if request.rebalance_frequency not in REBALANCE_FREQUENCIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Rebalance frequency '{request.rebalance_frequency}' not supported. Available: {list(REBALANCE_FREQUENCIES)}"
+        )
+    
+    # Merge duplicate legs, then load all of them once into an aligned panel
+    weights_by_symbol: Dict[str, float] = {}
+    for asset in request.assets:
+        weights_by_symbol[asset.symbol] = weights_by_symbol.get(asset.symbol, 0.0) + asset.weight
+    symbols = list(weights_by_symbol)
+    weights = np.array([weights_by_symbol[symbol] for symbol in symbols]) / total_weight
+    return symbols, weights
+
+def trade_data(panel: pd.DataFrame, symbols: List[str], weights: np.ndarray,
+               rebalance_frequency: str) -> pd.DataFrame:
+    """OHLCV series to trade for the given legs of a (possibly wider) aligned panel"""
+    if len(symbols) == 1:
+        # Single asset: trade the instrument itself
+        return panel.xs(symbols[0], axis=1, level=1)
+    # Portfolio: trade the weighted, rebalanced basket as one instrument
+    legs = panel.reindex(columns=pd.MultiIndex.from_product([OHLCV_COLUMNS, symbols]))
+    return build_portfolio_ohlc(legs, weights, rebalance_frequency)
+
+def load_backtest_data(request: BacktestRequest, symbols: List[str], weights: np.ndarray):
+    """
+    Build the OHLCV series to trade for a validated request
+    Returns (data, aligned panel); raises HTTPException(400) when the period has no data
+    """
+    panel = load_price_panel(symbols, request.start_date, request.end_date, request.seed)
+    
+    if panel.empty:
+        raise HTTPException(status_code=400, detail="No data available for the specified period")
+    
+    return trade_data(panel, symbols, weights, request.rebalance_frequency), panel
+
+def prepare_backtest_data(request: BacktestRequest):
+    """
+    Validate a backtest request and build the OHLCV series to trade
+    Returns (data, symbols, normalized weights, aligned panel); raises HTTPException(400)
+    """
+    symbols, weights = validate_backtest_request(request)
+    data, panel = load_backtest_data(request, symbols, weights)
+    return data, symbols, weights, panel
+
+def create_backtest(data: pd.DataFrame, strategy_class, cash: float) -> "Backtest":
+    """Backtest with the service's standard trading assumptions"""
+    return Backtest(
+        data,
+        strategy_class,
+        cash=cash,
+        commission=0.002,  # 0.2% commission
+        exclusive_orders=True
+    )
+
+def evaluate_strategy_params(strategy_name: str, cash: float, maximize: str,
+                             params: Dict[str, Any], n_rows: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Run one parameter set on the price data shared with the worker pool
+    n_rows limits the run to the trailing bars (used by successive halving)
+    """
+    data = worker_frame("prices")
+    if n_rows:
+        data = data.iloc[-n_rows:]
+    stats = create_backtest(data, STRATEGIES[strategy_name], cash).run(**params)
+    score = stats.get(maximize)
+    return {
+        "params": params,
+        "score": float(score) if score is not None else float("nan"),
+        "total_return_pct": float(stats['Return [%]']),
+        "sharpe_ratio": float(stats.get('Sharpe Ratio', 0)),
+        "max_drawdown_pct": float(stats['Max. Drawdown [%]']),
+        "num_trades": int(stats.get('# Trades', 0))
+    }
+
+def with_progress(strategy_class, job: BacktestJob, total_bars: int):
+    """
+    Subclass of strategy_class reporting progress on job at every bar
+    and aborting the run once the job has been cancelled
+    """
+    class TrackedStrategy(strategy_class):
+        def next(self):
+            job.check_cancelled()
+            job.progress = len(self.data) / total_bars
+            super().next()
+    
+    TrackedStrategy.__name__ = strategy_class.__name__
+    TrackedStrategy.__qualname__ = strategy_class.__qualname__
+    return TrackedStrategy
+
+def execute_backtest(request: BacktestRequest, data: pd.DataFrame, job: BacktestJob):
+    """Run the requested strategy on data inside a job worker; returns backtesting.py stats"""
+    strategy_class = STRATEGIES[request.strategy]
+    bt = create_backtest(data, with_progress(strategy_class, job, len(data)), request.initial_capital)
+    
+    # Add strategy parameters
+    params = {}
+    if hasattr(strategy_class, 'rebalance_frequency'):
+        params['rebalance_frequency'] = request.rebalance_frequency
+    return bt.run(**params)
+
+def summarize_stats(request: BacktestRequest, result) -> Dict[str, Any]:
+    """Headline figures of a backtest run"""
+    return {
+        "start_date": request.start_date,
+        "end_date": request.end_date,
+        "initial_capital": request.initial_capital,
+        "final_value": float(result['Equity Final [$]']),
+        "total_return_pct": float(result['Return [%]']),
+        "annual_return_pct": float(result.get('Return (Ann.) [%]', 0)),
+        "volatility_pct": float(result.get('Volatility (Ann.) [%]', 0)),
+        "sharpe_ratio": float(result.get('Sharpe Ratio', 0)),
+        "max_drawdown_pct": float(result['Max. Drawdown [%]']),
+        "win_rate_pct": float(result.get('Win Rate [%]', 0)),
+        "num_trades": int(result.get('# Trades', 0))
+    }
+
+def backtest_payload(request: BacktestRequest, result, symbols: List[str],
+                     weights: np.ndarray, panel: pd.DataFrame) -> Dict[str, Any]:
+    """
+    Everything the responses need from a run, small enough to cache:
+    summary, portfolio, equity curve and trade log frames
+    """
+    return {
+        "summary": summarize_stats(request, result),
+        "portfolio": {
+            "symbols": symbols,
+            "weights": weights.round(6).tolist(),
+            "rebalance_frequency": request.rebalance_frequency,
+            "rebalance_count": int(len(rebalance_starts(panel.index, request.rebalance_frequency)) - 1)
+        },
+        "equity_curve": result._equity_curve[['Equity', 'DrawdownPct']],
+        "trades": result._trades
+    }
+
+def format_backtest_result(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Format results for frontend (verbose layout)"""
+    equity_curve = payload["equity_curve"]
+    return {
+        "summary": payload["summary"],
+        "portfolio": payload["portfolio"],
+        "equity_curve": {
+            "dates": np.datetime_as_string(equity_curve.index.values, unit="s").tolist(),
+            "values": equity_curve['Equity'].tolist(),
+            "drawdown": equity_curve['DrawdownPct'].tolist()
+        },
+        "trades": format_trades(payload["trades"])
+    }
+
+def compact_backtest_result(payload: Dict[str, Any], delta: bool = True, compression: str = "auto") -> Dict[str, Any]:
+    """
+    Format results as encoded columns: epoch-day int32 dates (delta-encoded
+    when delta is set) and float32 values, compressed above a size threshold.
+    See backtest_encoding.decode_table for the reference decoder.
+    """
+    equity_curve = payload["equity_curve"]
+    return {
+        "format": COMPACT_FORMAT,
+        "summary": payload["summary"],
+        "portfolio": payload["portfolio"],
+        "equity_curve": encode_table({
+            "dates": (epoch_days(equity_curve.index), np.int32),
+            "values": (equity_curve['Equity'].to_numpy(dtype=np.float64), np.float32),
+            "drawdown": (equity_curve['DrawdownPct'].to_numpy(dtype=np.float64), np.float32)
+        }, len(equity_curve), delta, compression),
+        "trades": compact_trades(payload["trades"], delta, compression)
+    }
+
+def check_response_format(response_format: str, compression: str) -> None:
+    if response_format not in RESPONSE_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Format '{response_format}' not supported. Available: {list(RESPONSE_FORMATS)}"
+        )
+    if compression not in COMPRESSIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Compression '{compression}' not supported. Available: {list(COMPRESSIONS)}"
+        )
+    if compression == "br" and not BROTLI_AVAILABLE:
+        raise HTTPException(status_code=400, detail="Brotli compression unavailable. Please install brotli")
+
+def render_backtest_result(payload: Dict[str, Any], response_format: str = "verbose",
+                           delta: bool = True, compression: str = "auto") -> Dict[str, Any]:
+    if response_format == "compact":
+        return compact_backtest_result(payload, delta, compression)
+    return format_backtest_result(payload)
+
+# Code whose output ends up in cached results; editing any of it invalidates the cache
+RESULT_PIPELINE = (
+    _generate_sample_data.__wrapped__, load_price_panel, rebalance_starts, build_portfolio_ohlc,
+    create_backtest, execute_backtest, summarize_stats, backtest_payload, IndicatorCache
+)
+
+@functools.lru_cache(maxsize=None)
+def strategy_code_version(strategy_class) -> str:
+    """Version of a strategy: its own source, its bases' and the data/backtest pipeline's"""
+    own_classes = [cls for cls in strategy_class.__mro__ if cls.__module__ == strategy_class.__module__]
+    return code_version(f"backtesting {backtesting.__version__}", *own_classes, *RESULT_PIPELINE)
+
+def backtest_cache_key(request: BacktestRequest, symbols: List[str], weights: np.ndarray) -> str:
+    """
+    Hash of the normalized request: merged and sorted legs, normalized weights,
+    ISO dates and the effective seed, so equivalent requests share one entry
+    """
+    legs = sorted(zip(symbols, np.round(weights, 9).tolist()))
+    normalized = {
+        "strategy": request.strategy,
+        "assets": legs,
+        "start_date": pd.to_datetime(request.start_date).normalize().date().isoformat(),
+        "end_date": pd.to_datetime(request.end_date).normalize().date().isoformat(),
+        "initial_capital": float(request.initial_capital),
+        "rebalance_frequency": request.rebalance_frequency,
+        "seed": DEFAULT_SAMPLE_SEED if request.seed is None else request.seed
+    }
+    return request_key(normalized, strategy_code_version(STRATEGIES[request.strategy]))
+
+def run_and_cache(request: BacktestRequest, key: str, data: pd.DataFrame, symbols: List[str],
+                  weights: np.ndarray, panel: pd.DataFrame, job: BacktestJob) -> Dict[str, Any]:
+    """Job body: run the backtest, then store its payload under key"""
+    result = execute_backtest(request, data, job)
+    payload = backtest_payload(request, result, symbols, weights, panel)
+    result_cache.set(key, payload)
+    return payload
+
+def validate_bootstrap(options: Optional[BootstrapOptions]) -> None:
+    if options is None:
+        return
+    if not 1 <= options.samples <= MAX_BOOTSTRAP_SAMPLES:
+        raise HTTPException(status_code=400, detail=f"Bootstrap samples must be between 1 and {MAX_BOOTSTRAP_SAMPLES}")
+    if options.block_size < 1 or options.trade_block_size < 1:
+        raise HTTPException(status_code=400, detail="Bootstrap block sizes must be at least 1")
+    if not options.percentiles or any(not 0 <= p <= 100 for p in options.percentiles):
+        raise HTTPException(status_code=400, detail="Bootstrap percentiles must be between 0 and 100")
+
+def bootstrap_payload(payload: Dict[str, Any], options: BootstrapOptions) -> Dict[str, Any]:
+    """
+    Percentile bands from block-bootstrap resamples of the daily equity returns
+    (final equity, max drawdown, Sharpe) and of the trade PnLs (final equity, max drawdown)
+    """
+    rng = np.random.default_rng(options.seed)
+    memory_bytes = BOOTSTRAP_MEMORY_MB * 2**20
+    initial = payload["summary"]["initial_capital"]
+    equity = payload["equity_curve"]['Equity'].to_numpy(dtype=np.float64)
+    returns = equity[1:] / equity[:-1] - 1
+    trades = payload["trades"]
+    pnl = trades['PnL'].to_numpy(dtype=np.float64) if trades is not None else np.empty(0)
+    
+    return {
+        "samples": options.samples,
+        "block_size": options.block_size,
+        "trade_block_size": options.trade_block_size,
+        "returns": bootstrap_returns(
+            returns, initial, options.samples, options.block_size, rng, memory_bytes, options.percentiles
+        ) if len(returns) > 1 else None,
+        "trades": bootstrap_trades(
+            pnl, initial, options.samples, options.trade_block_size, rng, memory_bytes, options.percentiles
+        ) if len(pnl) else None
+    }
+
+def job_description(request: BacktestRequest) -> Dict[str, Any]:
+    return {
+        "strategy": request.strategy,
+        "symbols": [asset.symbol for asset in request.assets],
+        "start_date": request.start_date,
+        "end_date": request.end_date
+    }
+
+def walk_forward_fold(strategy_name: str, cash: float, maximize: str,
+                      candidates: List[Dict[str, Any]], fold: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    One walk-forward fold on the price data shared with the worker pool:
+    pick the best candidate on the training window, then trade it on the test window
+    """
+    data = worker_frame("prices")
+    strategy_class = STRATEGIES[strategy_name]
+    
+    train = data.iloc[fold["train"][0]:fold["train"][1]]
+    best_params, best_score = candidates[0], -np.inf
+    for params in candidates:
+        score = create_backtest(train, strategy_class, cash).run(**params).get(maximize)
+        score = float(score) if score is not None else float("nan")
+        if not np.isnan(score) and score > best_score:
+            best_params, best_score = params, score
+    
+    # Test run starts warmup bars early; only the test window is kept
+    test_start, test_end = fold["test"]
+    stats = create_backtest(data.iloc[fold["test_from"]:test_end], strategy_class, cash).run(**best_params)
+    equity = stats._equity_curve['Equity'].iloc[test_start - fold["test_from"]:]
+    trades = stats._trades
+    test_trades = int((trades['ExitTime'] >= equity.index[0]).sum()) if trades is not None else 0
+    
+    return {
+        "fold": fold["fold"],
+        "train_start": train.index[0].date().isoformat(),
+        "train_end": train.index[-1].date().isoformat(),
+        "test_start": equity.index[0].date().isoformat(),
+        "test_end": equity.index[-1].date().isoformat(),
+        "best_params": best_params,
+        "train_score": best_score if np.isfinite(best_score) else None,
+        "test": {**equity_stats(equity), "num_trades": test_trades},
+        "equity": equity
+    }
+
+def run_batch_spec(index: int, request: BacktestRequest, symbols: List[str], weights: np.ndarray,
+                   params: Dict[str, Any]) -> Dict[str, Any]:
+    """One /batch spec, traded on its legs of the panel shared with the worker pool"""
+    start_time = datetime.now()
+    data = trade_data(worker_frame("panel"), symbols, weights, request.rebalance_frequency)
+    strategy_class = STRATEGIES[request.strategy]
+    run_params = dict(params)
+    if hasattr(strategy_class, 'rebalance_frequency'):
+        run_params.setdefault('rebalance_frequency', request.rebalance_frequency)
+    stats = create_backtest(data, strategy_class, request.initial_capital).run(**run_params)
+    summary = summarize_stats(request, stats)
+    return {
+        "index": index,
+        # NaN (e.g. win rate without trades) is not valid JSON
+        "summary": {key: None if isinstance(value, float) and np.isnan(value) else value for key, value in summary.items()},
+        "execution_time": (datetime.now() - start_time).total_seconds()
+    }
+
 @backtest_router.get("/health")
 async def health_check():
     """Health check endpoint for backtest service"""
@@ -179,7 +761,10 @@ async def health_check():
         "status": "healthy",
         "backtesting_available": BACKTESTING_AVAILABLE,
         "timestamp": datetime.now().isoformat(),
-        "strategies": list(STRATEGIES.keys())
+        "strategies": list(STRATEGIES.keys()),
+        "active_jobs": job_manager.active(),
+        "result_cache": result_cache.stats(),
+        "indicator_cache": indicator_cache.stats()
     }
 
 @backtest_router.get("/strategies")
@@ -196,9 +781,17 @@ async def get_strategies():
     }
 
 @backtest_router.post("/run", response_model=BacktestResult)
-async def run_backtest(request: BacktestRequest):
+async def run_backtest(request: BacktestRequest, http_request: Request,
+                       response_format: str = Query("verbose", alias="format"),
+                       delta: bool = True, compression: str = "auto"):
     """
     Run a backtest with the specified parameters
+    
+    Send Accept: application/x-ndjson or application/vnd.apache.arrow.stream
+    to stream the full equity curve and trade log instead of a JSON body.
+    format=compact returns encoded columns (epoch-day int32 dates, float32
+    values) instead of lists; delta and compression (auto, gzip, br, none)
+    tune the encoding
     """
     if not BACKTESTING_AVAILABLE:
         raise HTTPException(
@@ -206,105 +799,160 @@ async def run_backtest(request: BacktestRequest):
             detail="Backtesting service unavailable. Please install backtesting.py"
         )
     
+    stream_type = negotiate_stream(http_request.headers.get("accept"))
+    if stream_type == ARROW_MEDIA_TYPE and not ARROW_AVAILABLE:
+        raise HTTPException(status_code=406, detail="Arrow streaming unavailable. Please install pyarrow")
+    check_response_format(response_format, compression)
+    validate_bootstrap(request.bootstrap)
+    
     start_time = datetime.now()
     
     try:
-        # Validate strategy
-        if request.strategy not in STRATEGIES:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Strategy '{request.strategy}' not found. Available: {list(STRATEGIES.keys())}"
+        symbols, weights = validate_backtest_request(request)
+        key = backtest_cache_key(request, symbols, weights)
+        payload = result_cache.get(key)
+        cache_hit = payload is not None
+        
+        if not cache_hit:
+            # Data is generated in a worker thread, the backtest on the job pool: both off the event loop
+            data, panel = await asyncio.to_thread(load_backtest_data, request, symbols, weights)
+            
+            job = job_manager.submit(
+                functools.partial(run_and_cache, request, key, data, symbols, weights, panel),
+                {**job_description(request), "source": "run"}
             )
+            await job.future
+            if job.status == JOB_FAILED:
+                raise RuntimeError(job.error)
+            if job.status == JOB_CANCELLED:
+                raise RuntimeError("Backtest cancelled")
+            payload = job.result
         
-        # Validate assets
-        if not request.assets:
-            raise HTTPException(status_code=400, detail="At least one asset is required")
+        # Resample in a worker thread; resamples are cheap next to a run, so they are not cached
+        bootstrap = None
+        if request.bootstrap:
+            bootstrap = await asyncio.to_thread(bootstrap_payload, payload, request.bootstrap)
         
-        total_weight = sum(asset.weight for asset in request.assets)
-        if abs(total_weight - 1.0) > 0.01:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Asset weights must sum to 1.0, got {total_weight}"
+        # Calculate execution time
+        execution_time = (datetime.now() - start_time).total_seconds()
+        
+        if stream_type:
+            header = {
+                "success": True, "summary": payload["summary"],
+                "execution_time": execution_time, "cache_hit": cache_hit
+            }
+            if bootstrap:
+                header["bootstrap"] = bootstrap
+            stream = stream_arrow_result if stream_type == ARROW_MEDIA_TYPE else stream_ndjson_result
+            return StreamingResponse(
+                stream(header, payload["equity_curve"], payload["trades"]),
+                media_type=stream_type
             )
         
-        # For MVP, use the first asset for backtesting
-        # In production, implement portfolio-level backtesting
-        primary_asset = request.assets[0]
+        formatted_result = render_backtest_result(payload, response_format, delta, compression)
+        if bootstrap:
+            formatted_result["bootstrap"] = bootstrap
         
-        # Get market data
-        data = get_sample_data(
-            symbol=primary_asset.symbol,
-            start_date=request.start_date,
-            end_date=request.end_date
+        logger.info(f"Backtest completed successfully in {execution_time:.2f}s (cache hit: {cache_hit})")
+        
+        return BacktestResult(
+            success=True,
+            data=formatted_result,
+            execution_time=execution_time,
+            cache_hit=cache_hit
         )
         
-        if data.empty:
-            raise HTTPException(status_code=400, detail="No data available for the specified period")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Backtest error: {e}")
+        execution_time = (datetime.now() - start_time).total_seconds()
         
-        # Initialize strategy
+        return BacktestResult(
+            success=False,
+            error=str(e),
+            execution_time=execution_time
+        )
+
+@backtest_router.post("/optimize", response_model=BacktestResult)
+async def optimize_strategy(request: OptimizeRequest):
+    """
+    Search strategy parameters over param_grid on the shared process pool
+    
+    method: grid (every combination), random (max_evaluations samples) or
+    successive_halving (short trailing windows first, best third promoted).
+    Workers share one copy of the price data; constraint filters combinations,
+    e.g. "short_window < long_window". Results are ranked by the maximize stat.
+    """
+    if not BACKTESTING_AVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail="Backtesting service unavailable. Please install backtesting.py"
+        )
+    
+    start_time = datetime.now()
+    
+    try:
+        data, symbols, weights, panel = await asyncio.to_thread(prepare_backtest_data, request)
         strategy_class = STRATEGIES[request.strategy]
         
-        # Run backtest
-        bt = Backtest(
-            data,
-            strategy_class,
-            cash=request.initial_capital,
-            commission=0.002,  # 0.2% commission
-            exclusive_orders=True
+        if not request.param_grid:
+            raise HTTPException(status_code=400, detail="param_grid must define at least one parameter")
+        
+        unknown = [name for name in request.param_grid if not hasattr(strategy_class, name)]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown parameters for {request.strategy}: {unknown}"
+            )
+        
+        try:
+            candidates = candidate_params(
+                request.param_grid, request.method, request.max_evaluations,
+                request.constraint, request.search_seed
+            )
+        except (ValueError, SyntaxError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid search: {e}")
+        
+        if not candidates:
+            raise HTTPException(status_code=400, detail="No parameter combination satisfies the constraint")
+        
+        evaluate = functools.partial(
+            evaluate_strategy_params, request.strategy, request.initial_capital, request.maximize
         )
+        workers = min(request.max_workers or default_workers(), len(candidates))
         
-        # Add strategy parameters
-        result = bt.run(rebalance_frequency=request.rebalance_frequency)
+        with SharedDataPool({"prices": data}, max_workers=workers) as pool:
+            search = await run_search(pool, evaluate, candidates, request.method, len(data))
         
-        # Calculate execution time
+        ranked = search["results"]
         execution_time = (datetime.now() - start_time).total_seconds()
         
-        # Format results for frontend
-        formatted_result = {
-            "summary": {
-                "start_date": request.start_date,
-                "end_date": request.end_date,
-                "initial_capital": request.initial_capital,
-                "final_value": float(result['End']),
-                "total_return_pct": float(result['Return [%]']),
-                "annual_return_pct": float(result.get('Return (Ann.) [%]', 0)),
-                "volatility_pct": float(result.get('Volatility (Ann.) [%]', 0)),
-                "sharpe_ratio": float(result.get('Sharpe Ratio', 0)),
-                "max_drawdown_pct": float(result['Max. Drawdown [%]']),
-                "win_rate_pct": float(result.get('Win Rate [%]', 0)),
-                "num_trades": int(result.get('# Trades', 0))
-            },
-            "equity_curve": {
-                "dates": [date.isoformat() for date in result._equity_curve.index],
-                "values": result._equity_curve['Equity'].tolist(),
-                "drawdown": result._equity_curve['DrawdownPct'].tolist()
-            },
-            "trades": [
-                {
-                    "entry_date": trade.entry_time.isoformat() if hasattr(trade, 'entry_time') else None,
-                    "exit_date": trade.exit_time.isoformat() if hasattr(trade, 'exit_time') else None,
-                    "size": float(trade.size) if hasattr(trade, 'size') else 0,
-                    "entry_price": float(trade.entry_price) if hasattr(trade, 'entry_price') else 0,
-                    "exit_price": float(trade.exit_price) if hasattr(trade, 'exit_price') else 0,
-                    "pnl": float(trade.pnl) if hasattr(trade, 'pnl') else 0,
-                    "return_pct": float(trade.pnl_pct) if hasattr(trade, 'pnl_pct') else 0
-                }
-                for trade in result._trades
-            ] if hasattr(result, '_trades') else []
-        }
-        
-        logger.info(f"Backtest completed successfully in {execution_time:.2f}s")
+        logger.info(
+            f"Optimization of {request.strategy} completed: {search['evaluations']} evaluations "
+            f"on {workers} workers in {execution_time:.2f}s"
+        )
         
         return BacktestResult(
             success=True,
-            data=formatted_result,
+            data={
+                "strategy": request.strategy,
+                "method": request.method,
+                "maximize": request.maximize,
+                "evaluations": search["evaluations"],
+                "rungs": search["rungs"],
+                "workers": workers,
+                "best_params": ranked[0]["params"],
+                "best_score": ranked[0]["score"],
+                "results": ranked[:request.top_n]
+            },
             execution_time=execution_time
         )
         
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Backtest error: {e}")
+        logger.error(f"Optimization error: {e}")
         execution_time = (datetime.now() - start_time).total_seconds()
         
         return BacktestResult(
@@ -313,16 +961,358 @@ async def run_backtest(request: BacktestRequest):
             execution_time=execution_time
         )
 
-@backtest_router.post("/optimize")
-async def optimize_strategy(request: BacktestRequest):
+def run_backtest_job(request: BacktestRequest, key: str, symbols: List[str], weights: np.ndarray,
+                     job: BacktestJob) -> Dict[str, Any]:
+    """Job body for /jobs: the cached or freshly run backtest, rendered when polled"""
+    start_time = datetime.now()
+    payload = result_cache.get(key)
+    cache_hit = payload is not None
+    if not cache_hit:
+        data, panel = load_backtest_data(request, symbols, weights)
+        payload = run_and_cache(request, key, data, symbols, weights, panel, job)
+    job.check_cancelled()
+    return {
+        "payload": payload,
+        "bootstrap": bootstrap_payload(payload, request.bootstrap) if request.bootstrap else None,
+        "execution_time": (datetime.now() - start_time).total_seconds(),
+        "cache_hit": cache_hit
+    }
+
+def job_state(job: BacktestJob, response_format: str = "verbose", delta: bool = True,
+              compression: str = "auto") -> Dict[str, Any]:
+    """Job snapshot, with the BacktestResult once the job has completed"""
+    state = job.snapshot(include_result=False)
+    if job.status == JOB_COMPLETED:
+        data = render_backtest_result(job.result["payload"], response_format, delta, compression)
+        if job.result["bootstrap"]:
+            data["bootstrap"] = job.result["bootstrap"]
+        state["result"] = BacktestResult(
+            success=True,
+            data=data,
+            execution_time=job.result["execution_time"],
+            cache_hit=job.result["cache_hit"]
+        ).model_dump()
+    return state
+
+def get_job_or_404(job_id: str) -> BacktestJob:
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job
+
+@backtest_router.post("/jobs", status_code=202)
+async def submit_backtest_job(request: BacktestRequest):
     """
-    Optimize strategy parameters (placeholder for future implementation)
+    Queue a backtest and return its job id immediately
+    
+    Poll GET /jobs/{job_id} or subscribe to GET /jobs/{job_id}/events (SSE)
+    for progress and the final BacktestResult; DELETE /jobs/{job_id} cancels
     """
+    if not BACKTESTING_AVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail="Backtesting service unavailable. Please install backtesting.py"
+        )
+    
+    symbols, weights = validate_backtest_request(request)
+    validate_bootstrap(request.bootstrap)
+    job = job_manager.submit(
+        functools.partial(run_backtest_job, request, backtest_cache_key(request, symbols, weights), symbols, weights),
+        job_description(request)
+    )
+    logger.info(f"Backtest job {job.id} queued ({job_manager.active()} active)")
+    
     return {
-        "message": "Strategy optimization not yet implemented",
-        "status": "coming_soon"
+        **job_state(job),
+        "status_url": f"{backtest_router.prefix}/jobs/{job.id}",
+        "events_url": f"{backtest_router.prefix}/jobs/{job.id}/events"
     }
 
+@backtest_router.get("/jobs/{job_id}")
+async def get_backtest_job(job_id: str, response_format: str = Query("verbose", alias="format"),
+                           delta: bool = True, compression: str = "auto"):
+    """
+    Status, progress (0-1) and, once completed, the BacktestResult of a job
+    format, delta and compression select the result layout as for /run
+    """
+    check_response_format(response_format, compression)
+    return job_state(get_job_or_404(job_id), response_format, delta, compression)
+
+@backtest_router.get("/jobs/{job_id}/events")
+async def backtest_job_events(job_id: str, http_request: Request,
+                              response_format: str = Query("verbose", alias="format"),
+                              delta: bool = True, compression: str = "auto"):
+    """
+    Server-sent events for a job: "progress" events while it is queued or
+    running, then one final event named after its status (completed events
+    carry the BacktestResult)
+    """
+    check_response_format(response_format, compression)
+    job = get_job_or_404(job_id)
+    
+    async def events():
+        last = None
+        while True:
+            if await http_request.is_disconnected():
+                return
+            if job.done:
+                yield f"event: {job.status}\ndata: {json_dumps(job_state(job, response_format, delta, compression))}\n\n"
+                return
+            state = (job.status, round(job.progress, 3))
+            if state != last:
+                last = state
+                yield f"event: progress\ndata: {json_dumps(job.snapshot(include_result=False))}\n\n"
+            await asyncio.sleep(JOB_EVENT_INTERVAL)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@backtest_router.delete("/jobs/{job_id}")
+async def cancel_backtest_job(job_id: str):
+    """Cancel a queued or running job; running backtests stop at their next bar"""
+    get_job_or_404(job_id)
+    job = job_manager.cancel(job_id)
+    if job.done and job.status != JOB_CANCELLED:
+        return JSONResponse(status_code=409, content={**job.snapshot(include_result=False), "detail": f"Job already {job.status}"})
+    return job.snapshot(include_result=False)
+
+@backtest_router.on_event("shutdown")
+async def shutdown_jobs():
+    job_manager.shutdown()
+    shutdown_executor()
+
+@backtest_router.post("/batch")
+async def run_batch(request: BatchRequest):
+    """
+    Run many (strategy, allocation, params) specs over one period
+    
+    The union of all symbols is loaded once and shared with a process pool.
+    The response is NDJSON: one {"type": "result"} (or "error") line per spec
+    as soon as it completes, then a {"type": "summary"} line with the
+    comparison table ordered by rank_by.
+    """
+    if not BACKTESTING_AVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail="Backtesting service unavailable. Please install backtesting.py"
+        )
+    if not request.specs:
+        raise HTTPException(status_code=400, detail="At least one spec is required")
+    if len(request.specs) > MAX_BATCH_SPECS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SPECS} specs per batch")
+    
+    start_time = datetime.now()
+    
+    # Validate every spec up front so the stream only carries run outcomes
+    runs = []
+    for index, spec in enumerate(request.specs):
+        spec_request = BacktestRequest(
+            initial_capital=request.initial_capital,
+            assets=spec.assets,
+            strategy=spec.strategy,
+            start_date=request.start_date,
+            end_date=request.end_date,
+            rebalance_frequency=spec.rebalance_frequency,
+            seed=request.seed
+        )
+        try:
+            symbols, weights = validate_backtest_request(spec_request)
+        except HTTPException as e:
+            raise HTTPException(status_code=400, detail=f"Spec {index}: {e.detail}")
+        unknown = [name for name in spec.params if not hasattr(STRATEGIES[spec.strategy], name)]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Spec {index}: unknown parameters for {spec.strategy}: {unknown}")
+        runs.append((index, spec, spec_request, symbols, weights))
+    
+    union = list(dict.fromkeys(symbol for _, _, _, symbols, _ in runs for symbol in symbols))
+    panel = await asyncio.to_thread(load_price_panel, union, request.start_date, request.end_date, request.seed)
+    if panel.empty:
+        raise HTTPException(status_code=400, detail="No data available for the specified period")
+    
+    workers = min(request.max_workers or default_workers(), len(runs))
+    
+    def describe(index: int) -> Dict[str, Any]:
+        _, spec, spec_request, symbols, weights = runs[index]
+        return {
+            "index": index,
+            "name": spec.name or f"{spec.strategy} #{index}",
+            "strategy": spec.strategy,
+            "symbols": symbols,
+            "weights": weights.round(6).tolist(),
+            "rebalance_frequency": spec.rebalance_frequency,
+            "params": spec.params
+        }
+    
+    async def outcome(index: int, future) -> Dict[str, Any]:
+        try:
+            return await asyncio.wrap_future(future)
+        except Exception as e:
+            logger.error(f"Batch spec {index} failed: {e}")
+            return {"index": index, "error": str(e)}
+    
+    async def results() -> AsyncIterator[bytes]:
+        completed = []
+        failed = 0
+        with SharedDataPool({"panel": panel}, max_workers=workers) as pool:
+            pending = [
+                asyncio.ensure_future(
+                    outcome(index, pool.submit(run_batch_spec, index, spec_request, symbols, weights, spec.params))
+                )
+                for index, spec, spec_request, symbols, weights in runs
+            ]
+            try:
+                for next_done in asyncio.as_completed(pending):
+                    result = await next_done
+                    if "error" in result:
+                        failed += 1
+                        line = {"type": "error", **describe(result["index"]), "error": result["error"]}
+                    else:
+                        line = {"type": "result", **describe(result["index"]), **result}
+                        completed.append(line)
+                    yield json_line(line)
+            finally:
+                # Client gone (GeneratorExit or cancellation): stop waiting for the remaining
+                # specs; leaving the pool block cancels those not started without waiting
+                for task in pending:
+                    task.cancel()
+        
+        def rank_key(line: Dict[str, Any]) -> float:
+            value = line["summary"].get(request.rank_by)
+            return value if isinstance(value, (int, float)) and not np.isnan(value) else -np.inf
+        
+        completed.sort(key=rank_key, reverse=True)
+        table = [
+            {
+                "rank": rank + 1,
+                "index": line["index"],
+                "name": line["name"],
+                "strategy": line["strategy"],
+                **{
+                    field: line["summary"][field]
+                    for field in ("total_return_pct", "annual_return_pct", "volatility_pct",
+                                  "sharpe_ratio", "max_drawdown_pct", "win_rate_pct", "num_trades")
+                }
+            }
+            for rank, line in enumerate(completed)
+        ]
+        execution_time = (datetime.now() - start_time).total_seconds()
+        logger.info(f"Batch of {len(runs)} specs completed on {workers} workers in {execution_time:.2f}s")
+        yield json_line({
+            "type": "summary",
+            "rank_by": request.rank_by,
+            "completed": len(completed),
+            "failed": failed,
+            "symbols": union,
+            "workers": workers,
+            "execution_time": execution_time,
+            "table": table
+        })
+    
+    return StreamingResponse(results(), media_type=NDJSON_MEDIA_TYPE)
+
+@backtest_router.post("/walk-forward", response_model=BacktestResult)
+async def walk_forward(request: WalkForwardRequest):
+    """
+    Walk-forward validation: for each fold, search param_grid on training
+    window k and trade the best parameters on window k + 1
+    
+    Folds run in parallel on the shared process pool with one copy of the price data.
+    The response stitches the out-of-sample equity curves (each fold rebased on
+    the previous one) and lists the per-fold parameters and statistics.
+    """
+    if not BACKTESTING_AVAILABLE:
+        raise HTTPException(
+            status_code=503,
+            detail="Backtesting service unavailable. Please install backtesting.py"
+        )
+    
+    start_time = datetime.now()
+    
+    try:
+        data, symbols, weights, panel = await asyncio.to_thread(prepare_backtest_data, request)
+        strategy_class = STRATEGIES[request.strategy]
+        
+        unknown = [name for name in request.param_grid if not hasattr(strategy_class, name)]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown parameters for {request.strategy}: {unknown}"
+            )
+        if request.method == "successive_halving":
+            raise HTTPException(status_code=400, detail="Walk-forward supports the grid and random methods")
+        
+        try:
+            # An empty grid walks the strategy's default parameters forward
+            candidates = candidate_params(
+                request.param_grid, request.method, request.max_evaluations,
+                request.constraint, request.search_seed
+            )
+            windows = walk_forward_windows(len(data), request.folds, request.anchored, max(request.warmup_bars, 0))
+        except (ValueError, SyntaxError) as e:
+            raise HTTPException(status_code=400, detail=f"Invalid walk-forward: {e}")
+        
+        if not candidates:
+            raise HTTPException(status_code=400, detail="No parameter combination satisfies the constraint")
+        
+        evaluate = functools.partial(
+            walk_forward_fold, request.strategy, request.initial_capital, request.maximize, candidates
+        )
+        workers = min(request.max_workers or default_workers(), len(windows))
+        
+        with SharedDataPool({"prices": data}, max_workers=workers) as pool:
+            folds = list(await asyncio.gather(
+                *(asyncio.wrap_future(pool.submit(evaluate, window)) for window in windows)
+            ))
+        
+        folds.sort(key=lambda fold: fold["fold"])
+        equity = stitch_equity([fold.pop("equity") for fold in folds], request.initial_capital)
+        scores = [fold["train_score"] for fold in folds if fold["train_score"] is not None]
+        execution_time = (datetime.now() - start_time).total_seconds()
+        
+        logger.info(
+            f"Walk-forward of {request.strategy} completed: {len(folds)} folds x {len(candidates)} "
+            f"candidates on {workers} workers in {execution_time:.2f}s"
+        )
+        
+        return BacktestResult(
+            success=True,
+            data={
+                "strategy": request.strategy,
+                "method": request.method,
+                "maximize": request.maximize,
+                "anchored": request.anchored,
+                "candidates": len(candidates),
+                "workers": workers,
+                "out_of_sample": {
+                    **equity_stats(equity),
+                    "final_value": float(equity.iloc[-1]),
+                    "num_trades": sum(fold["test"]["num_trades"] for fold in folds),
+                    "mean_train_score": float(np.mean(scores)) if scores else None
+                },
+                "folds": folds,
+                "equity_curve": {
+                    "dates": np.datetime_as_string(equity.index.values, unit="s").tolist(),
+                    "values": equity.tolist()
+                }
+            },
+            execution_time=execution_time
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Walk-forward error: {e}")
+        execution_time = (datetime.now() - start_time).total_seconds()
+        
+        return BacktestResult(
+            success=False,
+            error=str(e),
+            execution_time=execution_time
+        )
+
 # Export router for inclusion in main FastAPI app
 __all__ = ["backtest_router"]
 
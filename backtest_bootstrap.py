@@ -0,0 +1,93 @@
+"""
+WOW V1 - Bootstrap confidence intervals
+Circular block bootstrap of daily equity returns and of trade PnLs, computed
+as batched 2D array operations in chunks that fit a memory budget
+"""
+
+import math
+from typing import Dict, Iterator, Optional, Sequence
+
+import numpy as np
+
+TRADING_DAYS = 252
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+# float64 matrices alive at once per resampled row (indices, returns, wealth, peak)
+_MATRICES_PER_ROW = 4
+
+
+def chunk_sizes(samples: int, row_length: int, memory_bytes: int) -> Iterator[int]:
+    """Number of resamples per batch so that one batch stays within memory_bytes"""
+    per_row = max(row_length, 1) * 8 * _MATRICES_PER_ROW
+    rows = max(1, min(samples, memory_bytes // per_row))
+    for start in range(0, samples, rows):
+        yield min(rows, samples - start)
+
+
+def block_bootstrap_indices(rng: np.random.Generator, n: int, samples: int, block_size: int) -> np.ndarray:
+    """
+    (samples, n) indices of circular block-bootstrap resamples: blocks of
+    block_size consecutive positions (wrapping around) starting at random offsets
+    """
+    block_size = max(1, min(block_size, n))
+    n_blocks = -(-n // block_size)
+    starts = rng.integers(0, n, size=(samples, n_blocks, 1))
+    indices = (starts + np.arange(block_size)) % n
+    return indices.reshape(samples, n_blocks * block_size)[:, :n]
+
+
+def _bands(values: np.ndarray, percentiles: Sequence[float]) -> Dict[str, Optional[float]]:
+    finite = values[np.isfinite(values)]
+    if not len(finite):
+        return {f"p{p:g}": None for p in percentiles}
+    return {f"p{p:g}": float(v) for p, v in zip(percentiles, np.percentile(finite, percentiles))}
+
+
+def bootstrap_returns(returns: np.ndarray, initial_value: float, samples: int, block_size: int,
+                      rng: np.random.Generator, memory_bytes: int,
+                      percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, Dict[str, Optional[float]]]:
+    """Percentile bands of final equity, max drawdown (%) and annualized Sharpe over resampled return paths"""
+    n = len(returns)
+    final = np.empty(samples)
+    drawdown = np.empty(samples)
+    sharpe = np.empty(samples)
+    done = 0
+    for rows in chunk_sizes(samples, n, memory_bytes):
+        resampled = returns[block_bootstrap_indices(rng, n, rows, block_size)]
+        mean = resampled.mean(axis=1)
+        std = resampled.std(axis=1, ddof=1) if n > 1 else np.zeros(rows)
+        wealth = np.cumprod(1.0 + resampled, axis=1)
+        peak = np.maximum(np.maximum.accumulate(wealth, axis=1), 1.0)
+        batch = slice(done, done + rows)
+        final[batch] = initial_value * wealth[:, -1]
+        drawdown[batch] = np.minimum((wealth / peak).min(axis=1) - 1.0, 0.0) * 100
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sharpe[batch] = np.where(std > 0, mean / std * math.sqrt(TRADING_DAYS), np.nan)
+        done += rows
+    return {
+        "final_equity": _bands(final, percentiles),
+        "max_drawdown_pct": _bands(drawdown, percentiles),
+        "sharpe_ratio": _bands(sharpe, percentiles)
+    }
+
+
+def bootstrap_trades(pnl: np.ndarray, initial_value: float, samples: int, block_size: int,
+                     rng: np.random.Generator, memory_bytes: int,
+                     percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, Dict[str, Optional[float]]]:
+    """Percentile bands of final equity and max drawdown (%) over resampled trade sequences"""
+    n = len(pnl)
+    final = np.empty(samples)
+    drawdown = np.empty(samples)
+    done = 0
+    for rows in chunk_sizes(samples, n, memory_bytes):
+        equity = initial_value + np.cumsum(pnl[block_bootstrap_indices(rng, n, rows, block_size)], axis=1)
+        peak = np.maximum(np.maximum.accumulate(equity, axis=1), initial_value)
+        batch = slice(done, done + rows)
+        final[batch] = equity[:, -1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Losing more than the peak equity is reported as a total loss
+            drawdown[batch] = np.clip((equity / peak).min(axis=1) - 1.0, -1.0, 0.0) * 100
+        done += rows
+    return {
+        "final_equity": _bands(final, percentiles),
+        "max_drawdown_pct": _bands(drawdown, percentiles)
+    }
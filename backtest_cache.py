@@ -0,0 +1,149 @@
+"""
+WOW V1 - Backtest result cache
+Content-addressed: results are stored under a hash of the normalized request
+and of the code that produced them, in an in-memory LRU backed by SQLite
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of cached payloads changes
+CACHE_FORMAT_VERSION = 1
+
+
+def code_version(*objects: Any) -> str:
+    """
+    Digest of the source code of functions/classes (strings are taken as is,
+    e.g. library versions); changes whenever one of them is edited
+    """
+    digest = hashlib.sha256(str(CACHE_FORMAT_VERSION).encode())
+    for obj in objects:
+        if isinstance(obj, str):
+            digest.update(obj.encode())
+            continue
+        try:
+            source = inspect.getsource(obj)
+        except (OSError, TypeError):
+            # Compiled or builtin objects: fall back to their qualified name and version
+            source = f"{getattr(obj, '__module__', '')}.{getattr(obj, '__qualname__', obj)}"
+            source += str(getattr(obj, "__version__", ""))
+        digest.update(source.encode())
+    return digest.hexdigest()[:16]
+
+
+def request_key(normalized: Dict[str, Any], version: str) -> str:
+    """Content hash of a normalized request: canonical JSON (sorted keys, no whitespace) plus code version"""
+    canonical = json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{version}:{canonical}".encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier cache of picklable results
+
+    Memory: LRU bounded by the pickled size of its entries (memory_bytes)
+    Disk: zlib-compressed pickles in one SQLite table, least recently used
+    entries evicted beyond disk_bytes. path=None keeps the cache in memory only.
+    Safe to use from worker threads.
+    """
+
+    def __init__(self, path: Optional[str], memory_bytes: int = 64 * 2**20, disk_bytes: int = 512 * 2**20):
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._memory_used = 0
+        self._lock = threading.Lock()
+        self._db = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)")
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+            if self._db is None:
+                return None
+            row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+        blob = zlib.decompress(row[0])
+        value = pickle.loads(blob)
+        with self._lock:
+            self._remember(key, value, len(blob))
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        compressed = zlib.compress(blob, 6) if self._db is not None else None
+        with self._lock:
+            self._remember(key, value, len(blob))
+            if self._db is None:
+                return
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                (key, compressed, len(compressed), time.time())
+            )
+            self._evict_disk()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            disk_entries, disk_used = (0, 0)
+            if self._db is not None:
+                disk_entries, disk_used = self._db.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+                ).fetchone()
+            return {
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_used,
+                "disk_entries": disk_entries,
+                "disk_bytes": disk_used
+            }
+
+    def _remember(self, key: str, value: Any, size: int) -> None:
+        if size > self.memory_bytes:
+            return
+        if key in self._memory:
+            self._memory_used -= self._sizes[key]
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        self._sizes[key] = size
+        self._memory_used += size
+        while self._memory_used > self.memory_bytes:
+            old_key, _ = self._memory.popitem(last=False)
+            self._memory_used -= self._sizes.pop(old_key)
+
+    def _evict_disk(self) -> None:
+        used = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if used <= self.disk_bytes:
+            return
+        freed = 0
+        victims = []
+        for key, size in self._db.execute("SELECT key, size FROM results ORDER BY accessed"):
+            if used - freed <= self.disk_bytes:
+                break
+            victims.append((key,))
+            freed += size
+        self._db.executemany("DELETE FROM results WHERE key = ?", victims)
+        logger.info(f"Backtest cache evicted {len(victims)} entries ({freed} bytes) from disk")
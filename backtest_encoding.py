@@ -0,0 +1,98 @@
+"""
+WOW V1 - Compact columnar encoding
+Numeric columns as little-endian binary (epoch-day int32 dates, float32
+values), optionally delta-encoded and compressed, base64 in JSON
+"""
+
+import base64
+import gzip
+from typing import Any, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+COMPACT_FORMAT = "columnar-v1"
+COMPRESSIONS = ("auto", "gzip", "br", "none")
+# Columns smaller than this are sent uncompressed
+COMPRESS_MIN_BYTES = 4096
+# Epoch day used for missing dates (NaT)
+MISSING_DAY = np.iinfo(np.int32).min
+
+
+def epoch_days(values) -> np.ndarray:
+    """Days since 1970-01-01 as int32; NaT becomes MISSING_DAY"""
+    days = np.asarray(values, dtype="datetime64[ns]").astype("datetime64[D]")
+    result = days.astype(np.int64)
+    result[np.isnat(days)] = MISSING_DAY
+    return result.astype(np.int32)
+
+
+def _codec(compression: str) -> Optional[str]:
+    if compression == "auto":
+        return "br" if BROTLI_AVAILABLE else "gzip"
+    if compression == "br" and not BROTLI_AVAILABLE:
+        raise ValueError("Brotli compression unavailable. Please install brotli")
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression '{compression}'. Available: {list(COMPRESSIONS)}")
+    return None if compression == "none" else compression
+
+
+def encode_column(values, dtype, delta: bool = False, compression: str = "auto",
+                  min_bytes: int = COMPRESS_MIN_BYTES) -> Dict[str, Any]:
+    """
+    Encode one column: {"dtype", "delta", "compression", "data": base64}
+    Delta encoding (first value, then differences) only applies to integer columns,
+    where it is exact and turns daily dates into runs of small numbers
+    """
+    array = np.asarray(values).astype(np.dtype(dtype).newbyteorder("<"))
+    delta = delta and np.issubdtype(array.dtype, np.integer)
+    if delta and len(array):
+        array = np.diff(array, prepend=array.dtype.type(0))
+    raw = array.tobytes()
+    codec = _codec(compression) if len(raw) >= min_bytes else None
+    if codec == "br":
+        raw = brotli.compress(raw)
+    elif codec == "gzip":
+        raw = gzip.compress(raw, compresslevel=6, mtime=0)
+    return {
+        "dtype": array.dtype.name,
+        "delta": delta,
+        "compression": codec,
+        "data": base64.b64encode(raw).decode("ascii")
+    }
+
+
+def decode_column(column: Dict[str, Any]) -> np.ndarray:
+    """Inverse of encode_column (reference implementation for Python clients)"""
+    raw = base64.b64decode(column["data"])
+    if column["compression"] == "br":
+        raw = brotli.decompress(raw)
+    elif column["compression"] == "gzip":
+        raw = gzip.decompress(raw)
+    array = np.frombuffer(raw, dtype=np.dtype(column["dtype"]).newbyteorder("<"))
+    if column["delta"]:
+        array = np.cumsum(array, dtype=array.dtype)
+    return array
+
+
+def encode_table(columns: Dict[str, tuple], length: int, delta: bool = True,
+                 compression: str = "auto") -> Dict[str, Any]:
+    """Encode {name: (values, dtype)} columns of equal length"""
+    return {
+        "length": length,
+        "columns": {
+            name: encode_column(values, dtype, delta, compression)
+            for name, (values, dtype) in columns.items()
+        }
+    }
+
+
+def decode_table(table: Dict[str, Any]) -> pd.DataFrame:
+    """Decode an encode_table() result; date columns stay as epoch days"""
+    return pd.DataFrame({name: decode_column(column) for name, column in table["columns"].items()})
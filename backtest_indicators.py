@@ -0,0 +1,119 @@
+"""
+WOW V1 - Indicator cache
+Indicators keyed by (data fingerprint, indicator, params) and shared across
+strategy runs; moving averages of any window come from one cumulative sum
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Sequence, Tuple
+
+import numpy as np
+
+
+def data_fingerprint(values: np.ndarray) -> str:
+    """Content hash of an array (dtype, shape and bytes)"""
+    values = np.ascontiguousarray(values)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{values.dtype.str}{values.shape}".encode())
+    digest.update(values.data)
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    """
+    LRU of read-only indicator arrays bounded by their total size (max_bytes)
+
+    Callers share the returned arrays and must not modify them.
+    Safe to use from worker threads.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 2**20):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[Hashable, ...], np.ndarray]" = OrderedDict()
+        self._used = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _get(self, key: Tuple[Hashable, ...]):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+            return value
+
+    def _put(self, key: Tuple[Hashable, ...], value: np.ndarray) -> np.ndarray:
+        value.flags.writeable = False
+        if value.nbytes > self.max_bytes:
+            return value
+        with self._lock:
+            if key in self._entries:
+                self._used -= self._entries[key].nbytes
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._used += value.nbytes
+            while self._used > self.max_bytes:
+                _, old = self._entries.popitem(last=False)
+                self._used -= old.nbytes
+        return value
+
+    def _cumulative_sum(self, fingerprint: str, values: np.ndarray) -> np.ndarray:
+        """
+        Prefix sums of the values shifted by their first element (keeps the
+        differences accurate on long series), with a leading 0
+        """
+        key = (fingerprint, "cumsum", ())
+        cumulative = self._get(key)
+        if cumulative is None:
+            shift = values[0] if len(values) else 0.0
+            cumulative = self._put(key, np.concatenate([[0.0], np.cumsum(values - shift)]))
+        return cumulative
+
+    def sma_family(self, values: Sequence[float], windows: Sequence[int]) -> Dict[int, np.ndarray]:
+        """
+        Simple moving averages for several windows (NaN until the window is full,
+        like backtesting.test.SMA), all derived from one cumulative sum
+        """
+        values = np.asarray(values, dtype=np.float64)
+        fingerprint = data_fingerprint(values)
+        result = {}
+        missing = []
+        for window in dict.fromkeys(int(w) for w in windows):
+            cached = self._get((fingerprint, "sma", (window,)))
+            if cached is None:
+                missing.append(window)
+            else:
+                result[window] = cached
+        if missing:
+            cumulative = self._cumulative_sum(fingerprint, values)
+            shift = values[0] if len(values) else 0.0
+            for window in missing:
+                if window < 1:
+                    raise ValueError(f"Moving average window must be positive, got {window}")
+                sma = np.full(len(values), np.nan)
+                if window <= len(values):
+                    sma[window - 1:] = (cumulative[window:] - cumulative[:-window]) / window + shift
+                result[window] = self._put((fingerprint, "sma", (window,)), sma)
+        return result
+
+    def sma(self, values: Sequence[float], window: int) -> np.ndarray:
+        return self.sma_family(values, (window,))[int(window)]
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._used, "hits": self.hits, "misses": self.misses}
+
+
+# One cache per process (API threads, and each optimizer worker for its own sweep)
+indicator_cache = IndicatorCache(int(os.environ.get("INDICATOR_CACHE_MB", 64)) * 2**20)
+
+
+def cached_sma(values: Sequence[float], n: int) -> np.ndarray:
+    """Drop-in for backtesting.test.SMA backed by the process-wide indicator cache"""
+    return indicator_cache.sma(values, n)
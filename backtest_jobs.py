@@ -0,0 +1,151 @@
+"""
+WOW V1 - Background backtest jobs
+Bounded pool of worker threads running backtests off the event loop,
+with progress reporting and cooperative cancellation
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+TERMINAL_STATUSES = (JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a running job once cancellation has been requested"""
+
+
+class BacktestJob:
+    """
+    State of one submitted backtest, updated by its worker thread
+    Status changes go through transition(): a terminal status is final
+    """
+
+    def __init__(self, job_id: str, description: Dict[str, Any]):
+        self.id = job_id
+        self.description = description
+        self.status = JOB_QUEUED
+        self.progress = 0.0
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.cancel_event = threading.Event()
+        self.future: Optional[asyncio.Future] = None
+        self._lock = threading.Lock()
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def transition(self, expected: Tuple[str, ...], status: str, **fields: Any) -> bool:
+        """
+        Compare-and-set: move to status (setting fields with it) only from one
+        of the expected statuses; returns False when another thread got there first
+        """
+        with self._lock:
+            if self.status not in expected or self.done:
+                return False
+            for name, value in fields.items():
+                setattr(self, name, value)
+            if status == JOB_RUNNING:
+                self.started_at = datetime.now()
+            elif status in TERMINAL_STATUSES:
+                self.finished_at = datetime.now()
+            self.status = status
+            return True
+
+    def check_cancelled(self) -> None:
+        """Called by the job body at safe points; aborts the run if cancelled"""
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+
+    def snapshot(self, include_result: bool = True) -> Dict[str, Any]:
+        state = {
+            "job_id": self.id,
+            "status": self.status,
+            "progress": round(self.progress, 4),
+            "cancel_requested": self.cancel_event.is_set(),
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "error": self.error,
+            **self.description
+        }
+        if include_result and self.status == JOB_COMPLETED:
+            state["result"] = self.result
+        return state
+
+
+class JobManager:
+    """
+    Runs submitted jobs on at most max_concurrent threads; extra jobs wait
+    in the executor queue. Finished jobs are kept for polling, oldest
+    evicted first beyond max_finished.
+    """
+
+    def __init__(self, max_concurrent: Optional[int] = None, max_finished: int = 1000):
+        self.max_concurrent = max_concurrent or int(os.environ.get("BACKTEST_MAX_JOBS", 2))
+        self.max_finished = max_finished
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrent, thread_name_prefix="backtest-job")
+        self._jobs: "OrderedDict[str, BacktestJob]" = OrderedDict()
+
+    def submit(self, body: Callable[[BacktestJob], Any], description: Optional[Dict[str, Any]] = None) -> BacktestJob:
+        """Queue body(job) for execution; must be called from the event loop"""
+        job = BacktestJob(uuid.uuid4().hex, description or {})
+        self._jobs[job.id] = job
+        self._prune()
+        job.future = asyncio.get_running_loop().run_in_executor(self._executor, self._run, job, body)
+        return job
+
+    def get(self, job_id: str) -> Optional[BacktestJob]:
+        return self._jobs.get(job_id)
+
+    def cancel(self, job_id: str) -> Optional[BacktestJob]:
+        job = self._jobs.get(job_id)
+        if job is None or job.done:
+            return job
+        job.cancel_event.set()
+        # Not started yet: the worker will skip it; once running, the body stops at its next check
+        job.transition((JOB_QUEUED,), JOB_CANCELLED)
+        return job
+
+    def active(self) -> int:
+        return sum(1 for job in self._jobs.values() if not job.done)
+
+    def _run(self, job: BacktestJob, body: Callable[[BacktestJob], Any]) -> None:
+        if not job.transition((JOB_QUEUED,), JOB_RUNNING):
+            return
+        try:
+            result = body(job)
+        except JobCancelled:
+            job.transition((JOB_RUNNING,), JOB_CANCELLED)
+        except Exception as e:
+            logger.error(f"Backtest job {job.id} failed: {e}")
+            job.transition((JOB_RUNNING,), JOB_FAILED, error=str(e))
+        else:
+            job.transition((JOB_RUNNING,), JOB_COMPLETED, result=result, progress=1.0)
+
+    def _prune(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    def shutdown(self) -> None:
+        for job in self._jobs.values():
+            job.cancel_event.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,157 @@
+"""
+WOW V1 - Strategy parameter search
+Grid, random and successive-halving searches evaluated in parallel on a
+SharedDataPool; evaluations only receive their parameters
+"""
+
+import ast
+import asyncio
+import itertools
+import math
+import operator
+import random
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from backtest_parallel import SharedDataPool
+
+SEARCH_METHODS = ("grid", "random", "successive_halving")
+
+# Successive halving keeps 1/ETA of the candidates per rung
+HALVING_ETA = 3
+# Shortest trailing window evaluated by the first rung (one year of bars)
+HALVING_MIN_ROWS = 252
+
+_COMPARISONS = {
+    ast.Lt: operator.lt, ast.LtE: operator.le, ast.Gt: operator.gt, ast.GtE: operator.ge,
+    ast.Eq: operator.eq, ast.NotEq: operator.ne,
+}
+_BINARY = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod,
+}
+
+
+def expand_grid(param_grid: Dict[str, Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Cartesian product of the parameter grid"""
+    names = list(param_grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(param_grid[n] for n in names))]
+
+
+def compile_constraint(expression: str, names: Sequence[str]) -> Callable[[Dict[str, Any]], bool]:
+    """
+    Compile a constraint such as "short_window < long_window and long_window - short_window >= 10"
+    Only parameter names, numbers, arithmetic, comparisons and and/or/not are allowed
+    """
+    tree = ast.parse(expression, mode="eval")
+
+    def evaluate(node: ast.AST, params: Dict[str, Any]) -> Any:
+        if isinstance(node, ast.Expression):
+            return evaluate(node.body, params)
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            return node.value
+        if isinstance(node, ast.Name):
+            return params[node.id]
+        if isinstance(node, ast.BoolOp):
+            values = (evaluate(v, params) for v in node.values)
+            return all(values) if isinstance(node.op, ast.And) else any(values)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            return not evaluate(node.operand, params)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            return -evaluate(node.operand, params)
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+            return _BINARY[type(node.op)](evaluate(node.left, params), evaluate(node.right, params))
+        if isinstance(node, ast.Compare):
+            left = evaluate(node.left, params)
+            for op, comparator in zip(node.ops, node.comparators):
+                right = evaluate(comparator, params)
+                if type(op) not in _COMPARISONS or not _COMPARISONS[type(op)](left, right):
+                    return False
+                left = right
+            return True
+        raise ValueError(f"Unsupported expression in constraint: {ast.dump(node)}")
+
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and node.id not in names:
+            raise ValueError(f"Unknown parameter '{node.id}' in constraint")
+    # Validate the structure once with dummy values; they may hit a singular
+    # point (a / (b - 1)), which says nothing about the expression itself
+    try:
+        evaluate(tree, {name: 1 for name in names})
+    except ArithmeticError:
+        pass
+
+    def allowed(params: Dict[str, Any]) -> bool:
+        try:
+            return bool(evaluate(tree, params))
+        except ArithmeticError:
+            # Undefined for this combination (division by zero): excluded
+            return False
+
+    return allowed
+
+
+def candidate_params(param_grid: Dict[str, Sequence[Any]], method: str,
+                     max_evaluations: Optional[int] = None, constraint: Optional[str] = None,
+                     seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Candidates to evaluate: the filtered grid, optionally sampled down to max_evaluations"""
+    if method not in SEARCH_METHODS:
+        raise ValueError(f"Unknown search method '{method}'. Available: {list(SEARCH_METHODS)}")
+    candidates = expand_grid(param_grid)
+    if constraint:
+        allowed = compile_constraint(constraint, list(param_grid))
+        candidates = [params for params in candidates if allowed(params)]
+    if method != "grid" and max_evaluations and len(candidates) > max_evaluations:
+        candidates = random.Random(seed).sample(candidates, max_evaluations)
+    elif method == "grid" and max_evaluations and len(candidates) > max_evaluations:
+        raise ValueError(
+            f"Grid has {len(candidates)} candidates, above max_evaluations={max_evaluations}; "
+            "use the random or successive_halving method"
+        )
+    return candidates
+
+
+def _score(result: Dict[str, Any]) -> float:
+    score = result.get("score")
+    return score if score is not None and not math.isnan(score) else -math.inf
+
+
+async def _evaluate_all(pool: SharedDataPool, evaluate: Callable, candidates: List[Dict[str, Any]],
+                        n_rows: Optional[int]) -> List[Dict[str, Any]]:
+    futures = [asyncio.wrap_future(pool.submit(evaluate, params, n_rows)) for params in candidates]
+    return list(await asyncio.gather(*futures))
+
+
+async def run_search(pool: SharedDataPool, evaluate: Callable, candidates: List[Dict[str, Any]],
+                     method: str, total_rows: int) -> Dict[str, Any]:
+    """
+    Evaluate candidates on the pool and rank them by score (descending)
+
+    evaluate(params, n_rows) runs in a worker and returns {"params", "score", ...};
+    n_rows=None means the full history, otherwise the trailing n_rows bars.
+    Successive halving evaluates all candidates on a short trailing window and
+    promotes the best 1/HALVING_ETA to a window HALVING_ETA times longer.
+    """
+    evaluations = 0
+    rungs = []
+    if method == "successive_halving" and len(candidates) > 1:
+        # As many rungs as needed to get down to one candidate, within the shortest window
+        n_rungs = math.ceil(math.log(len(candidates), HALVING_ETA))
+        if total_rows > HALVING_MIN_ROWS:
+            n_rungs = min(n_rungs, int(math.log(total_rows / HALVING_MIN_ROWS, HALVING_ETA)))
+        else:
+            n_rungs = 0
+        survivors = candidates
+        for rung in range(n_rungs):
+            n_rows = total_rows // HALVING_ETA ** (n_rungs - rung)
+            results = await _evaluate_all(pool, evaluate, survivors, n_rows)
+            evaluations += len(results)
+            results.sort(key=_score, reverse=True)
+            rungs.append({"rows": n_rows, "candidates": len(survivors)})
+            survivors = [r["params"] for r in results[:max(1, math.ceil(len(results) / HALVING_ETA))]]
+        candidates = survivors
+
+    results = await _evaluate_all(pool, evaluate, candidates, None)
+    evaluations += len(results)
+    rungs.append({"rows": total_rows, "candidates": len(candidates)})
+    results.sort(key=_score, reverse=True)
+    return {"results": results, "evaluations": evaluations, "rungs": rungs}
@@ -0,0 +1,190 @@
+"""
+WOW V1 - Parallel backtest execution
+One long-lived process pool shared by all requests; each request places its
+price data in shared memory once, and workers attach to it on first use, so
+tasks only carry their parameters
+"""
+
+import logging
+import os
+import threading
+from collections import deque
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Frames of the task running in the current worker process, by name
+_WORKER_FRAMES: Dict[str, pd.DataFrame] = {}
+# Segments attached by the current worker process (those of its latest task)
+_WORKER_SEGMENTS: Dict[str, Tuple[shared_memory.SharedMemory, pd.DataFrame]] = {}
+
+# Process pool shared by every request (see get_executor)
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def default_workers() -> int:
+    return max(1, int(os.environ.get("BACKTEST_WORKERS", os.cpu_count() or 1)))
+
+
+class SharedFrame:
+    """
+    Numeric DataFrame stored in a shared-memory block
+    The descriptor (segment name, shape, index, columns) is small and picklable;
+    attach() rebuilds a zero-copy DataFrame view in any process
+    """
+
+    def __init__(self, frame: pd.DataFrame):
+        values = np.ascontiguousarray(frame.to_numpy(dtype=np.float64))
+        self._segment = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        np.ndarray(values.shape, dtype=np.float64, buffer=self._segment.buf)[:] = values
+        self.descriptor = {
+            "segment": self._segment.name,
+            "shape": values.shape,
+            "index": frame.index,
+            "columns": frame.columns,
+        }
+
+    @staticmethod
+    def attach(descriptor: Dict[str, Any]) -> pd.DataFrame:
+        """Zero-copy view of the frame; reused while the worker runs tasks of the same request"""
+        name = descriptor["segment"]
+        if name in _WORKER_SEGMENTS:
+            return _WORKER_SEGMENTS[name][1]
+        segment = shared_memory.SharedMemory(name=name)
+        values = np.ndarray(descriptor["shape"], dtype=np.float64, buffer=segment.buf)
+        values.flags.writeable = False
+        frame = pd.DataFrame(values, index=descriptor["index"], columns=descriptor["columns"], copy=False)
+        _WORKER_SEGMENTS[name] = (segment, frame)
+        return frame
+
+    def release(self) -> None:
+        self._segment.close()
+        try:
+            self._segment.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _run_task(descriptors: Dict[str, Dict[str, Any]], fn: Callable, args: tuple, kwargs: Dict[str, Any]) -> Any:
+    """Worker side of SharedDataPool.submit: expose the request's frames, then run fn"""
+    _WORKER_FRAMES.clear()
+    # Detach other requests' segments so released memory is not kept mapped
+    segments = {descriptor["segment"] for descriptor in descriptors.values()}
+    for name in [name for name in _WORKER_SEGMENTS if name not in segments]:
+        segment, _ = _WORKER_SEGMENTS.pop(name)
+        try:
+            segment.close()
+        except BufferError:
+            # Still referenced (e.g. by an indicator cache): unmapped once collected
+            pass
+    for name, descriptor in descriptors.items():
+        _WORKER_FRAMES[name] = SharedFrame.attach(descriptor)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        _WORKER_FRAMES.clear()
+
+
+def worker_frame(name: str) -> pd.DataFrame:
+    """Frame shared with the pool, as seen from inside a worker task"""
+    return _WORKER_FRAMES[name]
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """The process pool shared by every request, started on first use (BACKTEST_WORKERS processes)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=default_workers())
+        return _executor
+
+
+def shutdown_executor() -> None:
+    """Stop the shared pool without waiting for running tasks (application shutdown)"""
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+class SharedDataPool:
+    """
+    One request's view of the shared process pool: a set of named DataFrames
+    in shared memory and at most max_workers of its tasks running at once
+
+        with SharedDataPool({"prices": data}) as pool:
+            futures = [pool.submit(evaluate, params) for params in grid]
+
+    Leaving the block never waits for workers: tasks not handed to the pool
+    are dropped, those not started yet are cancelled too when leaving on an
+    exception, and the shared memory is released.
+    """
+
+    def __init__(self, frames: Dict[str, pd.DataFrame], max_workers: Optional[int] = None):
+        self.max_workers = max_workers or default_workers()
+        self._executor = get_executor()
+        self._shared = {name: SharedFrame(frame) for name, frame in frames.items()}
+        self._descriptors = {name: shared.descriptor for name, shared in self._shared.items()}
+        # Tasks waiting for one of this request's slots, and those handed to the executor
+        self._queue: "deque[Tuple[Future, Callable, tuple, Dict[str, Any]]]" = deque()
+        self._submitted: Dict[Future, Future] = {}
+        self._lock = threading.RLock()
+        self._closed = False
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("SharedDataPool is closed")
+            self._queue.append((future, fn, args, kwargs))
+            self._dispatch()
+        return future
+
+    def _dispatch(self) -> None:
+        with self._lock:
+            while self._queue and len(self._submitted) < self.max_workers and not self._closed:
+                future, fn, args, kwargs = self._queue.popleft()
+                if not future.set_running_or_notify_cancel():
+                    continue
+                task = self._executor.submit(_run_task, self._descriptors, fn, args, kwargs)
+                self._submitted[task] = future
+                task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: Future) -> None:
+        with self._lock:
+            future = self._submitted.pop(task)
+        if task.cancelled():
+            future.set_exception(CancelledError())
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+        self._dispatch()
+
+    def close(self, cancel: bool = False) -> None:
+        """Release the shared memory; with cancel, also cancel the executor tasks not started yet"""
+        with self._lock:
+            self._closed = True
+            # Queued tasks could no longer attach to the released memory
+            while self._queue:
+                self._queue.popleft()[0].cancel()
+            if cancel:
+                for task in list(self._submitted):
+                    task.cancel()
+        # Workers still running keep their mapping; the memory is freed once they detach
+        for shared in self._shared.values():
+            shared.release()
+        self._shared = {}
+
+    def __enter__(self) -> "SharedDataPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close(cancel=exc_type is not None)
@@ -0,0 +1,67 @@
+"""
+WOW V1 - Streamed responses
+Media types, Accept negotiation and strict JSON encoding for the NDJSON and
+Arrow IPC streams of the backtest endpoints
+"""
+
+# This module has a twin in oracle-backend-wow/streaming.py (negotiate_stream,
+# json_safe, json_dumps, json_line, json_number): the two backends are deployed
+# separately and do not share code. Any fix must be applied on both sides.
+
+import json
+import math
+from typing import Any, Optional
+
+import numpy as np
+
+try:
+    import pyarrow  # noqa: F401
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+STREAM_MEDIA_TYPES = (NDJSON_MEDIA_TYPE, ARROW_MEDIA_TYPE)
+
+# Rows serialized per chunk of a full-resolution stream
+CHUNK_ROWS = 4096
+
+
+def negotiate_stream(accept: Optional[str]) -> Optional[str]:
+    """Stream format requested by the Accept header, None for the regular JSON response"""
+    if not accept:
+        return None
+    for part in accept.split(","):
+        media_type = part.split(";")[0].strip().lower()
+        if media_type in STREAM_MEDIA_TYPES:
+            return media_type
+    return None
+
+
+def json_safe(value: Any) -> Any:
+    """Replace NaN and ±inf with None (strict JSON), in nested dicts and lists"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(item) for item in value]
+    return value
+
+
+def json_dumps(value: Any) -> str:
+    """Strict JSON: a NaN Sharpe ratio (flat run) becomes null instead of invalid NaN"""
+    return json.dumps(json_safe(value), default=float, allow_nan=False)
+
+
+def json_line(value: Any) -> bytes:
+    """One NDJSON line"""
+    return (json_dumps(value) + "\n").encode()
+
+
+def json_number(value: float) -> str:
+    """JSON number of a float value, null if NaN or infinite"""
+    return repr(value) if math.isfinite(value) else "null"
@@ -0,0 +1,81 @@
+"""
+WOW V1 - Walk-forward analysis
+Fold layout, out-of-sample statistics and stitching of the per-fold
+equity curves; folds themselves run on a SharedDataPool
+"""
+
+import math
+from typing import Any, Dict, List
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+# Fewest bars accepted in a training or test window
+MIN_WINDOW_BARS = 20
+
+
+def walk_forward_windows(n_rows: int, folds: int, anchored: bool = False,
+                         warmup_bars: int = 0) -> List[Dict[str, Any]]:
+    """
+    Split n_rows bars into folds + 1 consecutive windows; fold k trains on
+    window k (windows 0..k when anchored) and tests on window k + 1.
+    Positions are [start, end) row offsets. Test runs start warmup_bars
+    earlier (within the training window) so indicators are warm at test start.
+    """
+    if folds < 1:
+        raise ValueError("At least one fold is required")
+    size = n_rows // (folds + 1)
+    if size < MIN_WINDOW_BARS:
+        raise ValueError(
+            f"{n_rows} bars are not enough for {folds} folds (windows of at least {MIN_WINDOW_BARS} bars)"
+        )
+    bounds = [i * size for i in range(folds + 1)] + [n_rows]
+    windows = []
+    for k in range(folds):
+        train_start = 0 if anchored else bounds[k]
+        test_start, test_end = bounds[k + 1], bounds[k + 2]
+        windows.append({
+            "fold": k,
+            "train": (train_start, test_start),
+            "test": (test_start, test_end),
+            "test_from": max(train_start, test_start - warmup_bars)
+        })
+    return windows
+
+
+def equity_stats(equity: pd.Series) -> Dict[str, float]:
+    """Return, annualized return/volatility, Sharpe and max drawdown (%) of an equity curve"""
+    values = equity.to_numpy(dtype=np.float64)
+    if len(values) < 2 or values[0] <= 0:
+        return {"return_pct": 0.0, "annual_return_pct": 0.0, "volatility_pct": 0.0,
+                "sharpe_ratio": 0.0, "max_drawdown_pct": 0.0}
+    returns = values[1:] / values[:-1] - 1
+    growth = values[-1] / values[0]
+    std = returns.std(ddof=1) if len(returns) > 1 else 0.0
+    drawdown = values / np.maximum.accumulate(values) - 1
+    return {
+        "return_pct": float((growth - 1) * 100),
+        "annual_return_pct": float((growth ** (TRADING_DAYS / len(returns)) - 1) * 100) if growth > 0 else -100.0,
+        "volatility_pct": float(std * math.sqrt(TRADING_DAYS) * 100),
+        "sharpe_ratio": float(returns.mean() / std * math.sqrt(TRADING_DAYS)) if std > 0 else 0.0,
+        "max_drawdown_pct": float(drawdown.min() * 100)
+    }
+
+
+def stitch_equity(curves: List[pd.Series], initial_value: float) -> pd.Series:
+    """
+    Chain out-of-sample curves: each fold is rebased to start where the
+    previous one ended, so the result is the equity of trading every test
+    window in sequence starting from initial_value
+    """
+    if not curves:
+        return pd.Series(dtype=np.float64)
+    pieces = []
+    level = initial_value
+    for curve in curves:
+        values = curve.to_numpy(dtype=np.float64)
+        rebased = values / values[0] * level
+        pieces.append(pd.Series(rebased, index=curve.index))
+        level = rebased[-1]
+    return pd.concat(pieces)
@@ -0,0 +1,221 @@
+"""
+Benchmark cases
+One group per backend; each group runs in its own process with its own
+sys.path and environment (the backends share module names such as main)
+"""
+
+import atexit
+import functools
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from fixtures import (ASSET_COUNTS, FIXTURE_SEED, RETURN_COUNTS, YEARS, asset_universe,
+                      fill_price_store, period, return_series)
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass
+class Case:
+    """
+    A measured call: setup() runs untimed before every repetition (fixtures,
+    cache resets) and returns the zero-argument callable that is timed
+    """
+    name: str
+    params: Dict[str, Any]
+    setup: Callable[[], Callable[[], Any]]
+
+
+@dataclass
+class Group:
+    path: str
+    cases: Callable[[], List[Case]]
+    env: Dict[str, str] = field(default_factory=dict)
+    # Runs once in the worker before any case (fixtures needed at import time)
+    prepare: Optional[Callable[[], None]] = None
+
+
+def case_name(group: str, entry: str, params: Dict[str, Any]) -> str:
+    """group.entry(key=value,...): no fnmatch metacharacters, so a name is also its own --select pattern"""
+    return f"{group}.{entry}({','.join(f'{k}={v}' for k, v in params.items())})"
+
+
+def _checked(response) -> Any:
+    """Fail the case on an error response instead of timing the error path"""
+    if response.status_code != 200:
+        raise RuntimeError(f"HTTP {response.status_code}: {response.text[:200]}")
+    body = response.json()
+    if isinstance(body, dict) and body.get("success") is False:
+        raise RuntimeError(f"Request failed: {body.get('error')}")
+    return body
+
+
+# ----------------------------------------------------------------------
+# STRUCTURE_2_MIGRATION/backend-python: module entry points
+# ----------------------------------------------------------------------
+
+def structure2_cases() -> List[Case]:
+    cases = []
+
+    for years in YEARS:
+        for assets in ASSET_COUNTS:
+            params = {"years": years, "assets": assets}
+            start, end = period(years)
+            config = {
+                "strategy": "balanced_portfolio",
+                "start_date": start,
+                "end_date": end,
+                "initial_capital": 100000,
+                "assets": asset_universe(assets),
+                "rebalancing_frequency": "monthly",
+                "seed": FIXTURE_SEED
+            }
+
+            def setup(config=config):
+                from backtesting_engine import run_backtest
+                return lambda: run_backtest(config)
+
+            cases.append(Case(case_name("structure2", "run_backtest", params), params, setup))
+
+    for n in RETURN_COUNTS:
+        params = {"returns": n}
+
+        def setup_performance(n=n):
+            from performance_analyzer import analyze_performance
+            returns, benchmark = return_series(n)
+            data = {"returns": returns.tolist(), "benchmark": benchmark.tolist(), "period": "daily"}
+            return lambda: analyze_performance(data)
+
+        def setup_risk(n=n):
+            from performance_analyzer import calculate_risk_metrics
+            data = {"returns": return_series(n)[0].tolist()}
+            return lambda: calculate_risk_metrics(data)
+
+        cases.append(Case(case_name("structure2", "analyze_performance", params), params, setup_performance))
+        cases.append(Case(case_name("structure2", "calculate_risk_metrics", params), params, setup_risk))
+
+    def setup_regimes():
+        from economic_regimes_module import analyze_regimes
+        return lambda: [analyze_regimes({"country": country}) for country in ("US", "FR", "DE", "UK", "JP", "CN")]
+
+    cases.append(Case(case_name("structure2", "analyze_regimes", {"countries": 6}), {"countries": 6}, setup_regimes))
+    return cases
+
+
+# ----------------------------------------------------------------------
+# backend_backtest_integration: /api/backtest endpoints
+# ----------------------------------------------------------------------
+
+@functools.lru_cache(maxsize=None)
+def integration_client():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from backend_backtest_integration import backtest_router
+
+    app = FastAPI()
+    app.include_router(backtest_router)
+    return TestClient(app)
+
+
+def integration_cases() -> List[Case]:
+    cases = []
+    for years in YEARS:
+        for assets in ASSET_COUNTS:
+            params = {"years": years, "assets": assets}
+            start, end = period(years)
+            symbols = asset_universe(assets)
+            payload = {
+                "initial_capital": 100000,
+                "assets": [{"symbol": symbol, "weight": 1 / len(symbols)} for symbol in symbols],
+                "strategy": "TopFiveStrategy",
+                "start_date": start,
+                "end_date": end,
+                "rebalance_frequency": "monthly",
+                "seed": FIXTURE_SEED
+            }
+
+            def setup(payload=payload):
+                from backend_backtest_integration import _generate_sample_data
+                client = integration_client()
+                # Sample data is memoized per process; each repetition starts cold
+                _generate_sample_data.cache_clear()
+                return lambda: _checked(client.post("/api/backtest/run", json=payload))
+
+            cases.append(Case(case_name("integration", "run", params), params, setup))
+    return cases
+
+
+# ----------------------------------------------------------------------
+# oracle-backend-wow: /api/portfolio endpoints on a local price store
+# ----------------------------------------------------------------------
+
+# SPY (benchmark of every panel) plus the traded tickers
+WOW_UNIVERSE = asset_universe(max(ASSET_COUNTS) + 1, base=("SPY",))
+
+
+def prepare_wow() -> None:
+    """Price store fixture covering more than the longest period up to today (the rolling endpoint ends now)"""
+    root = tempfile.mkdtemp(prefix="bench-prices-")
+    atexit.register(shutil.rmtree, root, ignore_errors=True)
+    os.environ["PRICE_STORE_DIR"] = root
+    from price_store import PriceStore
+    fill_price_store(PriceStore(root), WOW_UNIVERSE, max(YEARS) + 1, date.today())
+
+
+@functools.lru_cache(maxsize=None)
+def wow_client():
+    from fastapi.testclient import TestClient
+    import main
+
+    # Offline: the fixture store is never considered stale
+    main.price_store.refresh_interval = timedelta(days=365 * 100)
+    return TestClient(main.app)
+
+
+def wow_cases() -> List[Case]:
+    cases = []
+    end = date.today() - timedelta(days=1)
+    for years in YEARS:
+        for assets in ASSET_COUNTS:
+            params = {"years": years, "assets": assets}
+            start, _ = period(years, end)
+            tickers = ",".join(WOW_UNIVERSE[1:assets + 1])
+            backtest_query = {"start_date": start, "end_date": end.isoformat(), "tickers": tickers,
+                              "initial_cash": 100000, "rebalance": "monthly"}
+            rolling_query = {"tickers": tickers, "days": round(years * 365.25)}
+
+            def setup_backtest(query=backtest_query):
+                client = wow_client()
+                return lambda: _checked(client.get("/api/portfolio/backtest", params=query))
+
+            def setup_rolling(query=rolling_query):
+                client = wow_client()
+                return lambda: _checked(client.get("/api/portfolio/rolling", params=query))
+
+            cases.append(Case(case_name("wow", "backtest", params), params, setup_backtest))
+            cases.append(Case(case_name("wow", "rolling", params), params, setup_rolling))
+    return cases
+
+
+GROUPS = {
+    "structure2": Group(
+        path=os.path.join(REPO_ROOT, "STRUCTURE_2_MIGRATION", "backend-python"),
+        cases=structure2_cases
+    ),
+    "integration": Group(
+        path=REPO_ROOT,
+        cases=integration_cases,
+        # Measure computation, not cache hits
+        env={"BACKTEST_CACHE_PATH": "", "BACKTEST_CACHE_MEMORY_MB": "0", "INDICATOR_CACHE_MB": "0"}
+    ),
+    "wow": Group(
+        path=os.path.join(REPO_ROOT, "oracle-backend-wow"),
+        cases=wow_cases,
+        env={"PANEL_CACHE_MB": "0"},
+        prepare=prepare_wow
+    ),
+}
@@ -0,0 +1,59 @@
+"""
+Benchmark fixtures
+Deterministic, offline inputs: every series is drawn from a Generator seeded
+by FIXTURE_SEED (and the ticker), so a case sees the same data on every run
+"""
+
+import zlib
+from datetime import date, timedelta
+from typing import List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+FIXTURE_SEED = 20240601
+# Last day of the fixed backtest periods
+FIXTURE_END = date(2024, 12, 31)
+
+YEARS = (1, 10, 30)
+ASSET_COUNTS = (3, 50, 500)
+RETURN_COUNTS = (10, 1000, 1000000)
+
+
+def period(years: int, end: date = FIXTURE_END) -> Tuple[str, str]:
+    """(start, end) ISO dates spanning the given number of years up to end"""
+    return (end - timedelta(days=round(years * 365.25))).isoformat(), end.isoformat()
+
+
+def asset_universe(count: int, base: Sequence[str] = ("SPY", "BND", "GLD")) -> List[str]:
+    """The base tickers followed by synthetic ones (X0001, X0002, ...) up to count"""
+    base = list(base)[:count]
+    return base + [f"X{i:04d}" for i in range(1, count - len(base) + 1)]
+
+
+def return_series(n: int, seed: int = FIXTURE_SEED) -> Tuple[np.ndarray, np.ndarray]:
+    """Fat-tailed daily portfolio returns and correlated benchmark returns"""
+    rng = np.random.default_rng([seed, n])
+    benchmark = 0.0003 + 0.01 * rng.standard_t(4, n) / np.sqrt(2)
+    returns = 0.0001 + 0.9 * benchmark + 0.004 * rng.standard_normal(n)
+    return returns, benchmark
+
+
+def close_prices(tickers: Sequence[str], start: date, end: date, seed: int = FIXTURE_SEED) -> pd.DataFrame:
+    """Business-day closes of geometric random walks, one independent stream per ticker"""
+    dates = pd.bdate_range(start, end)
+    columns = {}
+    for ticker in tickers:
+        rng = np.random.default_rng([seed, zlib.crc32(ticker.encode())])
+        returns = 0.0003 + 0.015 * rng.standard_normal(len(dates))
+        columns[ticker] = 100.0 * np.cumprod(1.0 + returns)
+    return pd.DataFrame(columns, index=dates)
+
+
+def fill_price_store(store, tickers: Sequence[str], years: int, end: date) -> None:
+    """
+    Write closes for tickers over the last `years` years up to end into an
+    oracle-backend-wow PriceStore, marked as synced so no download is attempted
+    """
+    start = end - timedelta(days=round(years * 365.25))
+    store.ingest(close_prices(tickers, start, end), start, end + timedelta(days=1), tickers)
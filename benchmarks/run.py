@@ -0,0 +1,264 @@
+"""
+Oracle Portfolio benchmark suite
+
+Times every compute entry point on fixed offline fixtures (1/10/30 years,
+3/50/500 assets, 10/1k/1M returns) and records wall time and peak traced
+memory per case.
+
+    python benchmarks/run.py                          # all cases -> benchmarks/results/<timestamp>.json
+    python benchmarks/run.py --select 'structure2.*'  # subset (fnmatch patterns on case names)
+    python benchmarks/run.py --select 'integration.run(years=1,assets=3)'  # one case, by exact name
+    python benchmarks/run.py --save-baseline          # also store the run as benchmarks/baseline.json
+    python benchmarks/run.py --compare                # exit 1 if a case regressed against the baseline
+
+Wall time is the fastest of the repetitions. Peak memory comes from one
+extra tracemalloc run (Python and NumPy allocations made during the call).
+"""
+
+import argparse
+import fnmatch
+import gc
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from cases import GROUPS, REPO_ROOT, Case  # noqa: E402
+
+RESULTS_FORMAT = 1
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+DEFAULT_RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+# Differences below these floors are treated as noise, whatever the ratio
+MIN_TIME_DELTA = 0.005
+MIN_MEMORY_DELTA = 1.0
+
+
+def selected(name: str, patterns: List[str]) -> bool:
+    """Exact case names first, so a name read from a results file always selects its case"""
+    return not patterns or any(name == pattern or fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+
+
+def measure(case: Case, repeat: int, max_time: float, trace_memory: bool) -> Dict[str, Any]:
+    """Time up to `repeat` runs (fewer once max_time is spent), then trace one run's peak memory"""
+    times = []
+    spent = 0.0
+    while len(times) < repeat and (not times or spent < max_time):
+        run = case.setup()
+        gc.collect()
+        started = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - started)
+        spent += times[-1]
+
+    peak = None
+    if trace_memory:
+        run = case.setup()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    times.sort()
+    return {
+        "status": "ok",
+        "params": case.params,
+        "wall_time_s": round(times[0], 6),
+        "wall_time_median_s": round(times[len(times) // 2], 6),
+        "repeats": len(times),
+        "peak_memory_mb": round(peak / 2**20, 3) if peak is not None else None
+    }
+
+
+def run_worker(group_name: str, patterns: List[str], repeat: int, max_time: float,
+               trace_memory: bool, result_file: str) -> None:
+    """Measure one group's cases in this process (started by run_group with the group's path and env)"""
+    group = GROUPS[group_name]
+    results = {}
+    # Keep the progress lines readable: the backends log every request at INFO
+    logging.disable(logging.INFO)
+    warnings.simplefilter("ignore")
+    try:
+        if group.prepare:
+            group.prepare()
+        cases = [case for case in group.cases() if selected(case.name, patterns)]
+    except ImportError as e:
+        # Missing optional dependency: report the group as skipped
+        results[f"{group_name}.*"] = {"status": "skipped", "error": str(e)}
+        cases = []
+
+    for case in cases:
+        try:
+            results[case.name] = measure(case, repeat, max_time, trace_memory)
+        except ImportError as e:
+            results[case.name] = {"status": "skipped", "params": case.params, "error": str(e)}
+        except Exception as e:
+            results[case.name] = {"status": "error", "params": case.params, "error": f"{type(e).__name__}: {e}"}
+        print(format_result(case.name, results[case.name]), file=sys.stderr, flush=True)
+
+    with open(result_file, "w", encoding="utf-8") as f:
+        json.dump(results, f)
+
+
+def run_group(group_name: str, args) -> Dict[str, Any]:
+    """Run a group in a fresh interpreter: the backends' modules must not share one process"""
+    group = GROUPS[group_name]
+    env = dict(os.environ, **group.env)
+    env["PYTHONPATH"] = os.pathsep.join([group.path, BENCH_DIR, env.get("PYTHONPATH", "")]).rstrip(os.pathsep)
+    with tempfile.TemporaryDirectory() as tmp:
+        result_file = os.path.join(tmp, "results.json")
+        command = [sys.executable, os.path.abspath(__file__), "--worker", group_name,
+                   "--result-file", result_file, "--repeat", str(args.repeat), "--max-time", str(args.max_time)]
+        command += [arg for pattern in args.select for arg in ("--select", pattern)]
+        if args.no_memory:
+            command.append("--no-memory")
+        completed = subprocess.run(command, cwd=group.path, env=env)
+        if completed.returncode != 0 or not os.path.exists(result_file):
+            return {f"{group_name}.*": {"status": "error", "error": f"worker exited with code {completed.returncode}"}}
+        with open(result_file, encoding="utf-8") as f:
+            return json.load(f)
+
+
+def format_result(name: str, result: Dict[str, Any]) -> str:
+    if result["status"] != "ok":
+        return f"{name:<60} {result['status'].upper()}: {result.get('error', '')}"
+    memory = f"{result['peak_memory_mb']:>10.1f} MB" if result["peak_memory_mb"] is not None else ""
+    return f"{name:<60} {result['wall_time_s']:>10.4f} s ({result['repeats']}x){memory}"
+
+
+def machine_info() -> Dict[str, Any]:
+    import numpy
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": numpy.__version__
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], time_threshold: float,
+            memory_threshold: float) -> List[str]:
+    """
+    Regressions of results against a baseline run: wall time or peak memory
+    above baseline * (1 + threshold), or cases that now fail
+    (baseline cases outside the current selection are ignored)
+    """
+    failures = []
+    print(f"\n{'case':<60} {'baseline':>10} {'current':>10} {'ratio':>7}")
+    for name, base in sorted(baseline["cases"].items()):
+        current = results["cases"].get(name)
+        if base["status"] != "ok" or current is None:
+            continue
+        if current["status"] != "ok":
+            failures.append(f"{name}: {current['status']} ({current.get('error', '')})")
+            continue
+
+        ratio = current["wall_time_s"] / base["wall_time_s"] if base["wall_time_s"] > 0 else 1.0
+        flag = ""
+        if ratio > 1 + time_threshold and current["wall_time_s"] - base["wall_time_s"] > MIN_TIME_DELTA:
+            failures.append(f"{name}: wall time {base['wall_time_s']:.4f}s -> {current['wall_time_s']:.4f}s (x{ratio:.2f})")
+            flag = " TIME"
+        if base.get("peak_memory_mb") and current.get("peak_memory_mb") is not None:
+            memory_ratio = current["peak_memory_mb"] / base["peak_memory_mb"]
+            if (memory_ratio > 1 + memory_threshold
+                    and current["peak_memory_mb"] - base["peak_memory_mb"] > MIN_MEMORY_DELTA):
+                failures.append(
+                    f"{name}: peak memory {base['peak_memory_mb']:.1f}MB -> {current['peak_memory_mb']:.1f}MB "
+                    f"(x{memory_ratio:.2f})"
+                )
+                flag += " MEMORY"
+        print(f"{name:<60} {base['wall_time_s']:>10.4f} {current['wall_time_s']:>10.4f} {ratio:>7.2f}{flag}")
+    return failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Oracle Portfolio benchmark suite")
+    parser.add_argument("--select", action="append", default=[], metavar="PATTERN",
+                        help="only run cases with this exact name or matching this fnmatch pattern (repeatable)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case (default 5)")
+    parser.add_argument("--max-time", type=float, default=10.0,
+                        help="stop repeating a case once its runs took this many seconds (default 10)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced peak memory run")
+    parser.add_argument("--output", help="results file (default benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="baseline file (default benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--compare", action="store_true", help="fail on regressions against the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed relative wall time increase (default 0.25)")
+    parser.add_argument("--memory-threshold", type=float, default=0.25,
+                        help="allowed relative peak memory increase (default 0.25)")
+    parser.add_argument("--list", action="store_true", help="list case names and exit")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        run_worker(args.worker, args.select, args.repeat, args.max_time, not args.no_memory, args.result_file)
+        return 0
+
+    if args.list:
+        for group in GROUPS.values():
+            for case in group.cases():
+                if selected(case.name, args.select):
+                    print(case.name)
+        return 0
+
+    baseline = None
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            parser.error(f"no baseline at {args.baseline} (create one with --save-baseline)")
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("format") != RESULTS_FORMAT:
+            parser.error(f"unsupported baseline format {baseline.get('format')}")
+
+    results = {
+        "format": RESULTS_FORMAT,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "machine": machine_info(),
+        "settings": {"repeat": args.repeat, "max_time": args.max_time, "select": args.select},
+        "cases": {}
+    }
+    for group_name, group in GROUPS.items():
+        # Case names are known without importing the backend
+        if any(selected(case.name, args.select) for case in group.cases()):
+            results["cases"].update(run_group(group_name, args))
+
+    output = args.output or os.path.join(DEFAULT_RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    for path in [output] + ([args.baseline] if args.save_baseline else []):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+        print(f"Results written to {os.path.relpath(path, REPO_ROOT)}")
+
+    errors = [name for name, result in results["cases"].items() if result["status"] == "error"]
+    if baseline is not None:
+        failures = compare(results, baseline, args.threshold, args.memory_threshold)
+        if baseline["machine"] != results["machine"]:
+            print("Warning: baseline recorded on a different machine or environment", file=sys.stderr)
+        if failures:
+            print(f"\n{len(failures)} regression(s):", file=sys.stderr)
+            for failure in failures:
+                print(f"  {failure}", file=sys.stderr)
+            return 1
+        print("\nNo regression against the baseline")
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""
+Oracle WOW V1 - Moteur de backtest vectorisé
+Calcule la trajectoire complète d'un portefeuille multi-actifs à partir
+de la matrice des prix, en quelques opérations NumPy
+"""
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+REBALANCE_FREQUENCIES = ("none", "monthly", "quarterly", "threshold")
+
+# Taille initiale de la fenêtre d'anticipation pour le rééquilibrage sur seuil
+_THRESHOLD_LOOKAHEAD = 256
+
+
+def normalize_weights(weights: Optional[Sequence[float]], n_assets: int) -> np.ndarray:
+    """Poids normalisés à 1; équipondération si aucun poids n'est fourni"""
+    if weights is None or len(weights) == 0:
+        return np.full(n_assets, 1.0 / n_assets)
+    w = np.asarray(weights, dtype=np.float64)
+    if len(w) != n_assets:
+        raise ValueError(f"{len(w)} poids fournis pour {n_assets} actifs")
+    if np.any(w < 0) or w.sum() <= 0:
+        raise ValueError("Les poids doivent être positifs et de somme non nulle")
+    return w / w.sum()
+
+
+def calendar_rebalance_starts(dates: pd.DatetimeIndex, frequency: str) -> np.ndarray:
+    """
+    Indices des jours de rééquilibrage calendaire (premier jour de bourse
+    de chaque mois ou trimestre); l'indice 0 est l'allocation initiale
+    """
+    if frequency == "none" or len(dates) == 0:
+        return np.zeros(1, dtype=np.int64)
+    if frequency == "monthly":
+        period = dates.year * 12 + dates.month
+    elif frequency == "quarterly":
+        period = dates.year * 4 + (dates.month - 1) // 3
+    else:
+        raise ValueError(f"Fréquence de rééquilibrage inconnue: {frequency}")
+    period = np.asarray(period)
+    changes = np.flatnonzero(period[1:] != period[:-1]) + 1
+    return np.concatenate([[0], changes]).astype(np.int64)
+
+
+# threshold_rebalance_starts et simulate_portfolio ont un jumeau dans
+# STRUCTURE_2_MIGRATION/backend-python/backtesting_engine.py: les deux backends
+# sont déployés séparément et ne partagent pas de code. Toute correction doit
+# être reportée des deux côtés.
+def threshold_rebalance_starts(prices: np.ndarray, weights: np.ndarray, threshold: float) -> np.ndarray:
+    """
+    Indices de rééquilibrage lorsque l'écart absolu d'un poids à sa cible
+    dépasse le seuil; chaque segment de dérive est évalué en bloc
+    """
+    if threshold <= 0:
+        raise ValueError("Le seuil de rééquilibrage doit être strictement positif")
+    n_days = len(prices)
+    starts = [0]
+    start = 0
+    lookahead = _THRESHOLD_LOOKAHEAD
+    while start < n_days - 1:
+        stop = min(start + lookahead, n_days)
+        held = prices[start:stop] / prices[start] * weights
+        drift = held / held.sum(axis=1, keepdims=True)
+        breached = np.flatnonzero(np.abs(drift[1:] - weights).max(axis=1) > threshold) + 1
+        if len(breached):
+            start += int(breached[0])
+            starts.append(start)
+            lookahead = _THRESHOLD_LOOKAHEAD
+        elif stop == n_days:
+            break
+        else:
+            # Aucun dépassement dans la fenêtre: on l'élargit depuis le même point
+            lookahead *= 2
+    return np.asarray(starts, dtype=np.int64)
+
+
+def simulate_portfolio(prices: np.ndarray, weights: np.ndarray, starts: np.ndarray,
+                       initial_value: float = 1.0) -> np.ndarray:
+    """
+    Valeur quotidienne d'un portefeuille rééquilibré aux clôtures des jours starts
+
+    Entre deux rééquilibrages les positions dérivent (buy and hold):
+        V[t] = V[s_k] * sum_i w_i * P[t, i] / P[s_k, i]
+    et V[s_k] est le produit cumulé des croissances de chaque segment.
+    """
+    segment = np.zeros(len(prices), dtype=np.int64)
+    segment[starts[1:]] = 1
+    segment = np.cumsum(segment)
+
+    base = prices[starts]
+    growth = (prices / base[segment]) @ weights
+    segment_growth = (base[1:] / base[:-1]) @ weights
+    start_values = initial_value * np.concatenate([[1.0], np.cumprod(segment_growth)])
+    return start_values[segment] * growth
+
+
+def run_portfolio_backtest(closes: pd.DataFrame, weights: Optional[Sequence[float]] = None,
+                           rebalance: str = "monthly", threshold: float = 0.05,
+                           initial_value: float = 10000) -> Tuple[pd.Series, np.ndarray]:
+    """
+    Backtest d'un portefeuille sur un DataFrame de clôtures (une colonne par actif)
+    Retourne la série des valeurs et les indices de rééquilibrage
+    """
+    if rebalance not in REBALANCE_FREQUENCIES:
+        raise ValueError(f"Fréquence de rééquilibrage inconnue: {rebalance}. Disponibles: {list(REBALANCE_FREQUENCIES)}")
+
+    # Les cotations manquantes reprennent le dernier cours; l'historique commun débute
+    # lorsque tous les actifs sont cotés
+    closes = closes.ffill().dropna()
+    if closes.empty:
+        raise ValueError("Aucune période commune de cotation pour les actifs demandés")
+
+    prices = closes.to_numpy(dtype=np.float64)
+    w = normalize_weights(weights, prices.shape[1])
+
+    if rebalance == "threshold":
+        starts = threshold_rebalance_starts(prices, w, threshold)
+    else:
+        starts = calendar_rebalance_starts(closes.index, rebalance)
+
+    values = simulate_portfolio(prices, w, starts, initial_value)
+    return pd.Series(values, index=closes.index, name="value"), starts
@@ -1,12 +1,23 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import os
+import asyncio
+import logging
 from typing import Dict, List, Optional
 
+from backtest_engine import normalize_weights, run_portfolio_backtest
+from cache import TTLCache
+from market_data import MarketDataClient
+from price_store import PriceStore
+from returns_panel import PanelCache, ReturnsPanel
+from rolling import ROLLING_STATS, rolling_statistics
+from snapshots import MarketSchedule, Snapshot, SnapshotScheduler
+from streaming import ARROW_AVAILABLE, ARROW_MEDIA_TYPE, negotiate_stream, stream_series
+
 app = FastAPI(
     title="Oracle WOW V1 Backend",
     description="Backend API pour Oracle Portfolio WOW V1 avec données financières réelles",
@@ -25,6 +36,69 @@ app.add_middleware(
 # Données de test pour le portfolio
 DEFAULT_TICKERS = ['AAPL', 'GOOGL', 'MSFT', 'AMZN', 'TSLA', 'NVDA', 'META', 'NFLX']
 
+logger = logging.getLogger(__name__)
+
+# Stockage local des clôtures: Yahoo Finance n'est interrogé que pour les barres manquantes
+PRICE_STORE_DIR = os.environ.get(
+    "PRICE_STORE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "prices")
+)
+price_store = PriceStore(PRICE_STORE_DIR)
+
+# Appels Yahoo Finance hors de la boucle d'événements, sur un pool borné
+market_data = MarketDataClient(max_workers=int(os.environ.get("MARKET_DATA_WORKERS", 8)))
+
+# Benchmarks inclus dans chaque panel de rendements
+BENCHMARKS = ['SPY']
+
+# Panels de rendements alignés partagés entre métriques, beta et backtests
+panel_cache = PanelCache(max_bytes=int(os.environ.get("PANEL_CACHE_MB", 256)) * 1024 * 1024)
+
+async def sync_prices(tickers: List[str], start_date: datetime, end_date: datetime) -> None:
+    """
+    Complète le stockage local avec les barres manquantes
+    En cas d'échec de Yahoo Finance, les données déjà stockées restent servies
+    """
+    try:
+        plans = price_store.plan_sync(tickers, start_date, end_date)
+        results = await asyncio.gather(*[
+            market_data.download(list(group), fetch_start, fetch_end)
+            for group, fetch_start, fetch_end in plans
+        ])
+        for (group, fetch_start, fetch_end), closes in zip(plans, results):
+            await market_data.run(price_store.ingest, closes, fetch_start, fetch_end, group)
+    except Exception as e:
+        logger.warning(f"Synchronisation des cours échouée: {e}")
+
+async def load_panel(tickers: List[str], start_date: datetime, end_date: datetime) -> ReturnsPanel:
+    """
+    Panel de rendements alignés pour l'univers demandé et les benchmarks
+    Construit une seule fois par fenêtre et par version du stockage
+
+    L'univers est trié: SPY,GLD et GLD,SPY partagent le même panel; les
+    appelants sélectionnent ensuite leurs colonnes par nom, dans leur ordre
+    """
+    universe = tuple(sorted(set(tickers)))
+    benchmarks = tuple(b for b in BENCHMARKS if b not in universe)
+    columns = list(universe + benchmarks)
+    await sync_prices(columns, start_date, end_date)
+    
+    key = (universe, benchmarks, start_date.date(), end_date.date(), price_store.version)
+    
+    async def build() -> ReturnsPanel:
+        return ReturnsPanel(price_store.window(columns, start_date, end_date), BENCHMARKS)
+    
+    return await panel_cache.get(key, build)
+
+# Caches de cotations: prix à durée courte, infos descriptives à durée longue
+quote_cache = TTLCache(ttl=float(os.environ.get("QUOTE_TTL_SECONDS", 60)))
+info_cache = TTLCache(ttl=float(os.environ.get("INFO_TTL_SECONDS", 24 * 3600)))
+INFO_WAIT_SECONDS = float(os.environ.get("INFO_WAIT_SECONDS", 2.0))
+
+@app.on_event("shutdown")
+async def shutdown():
+    market_data.shutdown()
+
 @app.get("/")
 async def root():
     return {
@@ -35,6 +109,7 @@ async def root():
             "/health",
             "/api/portfolio/metrics",
             "/api/portfolio/backtest",
+            "/api/portfolio/rolling",
             "/api/market/data"
         ]
     }
@@ -47,21 +122,85 @@ async def health():
         "service": "Oracle WOW V1 Backend"
     }
 
+async def compute_portfolio_metrics() -> Optional[Dict]:
+    """
+    Calcule les métriques de performance du portfolio avec données réelles
+    Retourne None si aucune donnée de marché n'est disponible
+    """
+    # Récupérer les données des derniers 6 mois
+    end_date = datetime.now()
+    start_date = end_date - timedelta(days=180)
+    
+    # Portfolio diversifié: les cours viennent du stockage local, seules les barres manquantes sont téléchargées
+    tickers = DEFAULT_TICKERS
+    panel = await load_panel(tickers, start_date, end_date)
+    
+    if panel.empty:
+        return None
+    
+    # Calculer les rendements du portfolio (moyenne pondérée égale)
+    portfolio_returns = panel.portfolio_returns([t for t in tickers if t not in panel.missing])
+    
+    # Calculer les métriques
+    annual_return = (portfolio_returns.mean() * 252) * 100  # Annualisé
+    annual_volatility = (portfolio_returns.std() * np.sqrt(252)) * 100
+    sharpe_ratio = annual_return / annual_volatility if annual_volatility > 0 else 0
+    
+    # Calcul du drawdown
+    cumulative_returns = (1 + portfolio_returns).cumprod()
+    rolling_max = cumulative_returns.expanding().max()
+    drawdown = ((cumulative_returns - rolling_max) / rolling_max * 100).min()
+    
+    # Calcul du win rate (approximation)
+    positive_days = (portfolio_returns > 0).sum()
+    total_days = len(portfolio_returns)
+    win_rate = (positive_days / total_days * 100) if total_days > 0 else 50
+    
+    # Calcul du beta (vs SPY), sur les dates déjà alignées du panel
+    try:
+        beta = panel.beta(portfolio_returns, 'SPY')
+    except:
+        beta = 0.85  # Valeur par défaut
+    
+    return {
+        "returns": round(annual_return, 2),
+        "volatility": round(annual_volatility, 2),
+        "sharpe": round(sharpe_ratio, 2),
+        "drawdown": round(drawdown, 2),
+        "winRate": round(win_rate, 1),
+        "beta": round(beta, 2),
+        "source": "yahoo_finance",
+        "timestamp": datetime.now().isoformat(),
+        "period": "6_months",
+        "tickers": tickers
+    }
+
+# Instantané des métriques: recalculé en séance toutes les N minutes et après la clôture
+metrics_schedule = MarketSchedule(
+    intraday_interval=timedelta(minutes=float(os.environ.get("METRICS_REFRESH_MINUTES", 15)))
+)
+metrics_snapshot = Snapshot("portfolio_metrics", compute_portfolio_metrics, metrics_schedule)
+snapshot_scheduler = SnapshotScheduler([metrics_snapshot], metrics_schedule)
+
+@app.on_event("startup")
+async def start_snapshots():
+    snapshot_scheduler.start()
+
+@app.on_event("shutdown")
+async def stop_snapshots():
+    await snapshot_scheduler.stop()
+
 @app.get("/api/portfolio/metrics")
 async def get_portfolio_metrics():
     """
     Récupère les métriques de performance du portfolio avec données réelles
+    Sert l'instantané en mémoire; s'il a expiré, il est renvoyé marqué stale
+    et recalculé en arrière-plan
     """
     try:
-        # Récupérer les données des derniers 6 mois
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=180)
-        
-        # Télécharger les données pour un portfolio diversifié
-        tickers = DEFAULT_TICKERS[:5]  # Limiter à 5 pour la performance
-        data = yf.download(tickers, start=start_date, end=end_date, progress=False)
+        metrics, stale = await metrics_snapshot.get()
         
-        if data.empty:
+        if metrics is None:
             # Données de fallback si Yahoo Finance échoue
             return {
                 "returns": 12.5,
@@ -74,49 +213,10 @@ async def get_portfolio_metrics():
                 "timestamp": datetime.now().isoformat()
             }
         
-        # Calculer les rendements du portfolio (moyenne pondérée égale)
-        closes = data['Close']
-        portfolio_returns = closes.pct_change().mean(axis=1).dropna()
-        
-        # Calculer les métriques
-        annual_return = (portfolio_returns.mean() * 252) * 100  # Annualisé
-        annual_volatility = (portfolio_returns.std() * np.sqrt(252)) * 100
-        sharpe_ratio = annual_return / annual_volatility if annual_volatility > 0 else 0
-        
-        # Calcul du drawdown
-        cumulative_returns = (1 + portfolio_returns).cumprod()
-        rolling_max = cumulative_returns.expanding().max()
-        drawdown = ((cumulative_returns - rolling_max) / rolling_max * 100).min()
-        
-        # Calcul du win rate (approximation)
-        positive_days = (portfolio_returns > 0).sum()
-        total_days = len(portfolio_returns)
-        win_rate = (positive_days / total_days * 100) if total_days > 0 else 50
-        
-        # Calcul du beta (vs SPY)
-        try:
-            spy_data = yf.download('SPY', start=start_date, end=end_date, progress=False)
-            spy_returns = spy_data['Close'].pct_change().dropna()
-            
-            # Aligner les dates
-            aligned_data = pd.concat([portfolio_returns, spy_returns], axis=1, join='inner')
-            aligned_data.columns = ['portfolio', 'spy']
-            
-            beta = aligned_data.cov().iloc[0, 1] / aligned_data['spy'].var()
-        except:
-            beta = 0.85  # Valeur par défaut
-        
         return {
-            "returns": round(annual_return, 2),
-            "volatility": round(annual_volatility, 2),
-            "sharpe": round(sharpe_ratio, 2),
-            "drawdown": round(drawdown, 2),
-            "winRate": round(win_rate, 1),
-            "beta": round(beta, 2),
-            "source": "yahoo_finance",
-            "timestamp": datetime.now().isoformat(),
-            "period": "6_months",
-            "tickers": tickers
+            **metrics,
+            "stale": stale,
+            "snapshot_age_seconds": round(metrics_snapshot.age_seconds(), 3)
         }
         
     except Exception as e:
@@ -133,16 +233,36 @@ async def get_portfolio_metrics():
             "timestamp": datetime.now().isoformat()
         }
 
+def _parse_list(value: Optional[str]) -> List[str]:
+    """Découpe un paramètre de requête séparé par des virgules"""
+    if not value:
+        return []
+    return [item.strip() for item in value.split(",") if item.strip()]
+
 @app.get("/api/portfolio/backtest")
 async def run_backtest(
+    request: Request,
     start_date: Optional[str] = None,
     end_date: Optional[str] = None,
-    initial_cash: Optional[float] = 10000
+    initial_cash: Optional[float] = 10000,
+    tickers: Optional[str] = None,
+    weights: Optional[str] = None,
+    rebalance: str = "monthly",
+    threshold: float = 0.05
 ):
     """
-    Exécute un backtest simple du portfolio
+    Exécute un backtest du portfolio
+    tickers et weights sont séparés par des virgules (équipondération par défaut);
+    rebalance: none, monthly, quarterly ou threshold (écart de poids > threshold)
+    
+    Avec Accept: application/x-ndjson ou application/vnd.apache.arrow.stream,
+    la courbe complète est envoyée en flux au lieu des 30 derniers jours
     """
     try:
+        stream_type = negotiate_stream(request.headers.get("accept"))
+        if stream_type == ARROW_MEDIA_TYPE and not ARROW_AVAILABLE:
+            raise HTTPException(status_code=406, detail="Format Arrow indisponible (pyarrow non installé)")
+        
         # Dates par défaut
         if not end_date:
             end_date = datetime.now()
@@ -154,80 +274,191 @@ async def run_backtest(
         else:
             start_date = datetime.strptime(start_date, "%Y-%m-%d")
         
+        ticker_list = [t.upper() for t in _parse_list(tickers)] or DEFAULT_TICKERS[:4]
+        try:
+            weight_list = [float(w) for w in _parse_list(weights)]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Poids invalides")
+        
         # Récupérer les données
-        tickers = DEFAULT_TICKERS[:4]
-        data = yf.download(tickers, start=start_date, end=end_date, progress=False)
+        panel = await load_panel(ticker_list, start_date, end_date)
         
-        if data.empty:
+        if panel.empty:
             raise HTTPException(status_code=500, detail="Impossible de récupérer les données")
         
-        # Simulation simple d'un portfolio équipondéré
-        closes = data['Close']
-        portfolio_value = initial_cash
-        daily_values = []
-        
-        for date, prices in closes.iterrows():
-            # Allocation équipondérée
-            allocation_per_stock = portfolio_value / len(tickers)
-            shares = allocation_per_stock / prices
-            portfolio_value = (shares * prices).sum()
-            daily_values.append({
-                "date": date.strftime("%Y-%m-%d"),
-                "value": round(portfolio_value, 2)
-            })
+        missing = [t for t in ticker_list if t in panel.missing]
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Aucune donnée pour: {missing}")
+        closes = panel.closes[ticker_list]
+        
+        try:
+            values, rebalances = run_portfolio_backtest(
+                closes, weight_list, rebalance=rebalance, threshold=threshold, initial_value=initial_cash
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
-        final_value = daily_values[-1]["value"]
+        final_value = round(float(values.iloc[-1]), 2)
         total_return = ((final_value - initial_cash) / initial_cash) * 100
         
-        return {
+        summary = {
             "initial_cash": initial_cash,
             "final_value": final_value,
             "total_return": round(total_return, 2),
-            "daily_values": daily_values[-30:],  # Derniers 30 jours
-            "tickers": tickers,
+            "tickers": ticker_list,
+            "weights": normalize_weights(weight_list, len(ticker_list)).round(6).tolist(),
+            "rebalance": rebalance,
+            "rebalance_count": len(rebalances) - 1,
             "period": f"{start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}",
             "timestamp": datetime.now().isoformat()
         }
         
+        if stream_type:
+            return StreamingResponse(stream_series(stream_type, summary, values), media_type=stream_type)
+        
+        # Derniers 30 jours
+        recent = values.iloc[-30:]
+        summary["daily_values"] = [
+            {"date": date.strftime("%Y-%m-%d"), "value": round(value, 2)}
+            for date, value in zip(recent.index, recent.tolist())
+        ]
+        return summary
+        
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur backtest: {str(e)}")
 
+def _column_values(values: np.ndarray, decimals: int = 4) -> List[Optional[float]]:
+    """Colonne JSON: NaN (période de chauffe) converti en null"""
+    rounded = np.round(values, decimals)
+    return [None if v != v else v for v in rounded.tolist()]
+
+@app.get("/api/portfolio/rolling")
+async def get_rolling_metrics(
+    windows: str = "63,252",
+    stats: str = ",".join(ROLLING_STATS),
+    tickers: Optional[str] = None,
+    days: int = 3 * 365
+):
+    """
+    Statistiques glissantes du portfolio équipondéré (volatilité, Sharpe,
+    beta vs SPY, drawdown) pour plusieurs fenêtres, calculées en une passe
+    Réponse par colonnes: dates, puis une série par "<stat>_<fenêtre>"
+    """
+    try:
+        try:
+            window_list = sorted({int(w) for w in _parse_list(windows)})
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Fenêtres invalides")
+        stat_list = _parse_list(stats)
+        ticker_list = [t.upper() for t in _parse_list(tickers)] or DEFAULT_TICKERS[:5]
+        
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days)
+        panel = await load_panel(ticker_list, start_date, end_date)
+        
+        if panel.empty:
+            raise HTTPException(status_code=500, detail="Impossible de récupérer les données")
+        
+        portfolio_returns = panel.portfolio_returns([t for t in ticker_list if t not in panel.missing])
+        benchmark = panel.returns['SPY'].to_numpy() if 'SPY' in panel.returns else None
+        
+        try:
+            columns = rolling_statistics(
+                portfolio_returns.to_numpy(), window_list, stat_list, benchmark=benchmark
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        return {
+            "dates": [d.strftime("%Y-%m-%d") for d in portfolio_returns.index],
+            "series": {name: _column_values(values) for name, values in columns.items()},
+            "windows": window_list,
+            "tickers": ticker_list,
+            "benchmark": "SPY",
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Erreur statistiques glissantes: {str(e)}")
+
+async def _load_info(ticker: str) -> Dict:
+    """Charge les informations descriptives d'un ticker et les met en cache"""
+    try:
+        info = await market_data.info(ticker)
+    except Exception as e:
+        logger.warning(f"Infos indisponibles pour {ticker}: {e}")
+        return {}
+    fields = {"name": info.get("longName", ticker), "market_cap": info.get("marketCap", 0)}
+    info_cache.set(ticker, fields)
+    return fields
+
+async def _load_quotes(ticker_list: List[str]) -> Dict[str, Dict]:
+    """Cours récents: cache court, puis un seul téléchargement groupé pour les tickers manquants"""
+    quotes = quote_cache.get_many(ticker_list)
+    missing = [t for t in ticker_list if t not in quotes]
+    if missing:
+        closes, volumes = await market_data.quotes(missing)
+        for ticker in missing:
+            if ticker not in closes.columns:
+                continue
+            history = closes[ticker].dropna()
+            if history.empty:
+                continue
+            current_price = history.iloc[-1]
+            prev_price = history.iloc[-2] if len(history) > 1 else current_price
+            volume = volumes[ticker].dropna()
+            quote = {
+                "price": round(float(current_price), 2),
+                "change_pct": round(float((current_price - prev_price) / prev_price * 100), 2),
+                "volume": int(volume.iloc[-1]) if not volume.empty else 0
+            }
+            quote_cache.set(ticker, quote)
+            quotes[ticker] = quote
+    return quotes
+
 @app.get("/api/market/data")
 async def get_market_data(tickers: Optional[str] = None):
     """
     Récupère les données de marché pour les tickers spécifiés
+    Les infos lentes (nom, capitalisation) non prêtes après INFO_WAIT_SECONDS
+    sont complétées en arrière-plan et servies par le cache aux appels suivants
     """
     try:
         if not tickers:
             tickers = ",".join(DEFAULT_TICKERS[:5])
         
-        ticker_list = [t.strip().upper() for t in tickers.split(",")]
+        ticker_list = list(dict.fromkeys(t.strip().upper() for t in tickers.split(",") if t.strip()))
+        
+        infos = info_cache.get_many(ticker_list)
+        info_tasks = [asyncio.ensure_future(_load_info(t)) for t in ticker_list if t not in infos]
         
-        market_data = []
+        quotes = await _load_quotes(ticker_list)
+        if info_tasks:
+            await asyncio.wait(info_tasks, timeout=INFO_WAIT_SECONDS)
+            infos.update(info_cache.get_many(ticker_list))
+        
+        rows = []
         for ticker in ticker_list:
-            try:
-                stock = yf.Ticker(ticker)
-                info = stock.info
-                hist = stock.history(period="5d")
-                
-                if not hist.empty:
-                    current_price = hist['Close'].iloc[-1]
-                    prev_price = hist['Close'].iloc[-2] if len(hist) > 1 else current_price
-                    change_pct = ((current_price - prev_price) / prev_price) * 100
-                    
-                    market_data.append({
-                        "ticker": ticker,
-                        "name": info.get("longName", ticker),
-                        "price": round(current_price, 2),
-                        "change_pct": round(change_pct, 2),
-                        "volume": info.get("volume", 0),
-                        "market_cap": info.get("marketCap", 0)
-                    })
-            except:
+            quote = quotes.get(ticker)
+            if quote is None:
                 continue
+            info = infos.get(ticker, {})
+            rows.append({
+                "ticker": ticker,
+                "name": info.get("name", ticker),
+                "price": quote["price"],
+                "change_pct": quote["change_pct"],
+                "volume": quote["volume"],
+                "market_cap": info.get("market_cap", 0)
+            })
         
         return {
-            "data": market_data,
+            "data": rows,
+            "partial": any(t not in infos for t in quotes),
             "timestamp": datetime.now().isoformat(),
             "source": "yahoo_finance"
         }
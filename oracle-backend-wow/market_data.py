@@ -0,0 +1,111 @@
+"""
+Oracle WOW V1 - Couche d'accès aux données de marché
+Exécute les appels bloquants yfinance sur un pool de threads borné
+et fusionne les requêtes identiques en cours d'exécution
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+import pandas as pd
+import yfinance as yf
+
+logger = logging.getLogger(__name__)
+
+
+def download_closes(tickers: List[str], start, end) -> pd.DataFrame:
+    """Télécharge les clôtures journalières depuis Yahoo Finance (bloquant)"""
+    data = yf.download(tickers, start=start, end=end, progress=False)
+    if data.empty:
+        return pd.DataFrame(columns=tickers)
+    closes = data['Close']
+    if isinstance(closes, pd.Series):
+        closes = closes.to_frame(tickers[0])
+    return closes
+
+
+def download_quotes(tickers: List[str], period: str = "5d") -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Télécharge en un seul appel l'historique récent de plusieurs tickers (bloquant)
+    Retourne les clôtures et les volumes, une colonne par ticker
+    """
+    data = yf.download(tickers, period=period, progress=False)
+    if data.empty:
+        empty = pd.DataFrame(columns=tickers)
+        return empty, empty
+    closes, volumes = data['Close'], data['Volume']
+    if isinstance(closes, pd.Series):
+        closes, volumes = closes.to_frame(tickers[0]), volumes.to_frame(tickers[0])
+    return closes, volumes
+
+
+def fetch_info(ticker: str) -> Dict[str, Any]:
+    """Informations descriptives d'un ticker (bloquant)"""
+    return yf.Ticker(ticker).info
+
+
+def fetch_history(ticker: str, period: str) -> pd.DataFrame:
+    """Historique récent d'un ticker (bloquant)"""
+    return yf.Ticker(ticker).history(period=period)
+
+
+class MarketDataClient:
+    """
+    Client asynchrone pour Yahoo Finance
+
+    Chaque appel bloquant est délégué à un pool de threads de taille fixe,
+    ce qui laisse la boucle d'événements libre (y compris pour /health).
+    Les requêtes identiques concurrentes (mêmes tickers, même fenêtre)
+    partagent un unique appel amont dont tous les demandeurs reçoivent le résultat.
+    """
+
+    def __init__(self, max_workers: int = 8):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="market-data")
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Exécute une fonction bloquante sur le pool, sans fusion"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+
+    async def coalesce(self, key: Hashable, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Exécute fn une seule fois par clé tant qu'un appel est en cours
+        L'annulation d'un demandeur n'interrompt pas l'appel partagé
+        """
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self.run(fn, *args, **kwargs))
+            self._inflight[key] = future
+            future.add_done_callback(functools.partial(self._release, key))
+        return await asyncio.shield(future)
+
+    def _release(self, key: Hashable, future: asyncio.Future) -> None:
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.cancelled() and future.exception() is not None:
+            logger.warning(f"Appel données de marché échoué {key}: {future.exception()}")
+
+    def inflight(self) -> int:
+        return len(self._inflight)
+
+    async def download(self, tickers: List[str], start, end) -> pd.DataFrame:
+        key = ("download", tuple(sorted(tickers)), str(start), str(end))
+        return await self.coalesce(key, download_closes, sorted(tickers), start, end)
+
+    async def quotes(self, tickers: List[str], period: str = "5d") -> Tuple[pd.DataFrame, pd.DataFrame]:
+        key = ("quotes", tuple(sorted(tickers)), period)
+        return await self.coalesce(key, download_quotes, sorted(tickers), period)
+
+    async def info(self, ticker: str) -> Dict[str, Any]:
+        return await self.coalesce(("info", ticker), fetch_info, ticker)
+
+    async def history(self, ticker: str, period: str) -> pd.DataFrame:
+        return await self.coalesce(("history", ticker, period), fetch_history, ticker, period)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,263 @@
+"""
+Oracle WOW V1 - Stockage local colonnaire des cours
+Un fichier NumPy par ticker, aligné sur un index de dates partagé,
+lu en mémoire mappée et complété de façon incrémentale
+"""
+
+import json
+import os
+import threading
+from datetime import date, datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# Signature du téléchargeur: (tickers, début inclus, fin exclue) -> DataFrame de clôtures
+Fetcher = Callable[[List[str], date, date], pd.DataFrame]
+DateLike = Union[str, date, datetime, pd.Timestamp]
+
+# Plan de synchronisation: tickers à télécharger ensemble sur [début, fin)
+FetchPlan = Tuple[Tuple[str, ...], date, date]
+
+
+def _to_day(value: DateLike) -> date:
+    """Normalise une date (str, datetime, Timestamp) en jour calendaire"""
+    if isinstance(value, str):
+        return datetime.strptime(value[:10], "%Y-%m-%d").date()
+    if isinstance(value, pd.Timestamp):
+        return value.date()
+    if isinstance(value, datetime):
+        return value.date()
+    return value
+
+
+class PriceStore:
+    """
+    Stockage des clôtures journalières sur disque
+
+    Structure du répertoire:
+        _index.npy        dates partagées (datetime64[D], triées)
+        _meta.json        couverture par ticker (premier jour, synchro)
+        <TICKER>.npy      clôtures float64 alignées sur _index.npy (NaN si absent)
+
+    Seules les barres manquantes depuis la dernière synchronisation sont
+    téléchargées; les fenêtres sont ensuite lues directement depuis les
+    fichiers mappés en mémoire.
+    """
+
+    INDEX_FILE = "_index.npy"
+    META_FILE = "_meta.json"
+
+    def __init__(self, root: str, refresh_interval: timedelta = timedelta(minutes=15)):
+        self.root = root
+        self.refresh_interval = refresh_interval
+        self._lock = threading.RLock()
+        self._columns: Dict[str, np.ndarray] = {}
+        # Incrémenté à chaque écriture de cours, pour invalider les caches dérivés
+        self.version = 0
+        os.makedirs(root, exist_ok=True)
+        self._index = self._load_index()
+        self._meta = self._load_meta()
+
+    # ------------------------------------------------------------------
+    # Lecture
+    # ------------------------------------------------------------------
+
+    @property
+    def index(self) -> np.ndarray:
+        return self._index
+
+    def tickers(self) -> List[str]:
+        return sorted(self._meta)
+
+    def window(self, tickers: Sequence[str], start: DateLike, end: DateLike) -> pd.DataFrame:
+        """
+        Retourne les clôtures des tickers sur [start, end] (bornes incluses)
+        Les dates où aucun ticker n'a de cours sont écartées
+        """
+        start_day = np.datetime64(_to_day(start), "D")
+        end_day = np.datetime64(_to_day(end), "D")
+
+        with self._lock:
+            index = self._index
+            i0 = int(np.searchsorted(index, start_day, side="left"))
+            i1 = int(np.searchsorted(index, end_day, side="right"))
+            columns = [self._column(ticker) for ticker in tickers]
+
+        values = np.full((i1 - i0, len(tickers)), np.nan)
+        for j, column in enumerate(columns):
+            if column is not None:
+                values[:, j] = column[i0:i1]
+
+        frame = pd.DataFrame(values, index=pd.DatetimeIndex(index[i0:i1]), columns=list(tickers))
+        return frame.dropna(how="all")
+
+    # ------------------------------------------------------------------
+    # Synchronisation
+    # ------------------------------------------------------------------
+
+    def plan_sync(self, tickers: Sequence[str], start: DateLike, end: DateLike) -> List[FetchPlan]:
+        """
+        Calcule les téléchargements nécessaires pour couvrir [start, end]
+        Les tickers partageant la même plage manquante sont regroupés
+        """
+        start_day = _to_day(start)
+        end_day = _to_day(end)
+        today = date.today()
+        now = datetime.now()
+        groups: Dict[Tuple[date, date], List[str]] = {}
+
+        with self._lock:
+            for ticker in dict.fromkeys(tickers):
+                meta = self._meta.get(ticker)
+                fetch_to = end_day + timedelta(days=1)
+                if meta is None:
+                    fetch_from = start_day
+                elif _to_day(meta["first"]) > start_day:
+                    # Complément en amont, contigu à la couverture existante
+                    fetch_from = start_day
+                    fetch_to = max(fetch_to, _to_day(meta["first"]))
+                else:
+                    synced_to = _to_day(meta["synced_to"])
+                    if synced_to > end_day:
+                        continue
+                    synced_at = datetime.fromisoformat(meta["synced_at"])
+                    if synced_to >= today and now - synced_at < self.refresh_interval:
+                        continue
+                    fetch_from = synced_to
+                groups.setdefault((fetch_from, fetch_to), []).append(ticker)
+
+        return [(tuple(group), fetch_start, fetch_end) for (fetch_start, fetch_end), group in groups.items()]
+
+    def ingest(self, closes: pd.DataFrame, start: DateLike, end: DateLike,
+               tickers: Optional[Sequence[str]] = None) -> None:
+        """
+        Fusionne des clôtures téléchargées sur [start, end) dans le stockage
+        et met à jour la couverture des tickers qui ont reçu des barres
+
+        yfinance ne lève pas d'erreur en cas d'échec (frame vide): un ticker
+        sans barre garde sa couverture et sera redemandé à la prochaine synchro
+        """
+        start_day = _to_day(start)
+        end_day = _to_day(end)
+        tickers = list(tickers if tickers is not None else closes.columns)
+        closes = closes.reindex(columns=tickers).dropna(how="all")
+        if closes.empty:
+            return
+
+        with self._lock:
+            dates = closes.index.values.astype("datetime64[D]")
+            merged = np.union1d(self._index, dates)
+            if len(merged) != len(self._index):
+                self._reindex(merged)
+
+            positions = np.searchsorted(self._index, dates)
+            received = []
+            for ticker in tickers:
+                values = closes[ticker].to_numpy(dtype=np.float64)
+                known = ~np.isnan(values)
+                if not known.any():
+                    continue
+                column = self._read_column(ticker)
+                column[positions[known]] = values[known]
+                self._write_column(ticker, column)
+                received.append(ticker)
+            self.version += 1
+
+            # Les barres antérieures à aujourd'hui sont définitives
+            synced_to = min(end_day, date.today())
+            synced_at = datetime.now().isoformat()
+            for ticker in received:
+                meta = self._meta.get(ticker)
+                first, last = start_day, synced_to
+                if meta is not None:
+                    first = min(first, _to_day(meta["first"]))
+                    last = max(last, _to_day(meta["synced_to"]))
+                self._meta[ticker] = {
+                    "first": first.isoformat(),
+                    "synced_to": last.isoformat(),
+                    "synced_at": synced_at,
+                }
+            self._save_meta()
+
+    def sync(self, tickers: Sequence[str], start: DateLike, end: DateLike, fetch: Fetcher) -> int:
+        """
+        Télécharge uniquement les barres manquantes pour couvrir [start, end]
+        Retourne le nombre de téléchargements effectués
+        """
+        plans = self.plan_sync(tickers, start, end)
+        for group, fetch_start, fetch_end in plans:
+            closes = fetch(list(group), fetch_start, fetch_end)
+            self.ingest(closes, fetch_start, fetch_end, tickers=group)
+        return len(plans)
+
+    # ------------------------------------------------------------------
+    # Fichiers
+    # ------------------------------------------------------------------
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    def _column_path(self, ticker: str) -> str:
+        return self._path(f"{ticker.replace('/', '_')}.npy")
+
+    def _load_index(self) -> np.ndarray:
+        path = self._path(self.INDEX_FILE)
+        if os.path.exists(path):
+            return np.load(path)
+        return np.array([], dtype="datetime64[D]")
+
+    def _load_meta(self) -> Dict[str, Dict[str, str]]:
+        path = self._path(self.META_FILE)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {}
+
+    def _save_meta(self) -> None:
+        path = self._path(self.META_FILE)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._meta, f, indent=1, sort_keys=True)
+        os.replace(tmp, path)
+
+    def _save_array(self, path: str, values: np.ndarray) -> None:
+        # Écriture atomique: les lecteurs voient l'ancien ou le nouveau fichier
+        tmp = f"{path}.tmp.npy"
+        np.save(tmp, values)
+        os.replace(tmp, path)
+
+    def _column(self, ticker: str) -> Optional[np.ndarray]:
+        """Colonne mappée en mémoire (lecture seule), None si inconnue"""
+        column = self._columns.get(ticker)
+        if column is None:
+            path = self._column_path(ticker)
+            if not os.path.exists(path):
+                return None
+            column = np.load(path, mmap_mode="r")
+            self._columns[ticker] = column
+        return column
+
+    def _read_column(self, ticker: str) -> np.ndarray:
+        column = self._column(ticker)
+        if column is None:
+            return np.full(len(self._index), np.nan)
+        return np.array(column)
+
+    def _write_column(self, ticker: str, values: np.ndarray) -> None:
+        self._columns.pop(ticker, None)
+        self._save_array(self._column_path(ticker), values)
+
+    def _reindex(self, merged: np.ndarray) -> None:
+        """Étend l'index partagé et réaligne toutes les colonnes existantes"""
+        positions = np.searchsorted(merged, self._index)
+        for ticker in list(self._meta):
+            column = self._column(ticker)
+            if column is None:
+                continue
+            values = np.full(len(merged), np.nan)
+            values[positions] = column
+            self._write_column(ticker, values)
+        self._save_array(self._path(self.INDEX_FILE), merged)
+        self._index = merged
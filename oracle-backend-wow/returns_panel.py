@@ -0,0 +1,93 @@
+"""
+Oracle WOW V1 - Panel partagé de rendements alignés
+Chaque fenêtre (univers + benchmarks, dates) est lue, nettoyée et alignée
+une seule fois, puis réutilisée par les métriques, le beta et les backtests
+"""
+
+import asyncio
+from datetime import date
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from cache import LRUCache
+
+
+class ReturnsPanel:
+    """
+    Clôtures et rendements journaliers alignés sur les dates où tous les
+    tickers sont cotés (les trous isolés reprennent le dernier cours)
+    """
+
+    def __init__(self, closes: pd.DataFrame, benchmarks: Sequence[str] = ()):
+        # Un ticker sans aucun cours ne doit pas vider tout le panel
+        available = closes.dropna(axis=1, how="all")
+        self.missing = [ticker for ticker in closes.columns if ticker not in available.columns]
+        self.closes = available.ffill().dropna()
+        self.returns = self.closes.pct_change().iloc[1:]
+        self.benchmarks = list(benchmarks)
+
+    @property
+    def empty(self) -> bool:
+        return self.returns.empty
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.closes.memory_usage(deep=True).sum() + self.returns.memory_usage(deep=True).sum())
+
+    def portfolio_returns(self, tickers: Sequence[str], weights: Optional[Sequence[float]] = None) -> pd.Series:
+        """Rendements quotidiens d'un portefeuille (équipondéré par défaut) rééquilibré chaque jour"""
+        returns = self.returns[list(tickers)]
+        if weights is None:
+            return returns.mean(axis=1)
+        w = np.asarray(weights, dtype=np.float64)
+        return pd.Series(returns.to_numpy() @ (w / w.sum()), index=returns.index)
+
+    def beta(self, series: pd.Series, benchmark: str) -> float:
+        """Beta d'une série de rendements alignée sur le panel par rapport à un benchmark"""
+        bench = self.returns[benchmark].to_numpy()
+        values = series.to_numpy()
+        return float(np.cov(values, bench)[0, 1] / bench.var(ddof=1))
+
+
+PanelKey = Tuple[Tuple[str, ...], Tuple[str, ...], date, date, int]
+
+
+class PanelCache:
+    """
+    Panels de rendements indexés par (univers, benchmarks, fenêtre, version du stockage)
+    Éviction LRU sous budget mémoire; les constructions concurrentes d'une même
+    clé sont fusionnées et protégées de l'annulation d'un des appelants
+    """
+
+    def __init__(self, max_bytes: int):
+        self._cache = LRUCache(max_bytes, sizeof=lambda panel: panel.nbytes)
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    @property
+    def current_bytes(self) -> int:
+        return self._cache.current_bytes
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    async def get(self, key: PanelKey, build: Callable[[], Awaitable[ReturnsPanel]]) -> ReturnsPanel:
+        panel = self._cache.get(key)
+        if panel is not None:
+            return panel
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(build())
+            self._inflight[key] = future
+            future.add_done_callback(lambda done: self._store(key, done))
+        # Un appelant annulé (client déconnecté) n'interrompt pas la construction partagée
+        return await asyncio.shield(future)
+
+    def _store(self, key: PanelKey, future: asyncio.Future) -> None:
+        del self._inflight[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+        panel = future.result()
+        if not panel.empty:
+            self._cache.set(key, panel)
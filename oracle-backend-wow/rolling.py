@@ -0,0 +1,103 @@
+"""
+Oracle WOW V1 - Statistiques glissantes en O(n)
+Moyennes, variances et covariances par sommes cumulées; maxima glissants
+par l'algorithme de van Herk / Gil-Werman (préfixes et suffixes par bloc)
+"""
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+TRADING_DAYS = 252
+ROLLING_STATS = ("volatility", "sharpe", "beta", "drawdown")
+
+
+def _window_sums(values: np.ndarray, window: int) -> np.ndarray:
+    """Somme sur chaque fenêtre terminant en t (NaN pendant la période de chauffe)"""
+    sums = np.full(len(values), np.nan)
+    if window <= len(values):
+        cumulative = np.concatenate([[0.0], np.cumsum(values)])
+        sums[window - 1:] = cumulative[window:] - cumulative[:-window]
+    return sums
+
+
+def rolling_mean_var(returns: np.ndarray, window: int):
+    """Moyenne et variance (ddof=1) glissantes; les données sont centrées pour la stabilité numérique"""
+    shift = returns.mean() if len(returns) else 0.0
+    centered = returns - shift
+    s1 = _window_sums(centered, window)
+    s2 = _window_sums(centered * centered, window)
+    mean = s1 / window
+    var = (s2 - s1 * mean) / (window - 1)
+    return mean + shift, np.maximum(var, 0.0)
+
+
+def rolling_beta(returns: np.ndarray, benchmark: np.ndarray, window: int) -> np.ndarray:
+    """Beta glissant cov(r, b) / var(b)"""
+    x = returns - returns.mean()
+    y = benchmark - benchmark.mean()
+    sx, sy = _window_sums(x, window), _window_sums(y, window)
+    sxy, syy = _window_sums(x * y, window), _window_sums(y * y, window)
+    cov = sxy - sx * sy / window
+    var = syy - sy * sy / window
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(var > 0, cov / var, np.nan)
+
+
+def sliding_max(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Maximum sur chaque fenêtre terminant en t, en O(n) vectorisé:
+    max(suffixe du bloc de i, préfixe du bloc de i + window - 1)
+    """
+    n = len(values)
+    result = np.full(n, np.nan)
+    if window > n:
+        return result
+    n_blocks = -(-n // window)
+    padded = np.full(n_blocks * window, -np.inf)
+    padded[:n] = values
+    blocks = padded.reshape(n_blocks, window)
+    prefix = np.maximum.accumulate(blocks, axis=1).ravel()
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].ravel()
+    starts = np.arange(n - window + 1)
+    result[window - 1:] = np.maximum(suffix[starts], prefix[starts + window - 1])
+    return result
+
+
+def rolling_drawdown(returns: np.ndarray, window: int) -> np.ndarray:
+    """Drawdown (%) par rapport au plus haut de la richesse sur la fenêtre"""
+    wealth = np.cumprod(1.0 + returns)
+    peak = sliding_max(wealth, window)
+    return (wealth / peak - 1.0) * 100
+
+
+def rolling_statistics(returns: np.ndarray, windows: Sequence[int], stats: Sequence[str] = ROLLING_STATS,
+                       benchmark: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Calcule plusieurs statistiques glissantes pour plusieurs fenêtres
+    Colonnes nommées "<stat>_<fenêtre>"; volatilité annualisée en %, Sharpe
+    annualisé sans taux sans risque (comme /api/portfolio/metrics)
+    """
+    unknown = [s for s in stats if s not in ROLLING_STATS]
+    if unknown:
+        raise ValueError(f"Statistiques inconnues: {unknown}. Disponibles: {list(ROLLING_STATS)}")
+    if "beta" in stats and benchmark is None:
+        raise ValueError("Un benchmark est requis pour le beta glissant")
+
+    columns: Dict[str, np.ndarray] = {}
+    for window in windows:
+        if window < 2:
+            raise ValueError(f"Fenêtre trop courte: {window}")
+        if "volatility" in stats or "sharpe" in stats:
+            mean, var = rolling_mean_var(returns, window)
+            volatility = np.sqrt(var * TRADING_DAYS)
+            if "volatility" in stats:
+                columns[f"volatility_{window}"] = volatility * 100
+            if "sharpe" in stats:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    columns[f"sharpe_{window}"] = np.where(volatility > 0, mean * TRADING_DAYS / volatility, np.nan)
+        if "beta" in stats:
+            columns[f"beta_{window}"] = rolling_beta(returns, benchmark, window)
+        if "drawdown" in stats:
+            columns[f"drawdown_{window}"] = rolling_drawdown(returns, window)
+    return columns
@@ -0,0 +1,142 @@
+"""
+Oracle WOW V1 - Instantanés recalculés en arrière-plan
+Sert la dernière valeur calculée immédiatement et la rafraîchit de façon
+asynchrone (stale-while-revalidate) selon le calendrier de marché
+"""
+
+import asyncio
+import logging
+from datetime import datetime, time, timedelta
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+logger = logging.getLogger(__name__)
+
+MARKET_TZ = ZoneInfo("America/New_York")
+MARKET_OPEN = time(9, 30)
+MARKET_CLOSE = time(16, 0)
+# Délai après la clôture pour laisser les cours définitifs se publier
+CLOSE_SETTLE = timedelta(minutes=15)
+
+
+class MarketSchedule:
+    """
+    Calendrier de rafraîchissement: toutes les N minutes en séance,
+    une fois après la clôture, puis plus rien jusqu'à l'ouverture suivante
+    (jours fériés non gérés)
+    """
+
+    def __init__(self, intraday_interval: timedelta = timedelta(minutes=15)):
+        self.intraday_interval = intraday_interval
+
+    def next_refresh(self, after: datetime) -> datetime:
+        """Prochain instant de recalcul strictement postérieur à after (datetime avec fuseau)"""
+        local = after.astimezone(MARKET_TZ)
+        day = local.date()
+        while True:
+            if day.weekday() < 5:
+                open_at = datetime.combine(day, MARKET_OPEN, MARKET_TZ)
+                close_at = datetime.combine(day, MARKET_CLOSE, MARKET_TZ)
+                settle_at = close_at + CLOSE_SETTLE
+                if local < open_at:
+                    return open_at
+                if local < close_at:
+                    return min(local + self.intraday_interval, settle_at)
+                if local < settle_at:
+                    return settle_at
+            day += timedelta(days=1)
+            local = datetime.combine(day, time(0, 0), MARKET_TZ)
+
+
+class Snapshot:
+    """
+    Valeur calculée périodiquement et conservée en mémoire
+
+    get() ne bloque que si aucune valeur n'a encore été calculée; une valeur
+    expirée est servie marquée stale pendant qu'un unique recalcul est lancé.
+    """
+
+    def __init__(self, name: str, compute: Callable[[], Awaitable[Any]], schedule: MarketSchedule,
+                 retry_after: timedelta = timedelta(minutes=1)):
+        self.name = name
+        self.compute = compute
+        self.schedule = schedule
+        self.retry_after = retry_after
+        self.value: Any = None
+        self.computed_at: Optional[datetime] = None
+        self.expires_at: Optional[datetime] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+
+    def is_stale(self, now: Optional[datetime] = None) -> bool:
+        now = now or datetime.now(MARKET_TZ)
+        return self.expires_at is None or now >= self.expires_at
+
+    def refresh(self) -> asyncio.Task:
+        """Lance un recalcul, ou retourne celui déjà en cours"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.ensure_future(self._refresh())
+            # L'erreur est déjà journalisée; évite l'avertissement "never retrieved"
+            self._refresh_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        return self._refresh_task
+
+    async def _refresh(self) -> Any:
+        started_at = datetime.now(MARKET_TZ)
+        try:
+            value = await self.compute()
+        except Exception as e:
+            logger.warning(f"Recalcul de l'instantané {self.name} échoué: {e}")
+            self.expires_at = started_at + self.retry_after
+            raise
+        if value is None:
+            self.expires_at = started_at + self.retry_after
+            return self.value
+        self.value = value
+        self.computed_at = started_at
+        self.expires_at = self.schedule.next_refresh(started_at)
+        return value
+
+    async def get(self) -> Tuple[Any, bool]:
+        """Retourne (valeur, stale); attend le premier calcul si nécessaire"""
+        if self.value is None:
+            refreshing = self._refresh_task is not None and not self._refresh_task.done()
+            if refreshing or self.is_stale():
+                await self.refresh()
+            return self.value, False
+        stale = self.is_stale()
+        if stale:
+            self.refresh()
+        return self.value, stale
+
+    def age_seconds(self) -> Optional[float]:
+        if self.computed_at is None:
+            return None
+        return (datetime.now(MARKET_TZ) - self.computed_at).total_seconds()
+
+
+class SnapshotScheduler:
+    """Boucle de fond recalculant les instantanés à chaque échéance du calendrier"""
+
+    def __init__(self, snapshots: List[Snapshot], schedule: MarketSchedule):
+        self.snapshots = snapshots
+        self.schedule = schedule
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.gather(*[s.refresh() for s in self.snapshots], return_exceptions=True)
+            now = datetime.now(MARKET_TZ)
+            delay = (self.schedule.next_refresh(now) - now).total_seconds()
+            await asyncio.sleep(max(delay, 1.0))
@@ -0,0 +1,123 @@
+"""
+Oracle WOW V1 - Réponses en flux pour les séries longues
+NDJSON ou Arrow IPC (flux de record batches), choisis selon l'en-tête Accept
+
+"""
+
+# negotiate_stream et l'encodage JSON strict (json_safe, json_dumps, json_line,
+# json_number) ont un jumeau dans backtest_streaming.py à la racine du dépôt:
+# les deux backends sont déployés séparément et ne partagent pas de code.
+# Toute correction doit être reportée des deux côtés.
+
+import io
+import json
+import math
+from typing import Any, Dict, Iterator, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+STREAM_MEDIA_TYPES = (NDJSON_MEDIA_TYPE, ARROW_MEDIA_TYPE)
+
+# Nombre de lignes sérialisées par morceau envoyé
+CHUNK_ROWS = 4096
+
+
+def negotiate_stream(accept: Optional[str]) -> Optional[str]:
+    """Format de flux demandé par l'en-tête Accept, None pour la réponse JSON classique"""
+    if not accept:
+        return None
+    for part in accept.split(","):
+        media_type = part.split(";")[0].strip().lower()
+        if media_type in STREAM_MEDIA_TYPES:
+            return media_type
+    return None
+
+
+def json_safe(value: Any) -> Any:
+    """Remplace NaN et ±inf par None (JSON strict), dans les dicts et listes imbriqués"""
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: json_safe(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(item) for item in value]
+    return value
+
+
+def json_dumps(value: Any) -> str:
+    """JSON strict: un Sharpe NaN (série plate) devient null au lieu de NaN invalide"""
+    return json.dumps(json_safe(value), default=float, allow_nan=False)
+
+
+def json_line(value: Any) -> bytes:
+    """Une ligne NDJSON"""
+    return (json_dumps(value) + "\n").encode()
+
+
+def json_number(value: float) -> str:
+    """Nombre JSON d'une valeur float, null si NaN ou infinie"""
+    return repr(value) if math.isfinite(value) else "null"
+
+
+def ndjson_series(header: Dict[str, Any], series: pd.Series, field: str = "value",
+                  decimals: int = 2, chunk_rows: int = CHUNK_ROWS) -> Iterator[bytes]:
+    """
+    Une ligne d'en-tête {"type": "summary", ...} puis une ligne par point
+    {"type": field, "date": "YYYY-MM-DD", field: valeur}, envoyées par morceaux
+    """
+    yield json_line({"type": "summary", **header})
+
+    dates = series.index.values.astype("datetime64[D]")
+    values = series.to_numpy(dtype=np.float64)
+    prefix = f'{{"type":"{field}","date":"'
+    middle = f'","{field}":'
+    for i in range(0, len(values), chunk_rows):
+        day_strings = np.datetime_as_string(dates[i:i + chunk_rows])
+        rounded = np.round(values[i:i + chunk_rows], decimals).tolist()
+        lines = [f"{prefix}{d}{middle}{json_number(v)}}}\n" for d, v in zip(day_strings, rounded)]
+        yield "".join(lines).encode()
+
+
+def arrow_series(header: Dict[str, Any], series: pd.Series, field: str = "value",
+                 chunk_rows: int = CHUNK_ROWS) -> Iterator[bytes]:
+    """
+    Flux Arrow IPC (date32, float64); l'en-tête JSON est porté par les
+    métadonnées du schéma
+    """
+    schema = pa.schema(
+        [("date", pa.date32()), (field, pa.float64())],
+        metadata={"summary": json_dumps(header)}
+    )
+    dates = series.index.values.astype("datetime64[D]")
+    values = series.to_numpy(dtype=np.float64)
+
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for i in range(0, max(len(values), 1), chunk_rows):
+            batch = pa.record_batch(
+                [pa.array(dates[i:i + chunk_rows], pa.date32()), pa.array(values[i:i + chunk_rows])],
+                schema=schema
+            )
+            writer.write_batch(batch)
+            yield sink.getvalue()
+            sink.seek(0)
+            sink.truncate()
+    # Marqueur de fin de flux
+    yield sink.getvalue()
+
+
+def stream_series(media_type: str, header: Dict[str, Any], series: pd.Series, field: str = "value") -> Iterator[bytes]:
+    if media_type == ARROW_MEDIA_TYPE:
+        return arrow_series(header, series, field)
+    return ndjson_series(header, series, field)